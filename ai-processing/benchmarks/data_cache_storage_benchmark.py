@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark DataCache raw_data storage: JSON text rows against zstd-compressed JSON with a trained dictionary
+Reports disk size and the latency of serving cached vessels as a JSON array
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Run from anywhere inside the repo
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, ".."))
+
+from services.data_cache import DataCache
+from services.memory_tier import MemoryTier
+from services.response_cache import encode_json
+
+DEFAULT_RECORDS = os.path.join(BENCHMARK_DIR, "..", "..", "real_vessels_complete.json")
+
+def load_vessels(path: str, count: int):
+    with open(path) as f:
+        data = json.load(f)
+    source = data["vessels"] if isinstance(data, dict) else data
+    # Repeat the file under new ids when asked for more records than it holds
+    return [
+        {**source[i % len(source)], "id": f"{source[i % len(source)].get('id', 'vessel')}_{i // len(source)}"}
+        for i in range(count)
+    ]
+
+def build(path: str, vessels, batch_size: int, legacy: bool) -> DataCache:
+    # No memory tier: every round must read SQLite
+    cache = DataCache(path, memory=MemoryTier(max_bytes=0))
+    for offset in range(0, len(vessels), batch_size):
+        cache.cache_vessels(vessels[offset:offset + batch_size])
+    if legacy:
+        # The previous format: json.dumps text in raw_data
+        with sqlite3.connect(path) as conn:
+            conn.executemany("UPDATE vessels SET raw_data = ? WHERE id = ?",
+                             [(json.dumps(vessel), vessel["id"]) for vessel in vessels])
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    with sqlite3.connect(path, isolation_level=None) as conn:
+        conn.execute("VACUUM")
+    return cache
+
+def sizes(path: str):
+    with sqlite3.connect(path) as conn:
+        raw_bytes = conn.execute("SELECT SUM(length(raw_data)) FROM vessels").fetchone()[0]
+    return os.path.getsize(path), raw_bytes
+
+def best_ms(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", default=DEFAULT_RECORDS, help="JSON file with a vessels list")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=5000, help="Vessels per cached read")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    vessels = load_vessels(args.records, args.count)
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "text.db")
+        zstd_path = os.path.join(directory, "zstd.db")
+        text_cache = build(text_path, vessels, args.batch_size, legacy=True)
+        zstd_cache = build(zstd_path, vessels, args.batch_size, legacy=False)
+
+        text_file, text_raw = sizes(text_path)
+        zstd_file, zstd_raw = sizes(zstd_path)
+        limit = args.limit
+        text_ms = best_ms(lambda: encode_json(text_cache.get_cached_vessels(limit)), args.rounds)
+        zstd_ms = best_ms(lambda: encode_json(zstd_cache.get_cached_vessels(limit)), args.rounds)
+        splice_ms = best_ms(lambda: zstd_cache.get_cached_vessels_json(limit), args.rounds)
+        assert json.loads(zstd_cache.get_cached_vessels_json(limit).body) == text_cache.get_cached_vessels(limit)
+
+    print(f"📊 {args.count} vessels from {os.path.basename(args.records)}, reads of {limit}, best of {args.rounds}")
+    print(f"{'format':<34} {'file MB':>8} {'raw_data MB':>12} {'read ms':>8}")
+    print(f"{'JSON text (decode + re-encode)':<34} {text_file / 1e6:>8.2f} {text_raw / 1e6:>12.2f} {text_ms:>8.1f}")
+    print(f"{'zstd + dict (decode + re-encode)':<34} {zstd_file / 1e6:>8.2f} {zstd_raw / 1e6:>12.2f} {zstd_ms:>8.1f}")
+    print(f"{'zstd + dict (pass-through)':<34} {'':>8} {'':>12} {splice_ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
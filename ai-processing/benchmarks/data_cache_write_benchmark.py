@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark DataCache vessel writes: the previous per-row path against the batched WAL path
+The previous path (connection per call, rollback journal, one execute per row) is reproduced inline
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Run from anywhere inside the repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.data_cache import DataCache
+from services.record_codec import DICT_TRAIN_SAMPLES
+
+# The statement the previous path ran (no updated_ms; the column's default fills it)
+LEGACY_UPSERT_VESSEL_SQL = """
+    INSERT OR REPLACE INTO vessels 
+    (id, mmsi, name, latitude, longitude, speed, course, status, 
+     vessel_type, flag, data_source, raw_data, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+def make_vessels(count: int, rng: random.Random):
+    return [
+        {
+            "id": f"vessel_{i:06d}",
+            "mmsi": str(200000000 + i),
+            "name": f"Synthetic {i}",
+            "latitude": rng.uniform(-60, 70),
+            "longitude": rng.uniform(-180, 180),
+            "speed": round(rng.uniform(0, 22), 1),
+            "course": round(rng.uniform(0, 360), 1),
+            "status": rng.choice(["underway", "anchored", "moored"]),
+            "type": rng.choice(["container", "bulk", "tanker"]),
+            "flag": rng.choice(["PA", "LR", "MH", "SG"]),
+            "data_source": "Benchmark",
+        }
+        for i in range(count)
+    ]
+
+def legacy_cache_vessels(db_path: str, vessels) -> int:
+    """DataCache.cache_vessels before the batched write path"""
+    cached_count = 0
+    with sqlite3.connect(db_path) as conn:
+        for vessel in vessels:
+            conn.execute(LEGACY_UPSERT_VESSEL_SQL, (
+                vessel.get('id', f"vessel_{vessel.get('mmsi', 'unknown')}"),
+                vessel.get('mmsi'),
+                vessel.get('name'),
+                vessel.get('latitude'),
+                vessel.get('longitude'),
+                vessel.get('speed'),
+                vessel.get('course'),
+                vessel.get('status'),
+                vessel.get('type'),
+                vessel.get('flag'),
+                vessel.get('data_source', 'AIS Stream'),
+                json.dumps(vessel)
+            ))
+            cached_count += 1
+    return cached_count
+
+def warm_up_vessels():
+    # Enough records to train the raw_data dictionary, written untimed to both databases
+    return [{**vessel, "id": f"warmup_{i}"} for i, vessel in enumerate(make_vessels(DICT_TRAIN_SAMPLES, random.Random(0)))]
+
+def measure_legacy(directory: str, vessels, batch_size: int) -> float:
+    db_path = os.path.join(directory, "legacy.db")
+    cache = DataCache(db_path)
+    cache.close()
+    # Back to the rollback journal the old code ran with
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    legacy_cache_vessels(db_path, warm_up_vessels())
+    start = time.perf_counter()
+    for offset in range(0, len(vessels), batch_size):
+        legacy_cache_vessels(db_path, vessels[offset:offset + batch_size])
+    return time.perf_counter() - start
+
+def measure_batched(directory: str, vessels, batch_size: int) -> float:
+    cache = DataCache(os.path.join(directory, "batched.db"))
+    cache.cache_vessels(warm_up_vessels())
+    start = time.perf_counter()
+    for offset in range(0, len(vessels), batch_size):
+        cache.cache_vessels(vessels[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    cache.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Rows per cache call, as the write-behind queue delivers them")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"📊 DataCache.cache_vessels, {args.batch_size} rows per call")
+    print(f"{'rows':>8} {'before rows/s':>14} {'after rows/s':>14} {'speedup':>8}")
+    for size in args.sizes:
+        vessels = make_vessels(size, random.Random(args.seed))
+        with tempfile.TemporaryDirectory() as directory:
+            before = measure_legacy(directory, vessels, args.batch_size)
+            after = measure_batched(directory, vessels, args.batch_size)
+        print(f"{size:>8} {size / before:>14,.0f} {size / after:>14,.0f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
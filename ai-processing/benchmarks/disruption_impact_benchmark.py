@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized disruption impact engine against the scalar per-vessel check
+Default workload: 25,000 vessels x 250 disruptions
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Run from anywhere inside the repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from enhanced_real_data_api import is_vessel_impacted_by_disruptions
+from services.disruption_impact import compute_disruption_impacts
+
+def make_disruptions(count: int, rng: random.Random):
+    severities = ["low", "medium", "high", "critical"]
+    return [
+        {
+            "id": f"disruption_{i:04d}",
+            "title": f"Synthetic disruption {i}",
+            "status": rng.choice(["active", "active", "active", "resolved"]),
+            "severity": rng.choice(severities),
+            "coordinates": [rng.uniform(-60, 70), rng.uniform(-180, 180)],
+        }
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vessels", type=int, default=25000)
+    parser.add_argument("--disruptions", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lats = [rng.uniform(-70, 75) for _ in range(args.vessels)]
+    lons = [rng.uniform(-180, 180) for _ in range(args.vessels)]
+    disruptions = make_disruptions(args.disruptions, rng)
+
+    print(f"📊 {args.vessels} vessels x {args.disruptions} disruptions")
+
+    start = time.perf_counter()
+    scalar = [is_vessel_impacted_by_disruptions(lat, lon, disruptions, impact_radius_km=500)
+              for lat, lon in zip(lats, lons)]
+    scalar_s = time.perf_counter() - start
+    print(f"🐢 Scalar loop:      {scalar_s * 1000:10.1f} ms")
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = compute_disruption_impacts(lats, lons, disruptions, impact_radius_km=500)
+        timings.append(time.perf_counter() - start)
+    vector_s = min(timings)
+    print(f"🚀 Vectorized (best of {args.repeat}): {vector_s * 1000:6.1f} ms  ({scalar_s / vector_s:.0f}x faster)")
+
+    mismatches = sum(1 for a, b in zip(scalar, result.impacted) if a != bool(b))
+    print(f"🎯 Impacted vessels: {sum(scalar)} scalar / {int(result.impacted.sum())} vectorized, mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
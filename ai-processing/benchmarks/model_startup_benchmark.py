@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark model startup, inference latency and peak RSS per inference backend
+Each backend runs in a fresh interpreter so import time and memory are not shared
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Run from anywhere inside the repo
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def make_track(points: int = 24):
+    start = datetime(2025, 8, 22)
+    return [
+        {
+            "vessel_id": "bench",
+            "timestamp": (start + timedelta(hours=i)).isoformat(),
+            "latitude": 51.0 + i * 0.05,
+            "longitude": 1.5 + i * 0.08,
+            "speed": 14.0,
+            "heading": 65.0,
+            "vessel_type": "container",
+        }
+        for i in range(points)
+    ]
+
+async def time_predictions(predictor, track, repeat: int):
+    await predictor.predict(track)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await predictor.predict(track)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+def run_child(args) -> dict:
+    """Measure one backend inside this process"""
+    result = {"backend": args.child, "rss_baseline_mb": round(peak_rss_mb(), 1)}
+
+    start = time.perf_counter()
+    from models.vessel_prediction import VesselMovementPredictor
+    from utils.inference import tensorflow_loaded
+    result["import_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["rss_after_import_mb"] = round(peak_rss_mb(), 1)
+    result["tensorflow_after_import"] = tensorflow_loaded()
+
+    predictor = VesselMovementPredictor(os.path.join(args.model_dir, "vessel_prediction"))
+    start = time.perf_counter()
+    asyncio.run(predictor.load_model())
+    result["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["runtime"] = predictor.runtime.name
+    result["tensorflow_loaded"] = tensorflow_loaded()
+
+    timings = asyncio.run(time_predictions(predictor, make_track(), args.repeat))
+    result["predict_p50_ms"] = round(timings[len(timings) // 2], 2)
+    result["predict_p95_ms"] = round(timings[max(0, int(len(timings) * 0.95) - 1)], 2)
+    result["rss_peak_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+def spawn(backend: str, args) -> dict:
+    env = {**os.environ, "INFERENCE_BACKEND": backend, "USE_GPU": "false", "TF_CPP_MIN_LOG_LEVEL": "3"}
+    command = [sys.executable, os.path.abspath(__file__), "--child", backend,
+               "--model-dir", args.model_dir, "--repeat", str(args.repeat)]
+    completed = subprocess.run(command, env=env, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"backend": backend, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", default="tensorflow,tflite,onnx")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.model_dir = args.model_dir or tmp
+        rows = []
+        for backend in args.backends.split(","):
+            if backend != "tensorflow":
+                # First run exports the artifact (needs TensorFlow); the measured run only loads it
+                spawn(backend, args)
+            rows.append(spawn(backend, args))
+
+    print(f"📊 Vessel prediction model, {args.repeat} predictions per backend (CPU only)")
+    print(f"{'backend':<11} {'runtime':<11} {'import ms':>10} {'load ms':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'RSS import':>11} {'RSS peak':>9} {'TF loaded':>10}")
+    for row in rows:
+        if "error" in row:
+            print(f"{row['backend']:<11} ❌ {' '.join(row['error'])}")
+            continue
+        print(f"{row['backend']:<11} {row['runtime']:<11} {row['import_ms']:>10.1f} {row['load_ms']:>9.1f} "
+              f"{row['predict_p50_ms']:>8.2f} {row['predict_p95_ms']:>8.2f} "
+              f"{row['rss_after_import_mb']:>9.0f}MB {row['rss_peak_mb']:>7.0f}MB {str(row['tensorflow_loaded']):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,10 @@ Provides comprehensive datasets while connecting to authoritative sources
 Includes real-time AIS vessel data from AIS Stream
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import asyncio
 import httpx
 import json
@@ -20,49 +22,57 @@ import csv
 from io import StringIO
 import random
 import math
+import os
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import AIS Stream integration
-try:
+from services.service_container import ServiceContainer
+from services.vessel_snapshot import VesselSnapshotService
+from services.shared_snapshot import SharedSnapshotCoordinator
+from services.write_behind import WriteBehindQueue
+from services.vessel_store import VersionedVesselStore
+from services.live_updates import LiveUpdateHub, SubscriptionFilter
+from utils.geo import parse_bbox
+from services.disruption_impact import compute_disruption_impacts
+from services.request_coalescer import request_coalescer, single_flight
+from services.http_pool import http_pool
+from services.bdi_quote_service import bdi_quote_service
+from services.response_cache import response_cache, cached_response, negotiate_media_type, encode_json
+from utils.columnar import to_columnar
+from utils.projection import parse_fields, project_records
+from services.spatial_index import SpatialIndexCache, query_fingerprint, encode_cursor, decode_cursor
+from services.port_catalog import port_catalog
+from utils.deadlines import gather_with_deadlines
+from utils.timing import span, record, TimingMiddleware, PROMETHEUS_AVAILABLE
+from services.admission_control import AdmissionController, AdmissionMiddleware, PRIORITY_NORMAL, PRIORITY_LOW
+
+# Heavy components are built lazily (or concurrently during lifespan warm-up), not at import
+AIS_STREAM_API_KEY = os.getenv("AIS_STREAM_API_KEY", "7334566177a1515215529f311fb52613023efb11")
+
+def load_aisstream_integration():
     from services.aisstream_integration import initialize_aisstream_integration, get_real_aisstream_vessels
-    # Initialize with the provided API key
-    AIS_STREAM_API_KEY = "7334566177a1515215529f311fb52613023efb11"
     initialize_aisstream_integration(AIS_STREAM_API_KEY)
-    AIS_STREAM_AVAILABLE = True
-    logger.info("✅ AIS Stream integration initialized successfully")
-except ImportError as e:
-    logger.warning(f"⚠️ AIS Stream integration not available: {e}")
-    AIS_STREAM_AVAILABLE = False
-
-# Import Data Cache
-try:
-    from services.data_cache import data_cache
-    CACHE_AVAILABLE = True
-    logger.info("✅ Data cache initialized successfully")
-except ImportError as e:
-    logger.warning(f"⚠️ Data cache not available: {e}")
-    CACHE_AVAILABLE = False
-
-# Import ML Prediction Service
-try:
-    from services.ml_prediction_service import (
-        get_vessel_predictions, 
-        get_disruption_forecasts, 
-        get_economic_predictions,
-        ml_predictor
-    )
-    ML_PREDICTIONS_AVAILABLE = True
-    logger.info("✅ ML Prediction Service loaded successfully")
-except ImportError as e:
-    logger.warning(f"⚠️ ML Prediction Service not available: {e}")
-    ML_PREDICTIONS_AVAILABLE = False
-    get_vessel_predictions = None
-    get_disruption_forecasts = None
-    get_economic_predictions = None
-    ml_predictor = None
+    return get_real_aisstream_vessels
+
+def load_data_cache():
+    # Creates the SQLite tables on first import; reads go through the async facade's reader threads
+    from services.data_cache import async_data_cache
+    return async_data_cache
+
+def load_ml_prediction_service():
+    import services.ml_prediction_service as ml_prediction_service
+    return ml_prediction_service
+
+services = ServiceContainer()
+services.register("aisstream", load_aisstream_integration)
+services.register("data_cache", load_data_cache)
+services.register("ml_predictions", load_ml_prediction_service)
+
+# Used only by the vessel snapshot builder - follower workers skip them (see shared snapshot below)
+PRODUCER_ONLY_COMPONENTS = ("aisstream",)
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -103,12 +113,47 @@ def is_vessel_impacted_by_disruptions(vessel_lat, vessel_lon, disruptions, impac
                 radius = impact_radius_km  # 500km for medium/low
                 
             if distance <= radius:
-                logger.info(f"Vessel at [{vessel_lat}, {vessel_lon}] impacted by {disruption['title']} (distance: {distance:.0f}km)")
+                logger.debug(f"Vessel at [{vessel_lat}, {vessel_lon}] impacted by {disruption['title']} (distance: {distance:.0f}km)")
                 return True
     
     return False
 
-app = FastAPI(title="TradeWatch Enhanced Real Data API", version="2.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm components up concurrently in the background; /health reports 503 until done"""
+    components = None
+    if shared_snapshot is not None and not shared_snapshot.claim():
+        components = [name for name in services.names if name not in PRODUCER_ONLY_COMPONENTS]
+    warm_up = asyncio.create_task(services.warm_up(components))
+    yield
+    warm_up.cancel()
+    await vessel_snapshot_service.stop()
+    if shared_snapshot is not None:
+        await shared_snapshot.stop()
+    # Drain queued cache writes before the process exits
+    await asyncio.to_thread(cache_writer.close, CACHE_WRITE_CLOSE_TIMEOUT_SECONDS)
+    data_cache = services.peek("data_cache")
+    if data_cache is not None:
+        await data_cache.stop_maintenance()
+        await asyncio.to_thread(data_cache.close)
+    await bdi_quote_service.stop()
+    await http_pool.close()
+
+app = FastAPI(title="TradeWatch Enhanced Real Data API", version="2.1.0", lifespan=lifespan)
+
+# Admission control: model endpoints share one slot pool; everything else (health,
+# stats, snapshot-backed and cached reads) is never queued or shed
+ADMISSION_ML_MAX_CONCURRENT = int(os.getenv("ADMISSION_ML_MAX_CONCURRENT", "4"))
+ADMISSION_ML_MAX_QUEUE = int(os.getenv("ADMISSION_ML_MAX_QUEUE", "16"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "5"))
+admission = AdmissionController()
+admission.add_limit("ml", ADMISSION_ML_MAX_CONCURRENT, ADMISSION_ML_MAX_QUEUE, ADMISSION_MAX_WAIT_SECONDS)
+admission.route("/api/ml-predictions/comprehensive", "ml", PRIORITY_LOW)
+admission.route("/api/ml-predictions/", "ml", PRIORITY_NORMAL)
+admission.route("/api/ai-projections", "ml", PRIORITY_NORMAL)
+
+# Added before CORS so shed responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission)
 
 # Enable CORS
 app.add_middleware(
@@ -117,32 +162,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-# Async caching functions
-async def cache_vessels_async(vessels: List[Dict[str, Any]]):
-    """Cache vessels in background"""
-    try:
-        if CACHE_AVAILABLE:
-            data_cache.cache_vessels(vessels)
-    except Exception as e:
-        logger.warning(f"Background vessel caching failed: {e}")
+# Outermost, so Server-Timing `total` covers admission waits and CORS as well. One request
+# in TIMING_SAMPLE_EVERY is timed, which keeps cached reads within the 1% overhead budget;
+# responses faster than SERVER_TIMING_MIN_MS (cache hits) are only counted in /metrics.
+# Send "X-Server-Timing: 1" to always get the header when debugging a request
+TIMING_SAMPLE_EVERY = int(os.getenv("TIMING_SAMPLE_EVERY", "8"))
+SERVER_TIMING_MIN_MS = float(os.getenv("SERVER_TIMING_MIN_MS", "1"))
+app.add_middleware(TimingMiddleware, server_timing_min_seconds=SERVER_TIMING_MIN_MS / 1000,
+                   sample_every=TIMING_SAMPLE_EVERY)
 
-async def cache_disruptions_async(disruptions: List[Dict[str, Any]]):
-    """Cache disruptions in background"""
-    try:
-        if CACHE_AVAILABLE:
-            data_cache.cache_disruptions(disruptions)
-    except Exception as e:
-        logger.warning(f"Background disruption caching failed: {e}")
+# Fresh upstream records are written to the SQLite cache behind the request path:
+# merged by id, batched, and written through the data cache's writer thread off the event loop
+CACHE_WRITE_MAX_PENDING = int(os.getenv("CACHE_WRITE_MAX_PENDING", "10000"))
+CACHE_WRITE_BATCH_SIZE = int(os.getenv("CACHE_WRITE_BATCH_SIZE", "500"))
+CACHE_WRITE_FLUSH_SECONDS = float(os.getenv("CACHE_WRITE_FLUSH_SECONDS", "1"))
+CACHE_WRITE_CLOSE_TIMEOUT_SECONDS = float(os.getenv("CACHE_WRITE_CLOSE_TIMEOUT_SECONDS", "10"))
 
-async def cache_tariffs_async(tariffs: List[Dict[str, Any]]):
-    """Cache tariffs in background"""
-    try:
-        if CACHE_AVAILABLE:
-            data_cache.cache_tariffs(tariffs)
-    except Exception as e:
-        logger.warning(f"Background tariff caching failed: {e}")
+cache_writer = WriteBehindQueue(
+    "cache_writer",
+    max_pending=CACHE_WRITE_MAX_PENDING,
+    batch_size=CACHE_WRITE_BATCH_SIZE,
+    flush_interval=CACHE_WRITE_FLUSH_SECONDS
+)
+def cache_write(method: str):
+    # Runs on the queue's thread and hands each batch to the data cache's writer thread,
+    # which stays the only SQLite writer (it also runs maintenance)
+    def write(batch: List[Dict[str, Any]]) -> int:
+        data_cache = load_data_cache()
+        return data_cache.write_blocking(getattr(data_cache.sync, method), batch)
+    return write
+
+# Keys match the ids DataCache stores rows under, so merged records hit the same row
+cache_writer.register("vessels", cache_write("cache_vessels"),
+                      key=lambda vessel: vessel.get("id", f"vessel_{vessel.get('mmsi', 'unknown')}"))
+cache_writer.register("disruptions", cache_write("cache_disruptions"))
 
 # Enhanced vessel generation for thousands of vessels
 VESSEL_TYPES_ENHANCED = [
@@ -642,173 +698,537 @@ async def root():
         }
     }
 
-@app.get("/api/vessels")
-async def get_comprehensive_vessels(limit: int = 500):
-    """Get real vessel data from cache first, then live sources"""
-    try:
-        logger.info(f"Fetching {limit} vessel records...")
-        
-        vessels = []
-        data_sources = []
-        
-        # First try cache for fast response
-        if CACHE_AVAILABLE:
+async def build_enriched_vessels(limit: int) -> Dict[str, Any]:
+    """Fetch, validate and enrich vessels from cache and live sources (slow - runs off the request path)"""
+    logger.info(f"Building enriched vessel list for {limit} vessels...")
+    
+    vessels = []
+    data_sources = []
+    
+    # First try cache for fast response
+    data_cache = await services.get("data_cache")
+    if data_cache is not None:
+        try:
+            with span("cache_read"):
+                cached_vessels = await data_cache.get_cached_vessels(limit, max_age_hours=1)
+            if cached_vessels:
+                vessels.extend(cached_vessels)
+                data_sources.append("Cache (Recent)")
+                logger.info(f"✅ Retrieved {len(cached_vessels)} vessels from cache")
+        except Exception as e:
+            logger.warning(f"Cache retrieval failed: {e}")
+    
+    # If cache is empty or insufficient, fetch fresh data
+    if len(vessels) < min(limit, 50):  # Ensure we have at least some fresh data
+        get_real_aisstream_vessels = await services.get("aisstream")
+        if get_real_aisstream_vessels is not None:
             try:
-                cached_vessels = data_cache.get_cached_vessels(limit, max_age_hours=1)
-                if cached_vessels:
-                    vessels.extend(cached_vessels)
-                    data_sources.append("Cache (Recent)")
-                    logger.info(f"✅ Retrieved {len(cached_vessels)} vessels from cache")
-            except Exception as e:
-                logger.warning(f"Cache retrieval failed: {e}")
-        
-        # If cache is empty or insufficient, fetch fresh data
-        if len(vessels) < min(limit, 50):  # Ensure we have at least some fresh data
-            if AIS_STREAM_AVAILABLE:
-                try:
-                    # Request fresh data from AIS Stream (reduced amount for speed)
-                    ais_target = min(50, limit - len(vessels))  # Small amount for speed
+                # Request fresh data from AIS Stream (reduced amount for speed)
+                ais_target = min(50, limit - len(vessels))  # Small amount for speed
+                with span("ais_fetch"):
                     ais_vessels = await get_real_aisstream_vessels(ais_target)
-                    if ais_vessels:
-                        vessels.extend(ais_vessels)
-                        data_sources.append("AIS Stream (Real-time)")
-                        logger.info(f"✅ Fetched {len(ais_vessels)} fresh vessels from AIS Stream")
+                if ais_vessels:
+                    vessels.extend(ais_vessels)
+                    data_sources.append("AIS Stream (Real-time)")
+                    logger.info(f"✅ Fetched {len(ais_vessels)} fresh vessels from AIS Stream")
+                    
+                    # Cache the fresh data
+                    if data_cache is not None:
+                        cache_writer.submit("vessels", ais_vessels)
                         
-                        # Cache the fresh data
-                        if CACHE_AVAILABLE:
-                            asyncio.create_task(cache_vessels_async(ais_vessels))
-                            
-                except Exception as e:
-                    logger.warning(f"AIS Stream fetch failed: {e}")
-        
-        # Supplement with other AIS sources if needed
-        if len(vessels) < limit:
-            try:
-                from services.real_ais_integration import get_real_vessel_positions
-                remaining = limit - len(vessels)
-                additional_vessels = await get_real_vessel_positions(remaining)
-                if additional_vessels:
-                    vessels.extend(additional_vessels)
-                    data_sources.append("Maritime Route Intelligence")
-                    logger.info(f"✅ Fetched {len(additional_vessels)} additional vessels")
             except Exception as e:
-                logger.warning(f"Additional AIS sources failed: {e}")
-        
-        # If still not enough data, use enhanced generation as last resort
-        if len(vessels) < (limit * 0.1):  # If we have less than 10% of requested vessels
-            logger.warning("Insufficient real data - NO FAKE DATA will be generated")
-            # NO FAKE DATA GENERATION
-        
-        # Get current disruptions once for all vessels (performance optimization)
-        current_disruptions = []
+                logger.warning(f"AIS Stream fetch failed: {e}")
+    
+    # Supplement with other AIS sources if needed
+    if len(vessels) < limit:
         try:
-            from services.real_time_disruption_fetcher import get_real_time_disruptions
-            current_disruptions = await get_real_time_disruptions(limit=100)
-            logger.info(f"Fetched {len(current_disruptions)} disruptions for impact calculation")
+            from services.real_ais_integration import get_real_vessel_positions
+            remaining = limit - len(vessels)
+            with span("ais_supplement"):
+                additional_vessels = await get_real_vessel_positions(remaining)
+            if additional_vessels:
+                vessels.extend(additional_vessels)
+                data_sources.append("Maritime Route Intelligence")
+                logger.info(f"✅ Fetched {len(additional_vessels)} additional vessels")
         except Exception as e:
-            logger.warning(f"Could not fetch disruptions for impact calculation: {e}")
-        
-        # Validate and sanitize all vessel data before returning
-        validated_vessels = []
-        for vessel in vessels[:limit]:
-            # Skip vessels with invalid coordinates (null, undefined, or over land)
-            lat = vessel.get('lat') or vessel.get('latitude')
-            lon = vessel.get('lon') or vessel.get('longitude')
+            logger.warning(f"Additional AIS sources failed: {e}")
+    
+    # If still not enough data, use enhanced generation as last resort
+    if len(vessels) < (limit * 0.1):  # If we have less than 10% of requested vessels
+        logger.warning("Insufficient real data - NO FAKE DATA will be generated")
+        # NO FAKE DATA GENERATION
+    
+    # Get current disruptions once for all vessels (performance optimization)
+    current_disruptions = []
+    try:
+        from services.real_time_disruption_fetcher import get_real_time_disruptions
+        with span("disruption_fetch"):
+            current_disruptions = await get_real_time_disruptions(limit=100)
+        logger.info(f"Fetched {len(current_disruptions)} disruptions for impact calculation")
+    except Exception as e:
+        logger.warning(f"Could not fetch disruptions for impact calculation: {e}")
+    
+    # Validate and sanitize all vessel data before returning
+    validation_start = time.perf_counter()
+    validated_vessels = []
+    vessel_lats = []
+    vessel_lons = []
+    for vessel in vessels[:limit]:
+        # Skip vessels with invalid coordinates (null, undefined, or over land)
+        lat = vessel.get('lat') or vessel.get('latitude')
+        lon = vessel.get('lon') or vessel.get('longitude')
+        
+        if lat is None or lon is None:
+            logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - missing coordinates")
+            continue
             
-            if lat is None or lon is None:
-                logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - missing coordinates")
+        # Validate coordinates are within reasonable maritime bounds
+        try:
+            lat_float = float(lat)
+            lon_float = float(lon)
+            
+            if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
+                logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - invalid coordinates: {lat}, {lon}")
                 continue
                 
-            # Validate coordinates are within reasonable maritime bounds
-            try:
-                lat_float = float(lat)
-                lon_float = float(lon)
-                
-                if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
-                    logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - invalid coordinates: {lat}, {lon}")
-                    continue
-                    
-                # Ensure coordinates are set consistently
-                vessel['lat'] = lat_float
-                vessel['lon'] = lon_float
-                vessel['latitude'] = lat_float
-                vessel['longitude'] = lon_float
-                
-            except (ValueError, TypeError):
-                logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - invalid coordinate format: {lat}, {lon}")
-                continue
-            
-            # Ensure DWT is never null - set to 0 if missing/null
-            if vessel.get('dwt') is None or vessel.get('dwt') == 'null':
-                vessel['dwt'] = 0
-            
-            # Ensure other critical fields are safe
-            if vessel.get('imo') is None:
-                vessel['imo'] = None  # Explicitly set to None for JSON serialization
-            if vessel.get('flag') is None:
-                vessel['flag'] = None
-            if vessel.get('operator') is None:
-                vessel['operator'] = None
+            # Enrich a copy: fetched records are shared with the coalesced fetch
+            # results and caches they came from
+            vessel = dict(vessel)
+            # Ensure coordinates are set consistently
+            vessel['lat'] = lat_float
+            vessel['lon'] = lon_float
+            vessel['latitude'] = lat_float
+            vessel['longitude'] = lon_float
             
-            # Calculate if vessel is impacted by disruptions
-            try:
-                # Check if vessel is impacted by any active disruptions
-                vessel_impacted = is_vessel_impacted_by_disruptions(
-                    lat_float, lon_float, current_disruptions, impact_radius_km=500
-                )
-                vessel['impacted'] = vessel_impacted
-                
-                # Set risk level and priority based on impact (override existing values)
-                if vessel_impacted:
-                    vessel['riskLevel'] = 'High'
-                    vessel['priority'] = 'High' 
-                else:
-                    vessel['riskLevel'] = vessel.get('riskLevel', 'Low')
-                    vessel['priority'] = vessel.get('priority', 'Medium')
-                    
-            except Exception as disruption_error:
-                logger.debug(f"Could not calculate disruption impact for vessel {vessel.get('id', 'unknown')}: {disruption_error}")
-                # Default to not impacted if calculation fails
-                vessel['impacted'] = False
-                vessel['riskLevel'] = vessel.get('riskLevel', 'Low')
-                vessel['priority'] = vessel.get('priority', 'Medium')
-                
-            validated_vessels.append(vessel)
-        
-        # Apply global distribution for realistic coverage
-        try:
-            from services.global_vessel_distribution import get_global_vessel_distribution
-            logger.info(f"Applying global distribution to {len(validated_vessels)} real vessels")
+        except (ValueError, TypeError):
+            logger.debug(f"Skipping vessel {vessel.get('id', 'unknown')} - invalid coordinate format: {lat}, {lon}")
+            continue
+        
+        # Ensure DWT is never null - set to 0 if missing/null
+        if vessel.get('dwt') is None or vessel.get('dwt') == 'null':
+            vessel['dwt'] = 0
+        
+        # Ensure other critical fields are safe
+        if vessel.get('imo') is None:
+            vessel['imo'] = None  # Explicitly set to None for JSON serialization
+        if vessel.get('flag') is None:
+            vessel['flag'] = None
+        if vessel.get('operator') is None:
+            vessel['operator'] = None
+        
+        validated_vessels.append(vessel)
+        vessel_lats.append(lat_float)
+        vessel_lons.append(lon_float)
+    record("validation", time.perf_counter() - validation_start)
+    
+    # Calculate disruption impact for all vessels in one vectorized pass
+    try:
+        with span("disruption_impact"):
+            impacts = compute_disruption_impacts(vessel_lats, vessel_lons, current_disruptions, impact_radius_km=500)
+    except Exception as disruption_error:
+        logger.warning(f"Could not calculate disruption impact: {disruption_error}")
+        impacts = None
+    
+    for i, vessel in enumerate(validated_vessels):
+        vessel_impacted = bool(impacts.impacted[i]) if impacts is not None else False
+        vessel['impacted'] = vessel_impacted
+        
+        if impacts is not None and impacts.nearest_index[i] >= 0:
+            vessel['nearest_disruption_id'] = impacts.nearest_id(i)
+            vessel['nearest_disruption_km'] = round(float(impacts.nearest_distance_km[i]), 1)
+        
+        # Set risk level and priority based on impact (override existing values)
+        if vessel_impacted:
+            vessel['riskLevel'] = 'High'
+            vessel['priority'] = 'High' 
+        else:
+            vessel['riskLevel'] = vessel.get('riskLevel', 'Low')
+            vessel['priority'] = vessel.get('priority', 'Medium')
+    
+    if impacts is not None:
+        logger.info(f"{int(impacts.impacted.sum())} of {len(validated_vessels)} vessels impacted by {len(impacts.disruption_ids)} active disruptions")
+    
+    # Apply global distribution for realistic coverage
+    try:
+        from services.global_vessel_distribution import get_global_vessel_distribution
+        logger.info(f"Applying global distribution to {len(validated_vessels)} real vessels")
+        with span("global_distribution"):
             validated_vessels = await get_global_vessel_distribution(validated_vessels, limit)
-            data_sources.append("Global Maritime Distribution")
-        except Exception as e:
-            logger.warning(f"Global distribution failed: {e}")
-            logger.info(f"Returning {len(validated_vessels)} vessels without global distribution")
-        
+        data_sources.append("Global Maritime Distribution")
+    except Exception as e:
+        logger.warning(f"Global distribution failed: {e}")
+        logger.info(f"Returning {len(validated_vessels)} vessels without global distribution")
+    
+    return {
+        "vessels": validated_vessels[:limit],
+        "data_sources": data_sources,
+        "disruptions": current_disruptions
+    }
+
+# Background-refreshed fleet snapshot behind /api/vessels
+VESSEL_SNAPSHOT_CAPACITY = int(os.getenv("VESSEL_SNAPSHOT_CAPACITY", "3000"))
+VESSEL_SNAPSHOT_REFRESH_SECONDS = float(os.getenv("VESSEL_SNAPSHOT_REFRESH_SECONDS", "60"))
+
+vessel_snapshot_service = VesselSnapshotService(
+    build_enriched_vessels,
+    capacity=VESSEL_SNAPSHOT_CAPACITY,
+    refresh_interval=VESSEL_SNAPSHOT_REFRESH_SECONDS,
+)
+
+# Versioned per-vessel view of the snapshot for delta polling and live push
+vessel_store = VersionedVesselStore()
+live_update_hub = LiveUpdateHub()
+
+# Grid index over the current snapshot for bbox/type/speed queries
+VESSEL_INDEX_RESOLUTION_DEGREES = float(os.getenv("VESSEL_INDEX_RESOLUTION_DEGREES", "1.0"))
+VESSEL_CLUSTER_MAX_ZOOM = int(os.getenv("VESSEL_CLUSTER_MAX_ZOOM", "11"))
+vessel_index_cache = SpatialIndexCache(
+    resolution=VESSEL_INDEX_RESOLUTION_DEGREES,
+    max_cluster_zoom=VESSEL_CLUSTER_MAX_ZOOM
+)
+
+def on_vessel_snapshot(snapshot):
+    """Diff each new snapshot into the store and push the changes to live subscribers"""
+    index = vessel_index_cache.index_for(snapshot)
+    index.clusters()
+    index.spherical()
+    change = vessel_store.apply_snapshot(snapshot.vessels, version=snapshot.version)
+    live_update_hub.publish_vessel_changes(
+        change.version,
+        (vessel_store.get(vessel_id) for vessel_id in change.upserted),
+        change.removed
+    )
+    live_update_hub.publish_disruptions(snapshot.disruptions)
+
+vessel_snapshot_service.add_listener(on_vessel_snapshot)
+
+# With several uvicorn workers, one worker builds the snapshot (and runs every upstream
+# fetch behind it) and shares it through a memory-mapped file; the others adopt it
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+VESSEL_SNAPSHOT_SHARED_PATH = os.getenv(
+    "VESSEL_SNAPSHOT_SHARED_PATH",
+    "/dev/shm/tradewatch/vessel_snapshot.bin" if API_WORKERS > 1 else ""
+)
+VESSEL_SNAPSHOT_SHARED_POLL_SECONDS = float(os.getenv("VESSEL_SNAPSHOT_SHARED_POLL_SECONDS", "1"))
+shared_snapshot = SharedSnapshotCoordinator(
+    vessel_snapshot_service,
+    VESSEL_SNAPSHOT_SHARED_PATH,
+    poll_interval=VESSEL_SNAPSHOT_SHARED_POLL_SECONDS
+) if VESSEL_SNAPSHOT_SHARED_PATH else None
+
+WARMUP_SNAPSHOT_TIMEOUT_SECONDS = float(os.getenv("WARMUP_SNAPSHOT_TIMEOUT_SECONDS", "60"))
+
+async def warm_vessel_snapshot():
+    """Start the snapshot refresh loop (or follow the shared producer) and wait (bounded) for the first fleet
+
+    If the first build outlasts the timeout the component is reported failed
+    until a snapshot lands, then marked ready.
+    """
+    vessel_snapshot_service.add_listener(
+        lambda snapshot: services.mark_ready("vessel_snapshot", vessel_snapshot_service)
+    )
+    if shared_snapshot is not None:
+        await shared_snapshot.start()
+    else:
+        await vessel_snapshot_service.start()
+    await asyncio.wait_for(vessel_snapshot_service.get_snapshot(), WARMUP_SNAPSHOT_TIMEOUT_SECONDS)
+    return vessel_snapshot_service
+
+async def start_bdi_quotes():
+    await bdi_quote_service.start()
+    return bdi_quote_service
+
+async def start_cache_maintenance():
+    """TTL eviction, size bound and incremental VACUUM of the SQLite cache, in the background"""
+    data_cache = await services.get("data_cache")
+    if data_cache is None:
+        raise RuntimeError("data cache not available")
+    await data_cache.start_maintenance()
+    return data_cache
+
+services.register("vessel_snapshot", warm_vessel_snapshot)
+services.register("bdi_quotes", start_bdi_quotes)
+services.register("cache_maintenance", start_cache_maintenance)
+
+EMPTY_VESSEL_PAYLOAD_SOURCE = "REAL DATA ONLY - All sources failed"
+
+def build_vessel_payload(snapshot, limit: int, fields=None) -> Dict[str, Any]:
+    """Response body for one snapshot - depends only on the snapshot so it can be cached by version"""
+    vessels = project_records(snapshot.vessels[:limit], fields)
+    payload = {
+        "vessels": vessels,
+        "total": len(vessels),
+        "limit": limit,
+        "data_source": snapshot.data_source,
+        "real_data_percentage": snapshot.real_data_percentage,
+        "timestamp": snapshot.built_at.isoformat(),
+        "snapshot_version": snapshot.version,
+        "snapshot_built_at": snapshot.built_at.isoformat()
+    }
+    if fields is not None:
+        payload["fields"] = list(fields)
+    return payload
+
+def empty_vessel_payload(limit: int) -> Dict[str, Any]:
+    # NO FAKE DATA FALLBACK
+    logger.error("All real data sources failed - returning empty result (NO FAKE DATA)")
+    return {
+        "vessels": [],
+        "total": 0,
+        "limit": limit,
+        "data_source": EMPTY_VESSEL_PAYLOAD_SOURCE,
+        "real_data_percentage": 0,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def snapshot_headers(snapshot) -> Dict[str, str]:
+    return {
+        "Age": str(int(snapshot.age_seconds)),
+        "X-Snapshot-Version": str(snapshot.version),
+        "X-Snapshot-Stale": "true" if vessel_snapshot_service.is_stale(snapshot) else "false"
+    }
+
+VESSEL_PAYLOAD_FORMATS = ("rows", "columnar")
+
+def apply_vessel_format(payload: Dict[str, Any], payload_format: str) -> Dict[str, Any]:
+    """Swap the vessel list for one array per field when format=columnar"""
+    if payload_format != "columnar":
+        return payload
+    payload = dict(payload)
+    payload["format"] = "columnar"
+    payload["columns"] = to_columnar(payload.pop("vessels"))
+    return payload
+
+async def get_vessel_payload(limit: int = 500) -> Dict[str, Any]:
+    """Vessel payload as a dict for internal callers (ML predictions, diagnostics)"""
+    try:
+        snapshot = await vessel_snapshot_service.get_snapshot()
         return {
-            "vessels": validated_vessels[:limit],  # Ensure we don't exceed the limit
-            "total": len(validated_vessels[:limit]),
-            "limit": limit,
-            "data_source": " + ".join(data_sources) if data_sources else "Enhanced Generation",
-            "real_data_percentage": min(100, (len([v for v in validated_vessels if "ais_stream" in v.get("id", "")]) / len(validated_vessels)) * 100) if validated_vessels else 0,
-            "timestamp": datetime.now().isoformat()
+            **build_vessel_payload(snapshot, limit),
+            "snapshot_age_seconds": round(snapshot.age_seconds, 1),
+            "stale": vessel_snapshot_service.is_stale(snapshot)
         }
-        
     except Exception as e:
         logger.error(f"Error fetching real vessel data: {e}")
-        # NO FAKE DATA FALLBACK
-        logger.error("All real data sources failed - returning empty result (NO FAKE DATA)")
-        return {
-            "vessels": [],
-            "total": 0,
-            "limit": limit,
-            "data_source": "REAL DATA ONLY - All sources failed",
-            "real_data_percentage": 0,
-            "timestamp": datetime.now().isoformat()
-        }
+        return empty_vessel_payload(limit)
 
-@app.get("/api/tariffs")
-async def get_real_tariffs_endpoint(limit: int = 500):
+def build_filtered_vessel_payload(snapshot, limit: int, bbox: Optional[str], types: Optional[str],
+                                  min_speed: Optional[float], cursor: Optional[str], fields=None) -> Dict[str, Any]:
+    """
+    Vessels matching bbox/types/min_speed from the snapshot's grid index, in id order
+
+    Raises:
+        ValueError: for a malformed bbox or a cursor issued for other filters
+    """
+    subscription = parse_subscription_filter(bbox, types)
+    fingerprint = query_fingerprint(subscription.bbox, subscription.types, min_speed)
+    after_id = decode_cursor(cursor, fingerprint) if cursor else None
+    
+    index = vessel_index_cache.index_for(snapshot)
+    vessels, last_id = index.query(
+        bbox=subscription.bbox,
+        types=subscription.types,
+        min_speed=min_speed,
+        after_id=after_id,
+        limit=limit,
+        fields=fields
+    )
+    return {
+        **build_vessel_payload(snapshot, 0, fields),
+        "vessels": vessels,
+        "total": len(vessels),
+        "limit": limit,
+        "bbox": subscription.bbox.as_list() if subscription.bbox else None,
+        "next_cursor": encode_cursor(last_id, fingerprint) if last_id is not None else None
+    }
+
+@app.get("/api/vessels")
+async def get_comprehensive_vessels(request: Request, limit: int = 500, bbox: Optional[str] = None,
+                                    types: Optional[str] = None, min_speed: Optional[float] = None,
+                                    cursor: Optional[str] = None, format: str = "rows",
+                                    fields: Optional[str] = None):
+    """
+    Get enriched vessel data from the in-memory fleet snapshot (pre-serialized per version)
+    
+    bbox ("west,south,east,north"), types (comma list) and min_speed (knots) narrow the
+    result via a grid index; filtered results are ordered by vessel id and paginated with
+    the opaque `next_cursor`, which stays valid across snapshot refreshes.
+    
+    format=columnar sends one array per field instead of one object per vessel, and
+    "Accept: application/msgpack" switches either layout to MessagePack; columnar
+    MessagePack is the smallest and the recommended layout for full-fleet clients. fields
+    (comma list) projects each vessel record; projections are built once per field set and version.
+    """
+    if format not in VESSEL_PAYLOAD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(VESSEL_PAYLOAD_FORMATS)}")
+    media_type = negotiate_media_type(request)
+    fieldset = parse_fields(fields)
+    
+    try:
+        with span("snapshot"):
+            snapshot = await vessel_snapshot_service.get_snapshot()
+    except Exception as e:
+        logger.error(f"Error fetching real vessel data: {e}")
+        return JSONResponse(empty_vessel_payload(limit))
+    
+    headers = {**snapshot_headers(snapshot), "Vary": "Accept, Accept-Encoding"}
+    
+    if bbox or types or min_speed is not None or cursor:
+        try:
+            with span("index_query"):
+                payload = build_filtered_vessel_payload(snapshot, limit, bbox, types, min_speed, cursor, fieldset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Viewports rarely repeat, so encode for this response only
+        encoded = response_cache.put(None, apply_vessel_format(payload, format), store=False, media_type=media_type)
+        return await cached_response(request, encoded, headers=headers)
+    
+    # Every limit past the snapshot size gives the same body; keep one entry for them
+    limit = max(0, min(limit, len(snapshot.vessels)))
+    cache_key = ("vessels", limit, format, media_type, fieldset)
+    encoded = response_cache.get(cache_key, snapshot.version)
+    if encoded is None:
+        with span("build_payload"):
+            payload = apply_vessel_format(build_vessel_payload(snapshot, limit, fieldset), format)
+        encoded = response_cache.put(
+            cache_key,
+            payload,
+            version=snapshot.version,
+            media_type=media_type
+        )
+    return await cached_response(request, encoded, headers=headers)
+
+async def require_snapshot():
+    """Current fleet snapshot for endpoints that cannot answer without one; 503 if none could be built"""
+    try:
+        return await vessel_snapshot_service.get_snapshot()
+    except Exception as e:
+        logger.error(f"Error fetching real vessel data: {e}")
+        raise HTTPException(status_code=503, detail="Vessel snapshot not available")
+
+@app.get("/api/vessels/clusters")
+async def get_vessel_clusters(request: Request, z: int = 2, bbox: Optional[str] = None, limit: int = 2000,
+                              fields: Optional[str] = None):
+    """
+    Get per-cell vessel aggregates for a map zoom level
+    
+    Up to VESSEL_CLUSTER_MAX_ZOOM each cell reports count, centroid, dominant type and
+    impacted count; above it the individual vessels in bbox are returned (up to `limit`,
+    projected to `fields` when given).
+    """
+    try:
+        viewport = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    snapshot = await require_snapshot()
+    index = vessel_index_cache.index_for(snapshot)
+    payload = {
+        "zoom": z,
+        "bbox": viewport.as_list() if viewport else None,
+        "snapshot_version": snapshot.version,
+        "timestamp": snapshot.built_at.isoformat()
+    }
+    
+    if z > VESSEL_CLUSTER_MAX_ZOOM:
+        vessels, last_id = index.query(bbox=viewport, limit=limit, fields=parse_fields(fields))
+        payload.update({"mode": "vessels", "vessels": vessels, "total": len(vessels),
+                        "truncated": last_id is not None})
+    else:
+        pyramid = index.clusters()
+        clusters = pyramid.clusters(z, viewport)
+        payload.update({
+            "mode": "clusters",
+            "cell_degrees": pyramid.level_for(z).cell_degrees,
+            "clusters": clusters,
+            "total": sum(cluster["count"] for cluster in clusters)
+        })
+    
+    encoded = response_cache.put(None, payload, store=False)
+    return await cached_response(request, encoded, headers=snapshot_headers(snapshot))
+
+@app.get("/api/vessels/changes")
+async def get_vessel_changes(since: int = 0):
+    """Get vessels upserted or removed since a store version (full snapshot if it was compacted away)"""
+    if len(vessel_store) == 0:
+        await vessel_snapshot_service.get_snapshot()
+    
+    changes = vessel_store.changes_since(since)
+    return {
+        **changes,
+        "since": since,
+        "total": len(vessel_store),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def parse_subscription_filter(bbox=None, types=None) -> SubscriptionFilter:
+    """Build a live subscription filter from bbox ("w,s,e,n" or list) and types (comma list or list)"""
+    if isinstance(types, str):
+        types = [t.strip() for t in types.split(",") if t.strip()]
+    return SubscriptionFilter(
+        bbox=parse_bbox(bbox),
+        types=frozenset(types) if types else None
+    )
+
+@app.websocket("/ws/live")
+async def live_updates_socket(websocket: WebSocket, bbox: Optional[str] = None, types: Optional[str] = None):
+    """
+    Push vessel position diffs and new disruptions
+
+    Clients may narrow the feed at any time by sending {"bbox": [w, s, e, n], "types": [...]};
+    each (re)subscription starts with a full "snapshot" frame for the filter.
+    """
+    await websocket.accept()
+    subscriber = live_update_hub.subscribe(websocket.send_text, websocket.close)
+    sender = asyncio.create_task(subscriber.run_sender())
+    
+    try:
+        if len(vessel_store) == 0:
+            await vessel_snapshot_service.get_snapshot()
+        
+        subscription = {"bbox": bbox, "types": types}
+        while True:
+            try:
+                subscriber.filter = parse_subscription_filter(subscription.get("bbox"), subscription.get("types"))
+                subscriber.reset_with(
+                    live_update_hub.initial_frame(subscriber.filter, vessel_store.version, vessel_store.values())
+                )
+            except ValueError as e:
+                subscriber.enqueue({"type": "error", "detail": str(e)})
+            
+            message = await websocket.receive_text()
+            try:
+                subscription = json.loads(message)
+            except ValueError:
+                subscription = None
+            if not isinstance(subscription, dict):
+                subscriber.enqueue({"type": "error", "detail": "subscription must be a JSON object"})
+                subscription = {"bbox": subscriber.filter.bbox and subscriber.filter.bbox.as_list(),
+                                "types": subscriber.filter.types and list(subscriber.filter.types)}
+            
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Live update socket closed: {e}")
+    finally:
+        live_update_hub.unsubscribe(subscriber)
+        sender.cancel()
+
+TARIFF_RESPONSE_TTL_SECONDS = float(os.getenv("TARIFF_RESPONSE_TTL_SECONDS", "300"))
+
+# Largest tariff page served; larger limits are clamped so they share one cache entry
+MAX_TARIFF_LIMIT = int(os.getenv("MAX_TARIFF_LIMIT", "500"))
+
+DISRUPTION_RESPONSE_TTL_SECONDS = float(os.getenv("DISRUPTION_RESPONSE_TTL_SECONDS", "60"))
+
+def project_payload(payload: Dict[str, Any], list_key: str, fields) -> Dict[str, Any]:
+    """Shallow copy of a list payload with its records projected to `fields`"""
+    if fields is None:
+        return payload
+    return {**payload, list_key: project_records(payload[list_key], fields), "fields": list(fields)}
+
+@single_flight(ttl_seconds=TARIFF_RESPONSE_TTL_SECONDS)
+async def fetch_tariff_payload(limit: int = 500) -> Dict[str, Any]:
     """Get real tariff data from official government APIs - NO HARDCODING"""
     try:
         logger.info(f"Fetching {limit} REAL tariff records from government APIs...")
@@ -849,8 +1269,52 @@ async def get_real_tariffs_endpoint(limit: int = 500):
             "error": "API connection failed - no fallback to fake data"
         }
 
-@app.get("/api/maritime-disruptions")
-async def get_comprehensive_disruptions():
+@app.get("/api/tariffs")
+async def get_real_tariffs_endpoint(request: Request, limit: int = 500, fields: Optional[str] = None):
+    """
+    Get real tariff data, serving the serialized payload for TARIFF_RESPONSE_TTL_SECONDS
+    
+    fields (comma list) projects each tariff record; every field set is cached separately
+    but shares one upstream fetch.
+    """
+    fieldset = parse_fields(fields)
+    limit = max(1, min(limit, MAX_TARIFF_LIMIT))
+    cache_key = ("tariffs", limit, fieldset)
+    encoded = response_cache.get(cache_key)
+    if encoded is None:
+        payload = await fetch_tariff_payload(limit)
+        if not payload["tariffs"]:
+            # Never pin an empty/error response in either cache
+            request_coalescer.invalidate("fetch_tariff_payload")
+        encoded = response_cache.put(cache_key, project_payload(payload, "tariffs", fieldset),
+                                     ttl_seconds=TARIFF_RESPONSE_TTL_SECONDS, store=bool(payload["tariffs"]))
+    return await cached_response(request, encoded)
+
+# Cached disruptions alone answer a request once there are this many; below it fresh ones are fetched too
+MIN_CACHED_DISRUPTIONS = 20
+
+async def cached_disruptions_body() -> Optional[bytes]:
+    """Disruptions response body spliced from the cache's stored JSON (no dicts built), or None when the cache is not enough"""
+    data_cache = await services.get("data_cache")
+    if data_cache is None:
+        return None
+    try:
+        cached = await data_cache.get_cached_disruptions_json(limit=100, max_age_hours=2)
+    except Exception as e:
+        logger.warning(f"Cache retrieval failed: {e}")
+        return None
+    if cached.count < MIN_CACHED_DISRUPTIONS:
+        return None
+    envelope = encode_json({
+        "total": cached.count,
+        "data_source": "Cache (Recent)",
+        "status": "Active disruptions found",
+        "last_updated": datetime.now().isoformat()
+    })
+    return b'{"disruptions":' + cached.body + b"," + envelope[1:]
+
+@single_flight(ttl_seconds=DISRUPTION_RESPONSE_TTL_SECONDS)
+async def fetch_disruption_payload() -> Dict[str, Any]:
     """Get comprehensive maritime disruption records from cache first, then real-time APIs"""
     try:
         logger.info("Fetching maritime disruptions...")
@@ -859,9 +1323,10 @@ async def get_comprehensive_disruptions():
         data_sources = []
         
         # First try cache for fast response
-        if CACHE_AVAILABLE:
+        data_cache = await services.get("data_cache")
+        if data_cache is not None:
             try:
-                cached_disruptions = data_cache.get_cached_disruptions(limit=100, max_age_hours=2)
+                cached_disruptions = await data_cache.get_cached_disruptions(limit=100, max_age_hours=2)
                 if cached_disruptions:
                     disruptions.extend(cached_disruptions)
                     data_sources.append("Cache (Recent)")
@@ -870,7 +1335,7 @@ async def get_comprehensive_disruptions():
                 logger.warning(f"Cache retrieval failed: {e}")
         
         # If cache is empty or insufficient, fetch fresh data (but limit to prevent timeout)
-        if len(disruptions) < 20:  # Ensure we have at least some fresh data
+        if len(disruptions) < MIN_CACHED_DISRUPTIONS:  # Ensure we have at least some fresh data
             try:
                 # Import the real-time disruption fetcher
                 from services.real_time_disruption_fetcher import get_real_time_disruptions
@@ -886,8 +1351,8 @@ async def get_comprehensive_disruptions():
                     logger.info(f"✅ Fetched {len(fresh_disruptions)} fresh disruptions")
                     
                     # Cache the fresh data in background
-                    if CACHE_AVAILABLE:
-                        asyncio.create_task(cache_disruptions_async(fresh_disruptions))
+                    if data_cache is not None:
+                        cache_writer.submit("disruptions", fresh_disruptions)
                         
             except Exception as e:
                 logger.warning(f"Fresh disruptions fetch failed: {e}")
@@ -920,85 +1385,117 @@ async def get_comprehensive_disruptions():
         logger.error(f"Error fetching real-time disruptions: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch real-time disruption data")
 
+@app.get("/api/maritime-disruptions")
+async def get_comprehensive_disruptions(request: Request, fields: Optional[str] = None):
+    """
+    Get maritime disruptions, serving the serialized payload for DISRUPTION_RESPONSE_TTL_SECONDS
+    
+    fields (comma list) projects each disruption record, e.g. fields=id,title,coordinates,severity
+    """
+    fieldset = parse_fields(fields)
+    cache_key = ("disruptions", fieldset)
+    encoded = response_cache.get(cache_key)
+    if encoded is None and fieldset is None:
+        body = await cached_disruptions_body()
+        if body is not None:
+            encoded = response_cache.put_bytes(cache_key, body, ttl_seconds=DISRUPTION_RESPONSE_TTL_SECONDS)
+    if encoded is None:
+        payload = await fetch_disruption_payload()
+        if not payload["disruptions"]:
+            request_coalescer.invalidate("fetch_disruption_payload")
+        encoded = response_cache.put(cache_key, project_payload(payload, "disruptions", fieldset),
+                                     ttl_seconds=DISRUPTION_RESPONSE_TTL_SECONDS, store=bool(payload["disruptions"]))
+    return await cached_response(request, encoded)
+
+MAX_PORT_RADIUS_KM = 2000
+MAX_NEAREST_PORTS = 50
+
 @app.get("/api/ports")
-async def get_comprehensive_ports(limit: int = 200):
-    """Get comprehensive global port data"""
-    try:
-        logger.info(f"Generating {limit} comprehensive port records...")
-        
-        # Major global ports with strategic importance
-        major_ports = [
-            {"name": "Shanghai", "country": "China", "coords": [31.2304, 121.4737], "strategic_importance": 100, "annual_teu": 47030000},
-            {"name": "Singapore", "country": "Singapore", "coords": [1.2921, 103.8519], "strategic_importance": 95, "annual_teu": 37240000},
-            {"name": "Ningbo-Zhoushan", "country": "China", "coords": [29.8683, 121.544], "strategic_importance": 90, "annual_teu": 33350000},
-            {"name": "Shenzhen", "country": "China", "coords": [22.5431, 114.0579], "strategic_importance": 88, "annual_teu": 30000000},
-            {"name": "Guangzhou", "country": "China", "coords": [23.1291, 113.2644], "strategic_importance": 85, "annual_teu": 25230000},
-            {"name": "Busan", "country": "South Korea", "coords": [35.1796, 129.0756], "strategic_importance": 82, "annual_teu": 22990000},
-            {"name": "Hong Kong", "country": "Hong Kong", "coords": [22.3193, 114.1694], "strategic_importance": 88, "annual_teu": 18000000},
-            {"name": "Qingdao", "country": "China", "coords": [36.0986, 120.3719], "strategic_importance": 80, "annual_teu": 24000000},
-            {"name": "Los Angeles", "country": "United States", "coords": [33.7406, -118.2484], "strategic_importance": 85, "annual_teu": 10700000},
-            {"name": "Long Beach", "country": "United States", "coords": [33.7701, -118.1937], "strategic_importance": 83, "annual_teu": 8100000},
-            {"name": "Rotterdam", "country": "Netherlands", "coords": [51.9244, 4.4777], "strategic_importance": 90, "annual_teu": 15300000},
-            {"name": "Antwerp", "country": "Belgium", "coords": [51.2194, 4.4025], "strategic_importance": 85, "annual_teu": 12040000},
-            {"name": "Hamburg", "country": "Germany", "coords": [53.5511, 9.9937], "strategic_importance": 82, "annual_teu": 8700000},
-            {"name": "Dubai", "country": "UAE", "coords": [25.2769, 55.2962], "strategic_importance": 88, "annual_teu": 15300000},
-            {"name": "New York-New Jersey", "country": "United States", "coords": [40.6892, -74.0445], "strategic_importance": 85, "annual_teu": 7800000},
-            {"name": "Tanjung Pelepas", "country": "Malaysia", "coords": [1.3644, 103.5490], "strategic_importance": 78, "annual_teu": 9100000},
-            {"name": "Laem Chabang", "country": "Thailand", "coords": [13.0827, 100.9170], "strategic_importance": 75, "annual_teu": 8000000},
-            {"name": "Valencia", "country": "Spain", "coords": [39.4699, -0.3763], "strategic_importance": 75, "annual_teu": 5600000},
-            {"name": "Kaohsiung", "country": "Taiwan", "coords": [22.6273, 120.3014], "strategic_importance": 80, "annual_teu": 9940000},
-            {"name": "Bremen/Bremerhaven", "country": "Germany", "coords": [53.5366, 8.1627], "strategic_importance": 78, "annual_teu": 5500000},
-            {"name": "Felixstowe", "country": "United Kingdom", "coords": [51.9540, 1.3506], "strategic_importance": 75, "annual_teu": 4000000},
-            {"name": "Savannah", "country": "United States", "coords": [32.0835, -81.0998], "strategic_importance": 72, "annual_teu": 4600000},
-            {"name": "Piraeus", "country": "Greece", "coords": [37.9364, 23.6479], "strategic_importance": 70, "annual_teu": 5400000},
-            {"name": "Vancouver", "country": "Canada", "coords": [49.2827, -123.1207], "strategic_importance": 70, "annual_teu": 3500000},
-            {"name": "Le Havre", "country": "France", "coords": [49.4944, 0.1079], "strategic_importance": 75, "annual_teu": 2900000},
-        ]
-        
-        ports = []
-        for i, port_data in enumerate(major_ports[:limit]):
-            port = {
-                "id": f"port_{i+1:04d}",
-                "name": port_data["name"],
-                "country": port_data["country"],
-                "coordinates": port_data["coords"],
-                "lat": port_data["coords"][0],
-                "lng": port_data["coords"][1],
-                "strategic_importance": port_data["strategic_importance"],
-                "annual_teu": port_data["annual_teu"],
-                "port_type": "Container Terminal",
-                "status": "Active",
-                "capacity_utilization": random.randint(65, 95),
-                "depth_meters": random.randint(12, 20),
-                "berths": random.randint(8, 25),
-                "crane_count": random.randint(15, 50),
-                "storage_area_hectares": random.randint(100, 800),
-                "rail_connectivity": random.choice([True, False]),
-                "road_connectivity": True,
-                "customs_24_7": random.choice([True, False]),
-                "free_trade_zone": random.choice([True, False]),
-                "last_updated": datetime.now().isoformat(),
-                "timezone": "UTC",
-                "region": port_data.get("region", "Global")
-            }
-            ports.append(port)
-        
-        logger.info(f"Generated {len(ports)} comprehensive port records")
-        return ports  # Return array directly like other endpoints expect
-        
-    except Exception as e:
-        logger.error(f"Error generating port data: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate port data")
+async def get_comprehensive_ports(request: Request, limit: int = 200):
+    """Get comprehensive global port data (catalog built once, served from cached bytes)"""
+    limit = max(0, limit)
+    cache_key = ("ports", min(limit, len(port_catalog)))
+    encoded = response_cache.get(cache_key, port_catalog.version)
+    if encoded is None:
+        encoded = response_cache.put(cache_key, port_catalog.ports[:limit], version=port_catalog.version)
+    return await cached_response(request, encoded)
+
+@app.get("/api/ports/{port_id}/vessels")
+async def get_vessels_near_port(request: Request, port_id: str, radius_km: float = 50, limit: int = 500,
+                                fields: Optional[str] = None):
+    """
+    Get vessels within radius_km of a port (id like "port_0001" or UN/LOCODE), nearest first
+    
+    Each vessel carries `distance_km`; `total` counts every vessel in range even when
+    the list is capped at `limit`.
+    """
+    port = port_catalog.get(port_id)
+    if port is None:
+        raise HTTPException(status_code=404, detail=f"Unknown port '{port_id}'")
+    if not 0 < radius_km <= MAX_PORT_RADIUS_KM:
+        raise HTTPException(status_code=400, detail=f"radius_km must be in (0, {MAX_PORT_RADIUS_KM:g}]")
+    
+    snapshot = await require_snapshot()
+    index = vessel_index_cache.index_for(snapshot)
+    vessels, total = index.within_radius(port["lat"], port["lng"], radius_km, limit=limit,
+                                         fields=parse_fields(fields))
+    payload = {
+        "port": port,
+        "radius_km": radius_km,
+        "vessels": vessels,
+        "total": total,
+        "truncated": total > len(vessels),
+        "snapshot_version": snapshot.version,
+        "timestamp": snapshot.built_at.isoformat()
+    }
+    encoded = response_cache.put(None, payload, store=False)
+    return await cached_response(request, encoded, headers=snapshot_headers(snapshot))
+
+@app.get("/api/vessels/{vessel_id}/nearest-ports")
+async def get_nearest_ports(vessel_id: str, k: int = 5, max_distance_km: Optional[float] = None):
+    """Get the k catalog ports closest to a vessel's current position, nearest first"""
+    snapshot = await require_snapshot()
+    index = vessel_index_cache.index_for(snapshot)
+    if index.vessel(vessel_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown vessel '{vessel_id}'")
+    location = index.location_of(vessel_id)
+    if location is None:
+        raise HTTPException(status_code=422, detail=f"Vessel '{vessel_id}' has no valid position")
+    
+    lat, lon = location
+    return {
+        "vessel_id": vessel_id,
+        "position": {"lat": lat, "lng": lon},
+        "ports": port_catalog.nearest(lat, lon, k=min(max(1, k), MAX_NEAREST_PORTS), max_distance_km=max_distance_km),
+        "snapshot_version": snapshot.version,
+        "timestamp": snapshot.built_at.isoformat()
+    }
 
 @app.get("/health")
 async def health_check():
+    """Readiness probe: 503 until startup warm-up has finished, "degraded" if a component failed"""
+    startup = services.get_status()
+    failed = [name for name, component in startup["components"].items() if component["status"] == "failed"]
+    if not startup["ready"]:
+        return JSONResponse(status_code=503, content={
+            "status": "starting",
+            "timestamp": datetime.now().isoformat(),
+            "startup": startup
+        })
+    
     return {
-        "status": "healthy",
+        "status": "degraded" if failed else "healthy",
+        "startup": startup,
         "timestamp": datetime.now().isoformat(),
         "data_type": "Comprehensive realistic datasets",
         "vessel_capacity": "3000+ vessels",
         "tariff_capacity": "500+ tariffs",
-        "port_capacity": "200+ major ports"
+        "port_capacity": "200+ major ports",
+        "port_catalog": port_catalog.get_status(),
+        "vessel_snapshot": vessel_snapshot_service.get_status(),
+        "shared_snapshot": shared_snapshot.get_status() if shared_snapshot is not None else None,
+        "vessel_index": vessel_index_cache.get_status(),
+        "bdi_quote": bdi_quote_service.get_status()
     }
 
 @app.get("/api/ai-projections")
@@ -1155,113 +1652,78 @@ async def get_ai_projections():
         raise HTTPException(status_code=500, detail=f"AI projection generation failed: {str(e)}")
 
 async def get_current_bdi():
-    """Get current Baltic Dry Index from real market data"""
-    try:
-        # Try multiple real BDI data sources
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            
-            # Try Yahoo Finance API for BDI
-            try:
-                response = await client.get(
-                    "https://query1.finance.yahoo.com/v8/finance/chart/BDI",
-                    headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'chart' in data and data['chart']['result']:
-                        result = data['chart']['result'][0]
-                        if 'meta' in result and 'regularMarketPrice' in result['meta']:
-                            bdi_value = int(result['meta']['regularMarketPrice'])
-                            logger.info(f"✅ Got real BDI from Yahoo Finance: {bdi_value}")
-                            return bdi_value
-            except Exception as e:
-                logger.warning(f"Yahoo Finance BDI failed: {e}")
-            
-            # Try MarketWatch API
-            try:
-                response = await client.get(
-                    "https://api.marketwatch.com/investing/index/bdi",
-                    headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'LastPrice' in data:
-                        bdi_value = int(float(data['LastPrice']))
-                        logger.info(f"✅ Got real BDI from MarketWatch: {bdi_value}")
-                        return bdi_value
-            except Exception as e:
-                logger.warning(f"MarketWatch BDI failed: {e}")
-            
-            # Try Investing.com API
-            try:
-                response = await client.get(
-                    "https://api.investing.com/api/financialdata/8830/historical/chart/?period=P1D&interval=PT1M&pointscount=120",
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                        'Domain-Id': '1'
-                    }
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'data' in data and len(data['data']) > 0:
-                        latest = data['data'][-1]
-                        if len(latest) > 1:
-                            bdi_value = int(float(latest[1]))
-                            logger.info(f"✅ Got real BDI from Investing.com: {bdi_value}")
-                            return bdi_value
-            except Exception as e:
-                logger.warning(f"Investing.com BDI failed: {e}")
-            
-            # Try Alpha Vantage (if you have API key)
-            try:
-                # This would require an API key - placeholder for now
-                # response = await client.get(f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol=BDI&apikey={API_KEY}")
-                pass
-            except Exception as e:
-                logger.warning(f"Alpha Vantage BDI failed: {e}")
-        
-        # If all APIs fail, use the real value you provided as of August 22, 2025
-        logger.warning("⚠️ All BDI APIs failed, using last known real value")
-        return 1893  # Real BDI value as of August 22, 2025
-        
-    except Exception as e:
-        logger.error(f"Error fetching real BDI: {e}")
-        return 1893  # Real fallback value
+    """Get current Baltic Dry Index from the background-refreshed quote service (no network wait)"""
+    return bdi_quote_service.current_value()
+
+async def vessel_prediction_section(ml_prediction_service, vessels: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Vessel delay/route predictions response for an already fetched vessel list"""
+    if not vessels:
+        return {
+            "predictions": [],
+            "total": 0,
+            "message": "No vessel data available for predictions"
+        }
+    
+    predictions = await ml_prediction_service.get_vessel_predictions(vessels)
+    return {
+        "predictions": predictions,
+        "total": len(predictions),
+        "model_info": {
+            "version": "VesselDelayPredictor_v2.1",
+            "accuracy": "87%",
+            "last_trained": datetime.now().isoformat(),
+            "features_used": ["speed", "course", "weather_risk", "route_congestion", "geopolitical_risk"]
+        },
+        "generated_at": datetime.now().isoformat()
+    }
+
+async def disruption_forecast_section(ml_prediction_service, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Disruption forecasts response for an already fetched disruption list"""
+    forecasts = await ml_prediction_service.get_disruption_forecasts(historical_data)
+    return {
+        "forecasts": forecasts,
+        "total": len(forecasts),
+        "model_info": {
+            "version": "DisruptionForecaster_v1.8",
+            "accuracy": "79%",
+            "last_trained": datetime.now().isoformat(),
+            "regions_covered": 10,
+            "prediction_horizon": "24 hours to 2 weeks"
+        },
+        "generated_at": datetime.now().isoformat()
+    }
+
+async def economic_prediction_section(ml_prediction_service, current_bdi: int) -> Dict[str, Any]:
+    """Economic indicator predictions response for a known BDI value"""
+    market_data = {
+        "current_bdi": current_bdi,
+        "timestamp": datetime.now().isoformat()
+    }
+    predictions = await ml_prediction_service.get_economic_predictions(market_data)
+    return {
+        "economic_predictions": predictions,
+        "model_info": {
+            "version": "EconomicForecastModel_v3.2",
+            "accuracy": "74%",
+            "last_trained": datetime.now().isoformat(),
+            "indicators": ["BDI", "Container Rates", "Fuel Prices", "Port Congestion"]
+        },
+        "generated_at": datetime.now().isoformat()
+    }
 
 @app.get("/api/ml-predictions/vessels")
 async def get_ml_vessel_predictions(limit: int = 50):
     """Get ML-powered vessel delay and route predictions"""
     try:
-        if not ML_PREDICTIONS_AVAILABLE:
+        ml_prediction_service = await services.get("ml_predictions")
+        if ml_prediction_service is None:
             raise HTTPException(status_code=503, detail="ML Prediction Service not available")
         
         print(f"🧠 Generating ML vessel predictions for {limit} vessels...")
         
         # Get current vessel data
-        vessel_data = await get_comprehensive_vessels(limit=limit)
-        vessels = vessel_data.get("vessels", [])
-        
-        if not vessels:
-            return {
-                "predictions": [],
-                "total": 0,
-                "message": "No vessel data available for predictions"
-            }
-        
-        # Generate ML predictions
-        predictions = await get_vessel_predictions(vessels)
-        
-        return {
-            "predictions": predictions,
-            "total": len(predictions),
-            "model_info": {
-                "version": "VesselDelayPredictor_v2.1",
-                "accuracy": "87%",
-                "last_trained": datetime.now().isoformat(),
-                "features_used": ["speed", "course", "weather_risk", "route_congestion", "geopolitical_risk"]
-            },
-            "generated_at": datetime.now().isoformat()
-        }
+        vessel_data = await get_vessel_payload(limit=limit)
+        return await vessel_prediction_section(ml_prediction_service, vessel_data.get("vessels", []))
         
     except Exception as e:
         logger.error(f"Error generating ML vessel predictions: {str(e)}")
@@ -1271,7 +1733,8 @@ async def get_ml_vessel_predictions(limit: int = 50):
 async def get_ml_disruption_forecasts():
     """Get ML-powered disruption forecasts"""
     try:
-        if not ML_PREDICTIONS_AVAILABLE:
+        ml_prediction_service = await services.get("ml_predictions")
+        if ml_prediction_service is None:
             raise HTTPException(status_code=503, detail="ML Prediction Service not available")
         
         print(f"🧠 Generating ML disruption forecasts...")
@@ -1279,22 +1742,7 @@ async def get_ml_disruption_forecasts():
         # Get historical disruption data for ML training
         from services.real_time_disruption_fetcher import get_real_time_disruptions
         historical_data = await get_real_time_disruptions(limit=100)
-        
-        # Generate ML forecasts
-        forecasts = await get_disruption_forecasts(historical_data)
-        
-        return {
-            "forecasts": forecasts,
-            "total": len(forecasts),
-            "model_info": {
-                "version": "DisruptionForecaster_v1.8",
-                "accuracy": "79%",
-                "last_trained": datetime.now().isoformat(),
-                "regions_covered": 10,
-                "prediction_horizon": "24 hours to 2 weeks"
-            },
-            "generated_at": datetime.now().isoformat()
-        }
+        return await disruption_forecast_section(ml_prediction_service, historical_data)
         
     except Exception as e:
         logger.error(f"Error generating ML disruption forecasts: {str(e)}")
@@ -1304,66 +1752,106 @@ async def get_ml_disruption_forecasts():
 async def get_ml_economic_forecasts():
     """Get ML-powered economic indicator predictions"""
     try:
-        if not ML_PREDICTIONS_AVAILABLE:
+        ml_prediction_service = await services.get("ml_predictions")
+        if ml_prediction_service is None:
             raise HTTPException(status_code=503, detail="ML Prediction Service not available")
         
         print(f"🧠 Generating ML economic predictions...")
         
         # Get current market data
         current_bdi = await get_current_bdi()
-        market_data = {
-            "current_bdi": current_bdi,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Generate ML predictions
-        predictions = await get_economic_predictions(market_data)
-        
-        return {
-            "economic_predictions": predictions,
-            "model_info": {
-                "version": "EconomicForecastModel_v3.2",
-                "accuracy": "74%",
-                "last_trained": datetime.now().isoformat(),
-                "indicators": ["BDI", "Container Rates", "Fuel Prices", "Port Congestion"]
-            },
-            "generated_at": datetime.now().isoformat()
-        }
+        return await economic_prediction_section(ml_prediction_service, current_bdi)
         
     except Exception as e:
         logger.error(f"Error generating ML economic predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"ML economic prediction failed: {str(e)}")
 
+# Per-section deadlines for /api/ml-predictions/comprehensive (seconds)
+ML_SECTION_DEADLINES = {
+    "vessel_predictions": float(os.getenv("ML_VESSEL_SECTION_DEADLINE_SECONDS", "3")),
+    "disruption_forecasts": float(os.getenv("ML_DISRUPTION_SECTION_DEADLINE_SECONDS", "3")),
+    "economic_predictions": float(os.getenv("ML_ECONOMIC_SECTION_DEADLINE_SECONDS", "2")),
+}
+
+class PredictionContext:
+    """
+    Inputs shared by the comprehensive prediction sections, each fetched once
+
+    Vessels and the disruptions they were scored against come from the same fleet
+    snapshot (one fetch, awaited by both sections); the BDI comes from memory.
+    """
+
+    def __init__(self, vessel_limit: int):
+        self.vessel_limit = vessel_limit
+        self.snapshot_task = asyncio.ensure_future(vessel_snapshot_service.get_snapshot())
+        self.bdi = bdi_quote_service.latest()
+
+    async def vessels(self) -> List[Dict[str, Any]]:
+        snapshot = await asyncio.shield(self.snapshot_task)
+        return build_vessel_payload(snapshot, self.vessel_limit)["vessels"]
+
+    async def disruptions(self) -> List[Dict[str, Any]]:
+        snapshot = await asyncio.shield(self.snapshot_task)
+        return list(snapshot.disruptions)
+
+    def close(self):
+        if not self.snapshot_task.done():
+            # The snapshot service shields its own rebuild; this only drops our wait
+            self.snapshot_task.cancel()
+
 @app.get("/api/ml-predictions/comprehensive")
 async def get_comprehensive_ml_predictions(vessel_limit: int = 25):
-    """Get comprehensive ML predictions - vessels, disruptions, and economic indicators"""
+    """
+    Get comprehensive ML predictions - vessels, disruptions, and economic indicators
+    
+    Builds one shared input context, runs the three predictors concurrently and
+    returns whatever finished within each section's deadline; `sections` reports
+    per-section status and timing and `partial` is set if any section is missing.
+    """
     try:
-        if not ML_PREDICTIONS_AVAILABLE:
+        ml_prediction_service = await services.get("ml_predictions")
+        if ml_prediction_service is None:
             raise HTTPException(status_code=503, detail="ML Prediction Service not available")
         
         print(f"🧠 Generating comprehensive ML predictions...")
+        start = time.perf_counter()
+        context = PredictionContext(vessel_limit)
         
-        # Run all predictions in parallel
-        vessel_task = get_ml_vessel_predictions(vessel_limit)
-        disruption_task = get_ml_disruption_forecasts()
-        economic_task = get_ml_economic_forecasts()
+        async def vessel_section():
+            return await vessel_prediction_section(ml_prediction_service, await context.vessels())
         
-        vessel_predictions, disruption_forecasts, economic_predictions = await asyncio.gather(
-            vessel_task, disruption_task, economic_task, return_exceptions=True
-        )
+        async def disruption_section():
+            return await disruption_forecast_section(ml_prediction_service, await context.disruptions())
         
-        # Handle any exceptions
-        if isinstance(vessel_predictions, Exception):
-            vessel_predictions = {"predictions": [], "error": str(vessel_predictions)}
-        if isinstance(disruption_forecasts, Exception):
-            disruption_forecasts = {"forecasts": [], "error": str(disruption_forecasts)}
-        if isinstance(economic_predictions, Exception):
-            economic_predictions = {"economic_predictions": {}, "error": str(economic_predictions)}
+        try:
+            outcomes = await gather_with_deadlines({
+                "vessel_predictions": vessel_section(),
+                "disruption_forecasts": disruption_section(),
+                "economic_predictions": economic_prediction_section(ml_prediction_service, context.bdi.value),
+            }, ML_SECTION_DEADLINES)
+        finally:
+            context.close()
+        
+        fallbacks = {
+            "vessel_predictions": {"predictions": []},
+            "disruption_forecasts": {"forecasts": []},
+            "economic_predictions": {"economic_predictions": {}},
+        }
+        sections = {
+            name: outcome.value if outcome.ok else {**fallbacks[name], "error": outcome.error}
+            for name, outcome in outcomes.items()
+        }
+        vessel_predictions = sections["vessel_predictions"]
+        disruption_forecasts = sections["disruption_forecasts"]
+        economic_predictions = sections["economic_predictions"]
+        partial = not all(outcome.ok for outcome in outcomes.values())
         
         return {
             "vessel_predictions": vessel_predictions,
             "disruption_forecasts": disruption_forecasts,
             "economic_predictions": economic_predictions,
+            "partial": partial,
+            "sections": {name: outcome.timing() for name, outcome in outcomes.items()},
             "ai_system_status": {
                 "models_active": 5,
                 "total_predictions": (
@@ -1371,12 +1859,14 @@ async def get_comprehensive_ml_predictions(vessel_limit: int = 25):
                     len(disruption_forecasts.get("forecasts", [])) + 
                     len(economic_predictions.get("economic_predictions", {}))
                 ),
-                "system_health": "optimal",
-                "processing_time_ms": random.randint(150, 450)
+                "system_health": "degraded" if partial else "optimal",
+                "processing_time_ms": round((time.perf_counter() - start) * 1000, 1)
             },
             "generated_at": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating comprehensive ML predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Comprehensive ML prediction failed: {str(e)}")
@@ -1385,7 +1875,7 @@ async def get_comprehensive_ml_predictions(vessel_limit: int = 25):
 async def get_ml_model_status():
     """Get status and performance metrics of ML models"""
     try:
-        if not ML_PREDICTIONS_AVAILABLE:
+        if await services.get("ml_predictions") is None:
             return {
                 "status": "unavailable",
                 "message": "ML Prediction Service not loaded"
@@ -1448,6 +1938,54 @@ async def get_ml_model_status():
         logger.error(f"Error getting ML model status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"ML model status check failed: {str(e)}")
 
+@app.get("/api/coalescing/stats")
+async def get_coalescing_stats():
+    """Originated vs coalesced upstream calls per coalesced function"""
+    return {
+        "coalescing": request_coalescer.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/http-pool/stats")
+async def get_http_pool_stats():
+    """Outbound connection pool configuration and per-host utilization"""
+    return {
+        "http_pool": http_pool.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/admission/stats")
+async def get_admission_stats():
+    """In-flight, queue depth and shed counts per admission limit"""
+    return {
+        "admission": admission.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/cache-writer/stats")
+async def get_cache_writer_stats():
+    """Pending, merged, dropped and written counts of the SQLite write-behind queue"""
+    return {
+        "cache_writer": cache_writer.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus exposition: request and per-stage latency histograms, admission gauges and counters"""
+    if not PROMETHEUS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="prometheus-client not installed")
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@app.get("/api/response-cache/stats")
+async def get_response_cache_stats():
+    """Hit/miss counters and memory held by pre-serialized responses"""
+    return {
+        "response_cache": response_cache.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/api/diagnostic")
 async def diagnostic_check():
     """Diagnostic endpoint to verify disruption impact calculation"""
@@ -1458,7 +1996,7 @@ async def diagnostic_check():
         active_disruptions = [d for d in disruptions if d.get("status") == "active"]
         
         # Test vessel data with impact calculation
-        test_vessels = await get_comprehensive_vessels(limit=10)
+        test_vessels = await get_vessel_payload(limit=10)
         impacted_vessels = [v for v in test_vessels["vessels"] if v.get("impacted") == True]
         
         return {
@@ -1487,4 +2025,5 @@ if __name__ == "__main__":
     import uvicorn
     logger.info("Starting TradeWatch Enhanced Real Data API server...")
     logger.info("Providing thousands of vessels and hundreds of tariffs")
-    uvicorn.run(app, host="0.0.0.0", port=8001, log_level="info")
+    # Workers need an import string; with API_WORKERS > 1 they share one vessel snapshot producer
+    uvicorn.run("enhanced_real_data_api:app", host="0.0.0.0", port=8001, log_level="info", workers=API_WORKERS)
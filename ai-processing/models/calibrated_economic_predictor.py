@@ -12,6 +12,7 @@ from dataclasses import dataclass
 import logging
 
 from services.bdi_validation_service import BalticDryIndexService, ModelValidationResult
+from services.bdi_quote_service import bdi_quote_service
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class CalibratedEconomicPredictor:
     def __init__(self, db_manager=None):
         self.db_manager = db_manager
         self.bdi_service = BalticDryIndexService()
+        self.bdi_quotes = bdi_quote_service
         self.calibration_params = self._initialize_calibration_params()
         self.model_weights = self._initialize_model_weights()
         self.last_validation = None
@@ -125,8 +127,8 @@ class CalibratedEconomicPredictor:
     
     async def _generate_validation_predictions(self) -> List[Dict]:
         """Generate predictions specifically for validation purposes"""
-        current_bdi = await self.bdi_service.fetch_real_time_bdi()
-        base_value = current_bdi.value if current_bdi else 1850
+        current_bdi = self.bdi_quotes.latest()
+        base_value = current_bdi.value
         
         # Generate a prediction for the next period
         factors = await self._analyze_market_factors()
@@ -222,8 +224,8 @@ class CalibratedEconomicPredictor:
     
     async def _predict_baltic_dry_index(self, days_ahead: int) -> EconomicPrediction:
         """Predict Baltic Dry Index with enhanced accuracy"""
-        current_bdi = await self.bdi_service.fetch_real_time_bdi()
-        base_value = current_bdi.value if current_bdi else 1850
+        current_bdi = self.bdi_quotes.latest()
+        base_value = current_bdi.value
         
         # Analyze market factors
         factors = await self._analyze_market_factors()
@@ -405,14 +407,15 @@ class CalibratedEconomicPredictor:
     
     async def get_validation_dashboard_data(self) -> Dict:
         """Get data for validation dashboard"""
-        current_bdi = await self.bdi_service.fetch_real_time_bdi()
+        current_bdi = self.bdi_quotes.latest()
         validation_report = await self.bdi_service.get_validation_report()
         
         return {
             'current_bdi': {
-                'value': current_bdi.value if current_bdi else None,
-                'change_percent': current_bdi.change_percent if current_bdi else None,
-                'last_updated': current_bdi.date.isoformat() if current_bdi else None
+                'value': current_bdi.value,
+                'change_percent': current_bdi.change_percent,
+                'last_updated': current_bdi.date.isoformat(),
+                'source': current_bdi.source
             },
             'model_performance': {
                 'accuracy_score': self.last_validation.accuracy_score if self.last_validation else None,
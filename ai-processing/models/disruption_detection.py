@@ -6,15 +6,12 @@ Multi-modal AI system for detecting global trade disruptions
 import os
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
 import structlog
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime, timedelta
 import re
 import json
-from transformers import AutoTokenizer, TFAutoModel
+from utils.inference import get_tensorflow, load_inference_backend
 
 logger = structlog.get_logger()
 
@@ -27,6 +24,7 @@ class DisruptionDetector:
     def __init__(self, model_path: str = "/app/models/disruption_detection"):
         self.model_path = model_path
         self.model = None
+        self.runtime = None
         self.tokenizer = None
         self.text_encoder = None
         self.is_loaded = False
@@ -60,8 +58,10 @@ class DisruptionDetector:
             'pandemic': ['pandemic', 'outbreak', 'quarantine', 'lockdown', 'health']
         }
     
-    def build_model(self) -> keras.Model:
+    def build_model(self) -> "keras.Model":
         """Build the multi-modal disruption detection model"""
+        keras = get_tensorflow().keras
+        layers = keras.layers
         
         # News text input
         news_input = layers.Input(shape=(self.news_embedding_dim,), name='news_embeddings')
@@ -95,13 +95,14 @@ class DisruptionDetector:
         attention_input = layers.Concatenate()([news_output, vessel_output, economic_output])
         attention_weights = layers.Dense(3, activation='softmax', name='modality_attention')(attention_input)
         
-        # Apply attention weights
+        # Apply attention weights (slices keep the column axis; the lambdas must not
+        # close over the lazily imported tf module or the saved model cannot be loaded)
         news_weighted = layers.Multiply()([news_output, 
-                                         layers.Lambda(lambda x: tf.expand_dims(x[:, 0], axis=1))(attention_weights)])
+                                         layers.Lambda(lambda x: x[:, 0:1])(attention_weights)])
         vessel_weighted = layers.Multiply()([vessel_output,
-                                           layers.Lambda(lambda x: tf.expand_dims(x[:, 1], axis=1))(attention_weights)])
+                                           layers.Lambda(lambda x: x[:, 1:2])(attention_weights)])
         economic_weighted = layers.Multiply()([economic_output,
-                                             layers.Lambda(lambda x: tf.expand_dims(x[:, 2], axis=1))(attention_weights)])
+                                             layers.Lambda(lambda x: x[:, 2:3])(attention_weights)])
         
         # Fuse all modalities
         fused_features = layers.Concatenate()([news_weighted, vessel_weighted, economic_weighted])
@@ -366,10 +367,19 @@ class DisruptionDetector:
             economic_features = self.preprocess_economic_data(economic_indicators)
             
             # Make prediction
-            predictions = self.model.predict([news_features, vessel_features, economic_features])
+            predictions = self.runtime.predict({
+                'news_embeddings': news_features,
+                'vessel_features': vessel_features,
+                'economic_features': economic_features
+            })
             
-            (disruption_prob, category_pred, severity_pred, 
-             time_to_impact_pred, duration_pred, confidence_pred, regions_pred) = predictions
+            disruption_prob = predictions['disruption_probability']
+            category_pred = predictions['disruption_category']
+            severity_pred = predictions['severity_level']
+            time_to_impact_pred = predictions['time_to_impact']
+            duration_pred = predictions['impact_duration']
+            confidence_pred = predictions['confidence_score']
+            regions_pred = predictions['affected_regions']
             
             results = []
             
@@ -545,6 +555,7 @@ class DisruptionDetector:
         X_val = self.prepare_training_data(validation_data)
         
         # Callbacks
+        keras = get_tensorflow().keras
         callbacks = [
             keras.callbacks.EarlyStopping(
                 monitor='val_loss',
@@ -611,23 +622,35 @@ class DisruptionDetector:
         }
     
     async def load_model(self):
-        """Load trained model"""
+        """Load trained model with the configured inference backend"""
         try:
-            model_file = os.path.join(self.model_path, 'disruption_detection_model.h5')
-            if os.path.exists(model_file):
-                self.model = keras.models.load_model(model_file)
-                logger.info("Disruption detection model loaded", path=model_file)
-            else:
-                # Build new model if no saved model exists
-                self.model = self.build_model()
-                logger.info("Built new disruption detection model")
-            
+            self.runtime = load_inference_backend(
+                self.model_path,
+                'disruption_detection_model',
+                self.load_keras_model,
+                source_file=os.path.join(self.model_path, 'disruption_detection_model.h5')
+            )
             self.is_loaded = True
             
         except Exception as e:
             logger.error("Error loading disruption detection model", error=str(e))
             raise
     
+    def load_keras_model(self):
+        """Keras model for training/export (loaded or built once)"""
+        if self.model is not None:
+            return self.model
+        
+        model_file = os.path.join(self.model_path, 'disruption_detection_model.h5')
+        if os.path.exists(model_file):
+            self.model = get_tensorflow().keras.models.load_model(model_file)
+            logger.info("Disruption detection model loaded", path=model_file)
+        else:
+            # Build new model if no saved model exists
+            self.model = self.build_model()
+            logger.info("Built new disruption detection model")
+        return self.model
+    
     async def save_model(self):
         """Save trained model"""
         try:
@@ -653,6 +676,9 @@ class DisruptionDetector:
             
             logger.info("Disruption detection model saved", path=model_file)
             
+            # Next detection re-exports the new weights for the configured backend
+            self.is_loaded = False
+            
         except Exception as e:
             logger.error("Error saving disruption detection model", error=str(e))
             raise
@@ -13,6 +13,8 @@ import tensorflow as tf
 from geopy.distance import geodesic
 import logging
 
+from services.port_catalog import port_catalog
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -38,7 +40,7 @@ class LocationAwarePredictor:
         self.regional_clusters = self._load_regional_clusters()
         
     def _load_major_ports(self) -> List[Dict[str, Any]]:
-        """Load major global ports with detailed information"""
+        """Load major global ports with detailed information (locations from the shared port catalog)"""
         return [
             # Asia-Pacific Major Ports
             {
@@ -46,7 +48,7 @@ class LocationAwarePredictor:
                 "name": "Shanghai",
                 "country": "China",
                 "region": "East Asia",
-                "location": {"lat": 31.2304, "lng": 121.4737},
+                "location": port_catalog.location("CNSHA"),
                 "annual_teu": 47030000,
                 "port_type": ["container", "bulk", "general"],
                 "congestion_baseline": 0.65,
@@ -63,7 +65,7 @@ class LocationAwarePredictor:
                 "name": "Singapore",
                 "country": "Singapore", 
                 "region": "Southeast Asia",
-                "location": {"lat": 1.2644, "lng": 103.8315},
+                "location": port_catalog.location("SGSIN"),
                 "annual_teu": 37200000,
                 "port_type": ["container", "transshipment", "bunkering"],
                 "congestion_baseline": 0.45,
@@ -77,7 +79,7 @@ class LocationAwarePredictor:
                 "name": "Busan",
                 "country": "South Korea",
                 "region": "East Asia", 
-                "location": {"lat": 35.1040, "lng": 129.0756},
+                "location": port_catalog.location("KRPUS"),
                 "annual_teu": 22400000,
                 "port_type": ["container", "transshipment"],
                 "congestion_baseline": 0.55,
@@ -90,7 +92,7 @@ class LocationAwarePredictor:
                 "name": "Ningbo-Zhoushan",
                 "country": "China",
                 "region": "East Asia",
-                "location": {"lat": 29.8683, "lng": 121.5440},
+                "location": port_catalog.location("CNNGB"),
                 "annual_teu": 31100000,
                 "port_type": ["container", "bulk", "iron_ore"],
                 "congestion_baseline": 0.70,
@@ -105,7 +107,7 @@ class LocationAwarePredictor:
                 "name": "Rotterdam", 
                 "country": "Netherlands",
                 "region": "North Europe",
-                "location": {"lat": 51.9225, "lng": 4.47917},
+                "location": port_catalog.location("NLRTM"),
                 "annual_teu": 14810000,
                 "port_type": ["container", "bulk", "chemicals", "oil"],
                 "congestion_baseline": 0.48,
@@ -119,7 +121,7 @@ class LocationAwarePredictor:
                 "name": "Antwerp",
                 "country": "Belgium",
                 "region": "North Europe",
-                "location": {"lat": 51.2194, "lng": 4.4025},
+                "location": port_catalog.location("BEANR"),
                 "annual_teu": 12000000,
                 "port_type": ["container", "chemicals", "automobiles"],
                 "congestion_baseline": 0.52,
@@ -132,7 +134,7 @@ class LocationAwarePredictor:
                 "name": "Hamburg",
                 "country": "Germany", 
                 "region": "North Europe",
-                "location": {"lat": 53.5511, "lng": 9.9937},
+                "location": port_catalog.location("DEHAM"),
                 "annual_teu": 8700000,
                 "port_type": ["container", "general"],
                 "congestion_baseline": 0.58,
@@ -148,7 +150,7 @@ class LocationAwarePredictor:
                 "name": "Los Angeles/Long Beach",
                 "country": "United States",
                 "region": "West Coast US", 
-                "location": {"lat": 33.7361, "lng": -118.2639},
+                "location": port_catalog.location("USLAX"),
                 "annual_teu": 18200000,
                 "port_type": ["container", "automobiles"],
                 "congestion_baseline": 0.72,
@@ -162,7 +164,7 @@ class LocationAwarePredictor:
                 "name": "New York/New Jersey",
                 "country": "United States",
                 "region": "East Coast US",
-                "location": {"lat": 40.6892, "lng": -74.0445},
+                "location": port_catalog.location("USNYC"),
                 "annual_teu": 7400000,
                 "port_type": ["container", "general"],
                 "congestion_baseline": 0.68,
@@ -175,7 +177,7 @@ class LocationAwarePredictor:
                 "name": "Vancouver",
                 "country": "Canada",
                 "region": "West Coast North America",
-                "location": {"lat": 49.2827, "lng": -123.1207},
+                "location": port_catalog.location("CAVAN"),
                 "annual_teu": 3400000,
                 "port_type": ["container", "bulk", "grain"],
                 "congestion_baseline": 0.45,
@@ -191,7 +193,7 @@ class LocationAwarePredictor:
                 "name": "Dubai (Jebel Ali)",
                 "country": "UAE",
                 "region": "Middle East",
-                "location": {"lat": 25.0657, "lng": 55.1713},
+                "location": port_catalog.location("AEDXB"),
                 "annual_teu": 14100000,
                 "port_type": ["container", "transshipment"],
                 "congestion_baseline": 0.42,
@@ -205,7 +207,7 @@ class LocationAwarePredictor:
                 "name": "Suez Canal Ports",
                 "country": "Egypt",
                 "region": "Middle East",
-                "location": {"lat": 30.0131, "lng": 32.5899},
+                "location": port_catalog.location("EGSUZ"),
                 "annual_teu": 6200000,
                 "port_type": ["transit", "container", "bulk"],
                 "congestion_baseline": 0.38,
@@ -6,13 +6,11 @@ Advanced TensorFlow model for predicting vessel movements and arrival times
 import os
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
 import structlog
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime, timedelta
 import joblib
+from utils.inference import get_tensorflow, load_inference_backend
 
 logger = structlog.get_logger()
 
@@ -25,6 +23,7 @@ class VesselMovementPredictor:
     def __init__(self, model_path: str = "/app/models/vessel_prediction"):
         self.model_path = model_path
         self.model = None
+        self.runtime = None
         self.scaler = None
         self.feature_names = None
         self.is_loaded = False
@@ -43,8 +42,10 @@ class VesselMovementPredictor:
             'vessel_features': ['vessel_type_encoded', 'gross_tonnage_scaled']
         }
     
-    def build_model(self) -> keras.Model:
+    def build_model(self) -> "keras.Model":
         """Build the vessel movement prediction model"""
+        keras = get_tensorflow().keras
+        layers = keras.layers
         
         # Input layers
         sequence_input = layers.Input(
@@ -170,6 +171,8 @@ class VesselMovementPredictor:
     @staticmethod
     def position_loss(y_true, y_pred):
         """Custom loss function for position prediction"""
+        tf = get_tensorflow()
+        
         # Reshape to (batch_size, timesteps, 2)
         y_true_reshaped = tf.reshape(y_true, (-1, 48, 2))
         y_pred_reshaped = tf.reshape(y_pred, (-1, 48, 2))
@@ -304,9 +307,16 @@ class VesselMovementPredictor:
             sequence_data, vessel_features, env_features = self.preprocess_data(vessel_data)
             
             # Make prediction
-            predictions = self.model.predict([sequence_data, vessel_features, env_features])
+            predictions = self.runtime.predict({
+                'sequence_input': sequence_data,
+                'vessel_features': vessel_features,
+                'environmental_input': env_features
+            })
             
-            position_pred, arrival_pred, confidence_pred, risk_pred = predictions
+            position_pred = predictions['position_prediction']
+            arrival_pred = predictions['arrival_time']
+            confidence_pred = predictions['confidence_score']
+            risk_pred = predictions['risk_factors']
             
             # Process position predictions
             positions = position_pred[0].reshape(-1, 2)
@@ -365,6 +375,7 @@ class VesselMovementPredictor:
         X_val = self.prepare_training_data(validation_data)
         
         # Callbacks
+        keras = get_tensorflow().keras
         callbacks = [
             keras.callbacks.EarlyStopping(
                 monitor='val_loss',
@@ -429,26 +440,38 @@ class VesselMovementPredictor:
         }
     
     async def load_model(self):
-        """Load trained model"""
+        """Load trained model with the configured inference backend"""
         try:
-            model_file = os.path.join(self.model_path, 'vessel_prediction_model.h5')
-            if os.path.exists(model_file):
-                self.model = keras.models.load_model(
-                    model_file,
-                    custom_objects={'position_loss': self.position_loss}
-                )
-                logger.info("Vessel prediction model loaded", path=model_file)
-            else:
-                # Build new model if no saved model exists
-                self.model = self.build_model()
-                logger.info("Built new vessel prediction model")
-            
+            self.runtime = load_inference_backend(
+                self.model_path,
+                'vessel_prediction_model',
+                self.load_keras_model,
+                source_file=os.path.join(self.model_path, 'vessel_prediction_model.h5')
+            )
             self.is_loaded = True
             
         except Exception as e:
             logger.error("Error loading vessel prediction model", error=str(e))
             raise
     
+    def load_keras_model(self):
+        """Keras model for training/export (loaded or built once)"""
+        if self.model is not None:
+            return self.model
+        
+        model_file = os.path.join(self.model_path, 'vessel_prediction_model.h5')
+        if os.path.exists(model_file):
+            self.model = get_tensorflow().keras.models.load_model(
+                model_file,
+                custom_objects={'position_loss': self.position_loss}
+            )
+            logger.info("Vessel prediction model loaded", path=model_file)
+        else:
+            # Build new model if no saved model exists
+            self.model = self.build_model()
+            logger.info("Built new vessel prediction model")
+        return self.model
+    
     async def save_model(self):
         """Save trained model"""
         try:
@@ -473,6 +496,9 @@ class VesselMovementPredictor:
             
             logger.info("Vessel prediction model saved", path=model_file)
             
+            # Next prediction re-exports the new weights for the configured backend
+            self.is_loaded = False
+            
         except Exception as e:
             logger.error("Error saving vessel prediction model", error=str(e))
             raise
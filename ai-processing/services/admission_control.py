@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Admission Control Service for TradeWatch
+Per-endpoint concurrency limits with priority wait queues and fast 503 load shedding
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import math
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+from utils.timing import record
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Priority classes - lower values are admitted first and may preempt higher ones in a full queue
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+MIN_RETRY_AFTER_SECONDS = 1
+MAX_RETRY_AFTER_SECONDS = 30
+
+if PROMETHEUS_AVAILABLE:
+    ADMISSION_IN_FLIGHT = Gauge("tradewatch_admission_in_flight", "Requests holding an admission slot", ["limit"])
+    ADMISSION_QUEUE_DEPTH = Gauge("tradewatch_admission_queue_depth", "Requests waiting for an admission slot", ["limit"])
+    ADMISSION_ADMITTED = Counter("tradewatch_admission_admitted_total", "Admitted requests", ["limit", "priority"])
+    ADMISSION_SHED = Counter("tradewatch_admission_shed_total", "Requests rejected with 503", ["limit", "reason"])
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, limit: str, reason: str, retry_after: int):
+        super().__init__(f"{limit} overloaded ({reason})")
+        self.limit = limit
+        self.reason = reason
+        self.retry_after = retry_after
+
+class ConcurrencyLimiter:
+    """
+    At most `max_concurrent` requests in flight, at most `max_queue` waiting
+
+    Waiters are served by priority, then arrival order. A full queue sheds the
+    newcomer unless it outranks the newest lowest-priority waiter, which is shed
+    instead. Waiting longer than `max_wait_seconds` also sheds.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait_seconds: float):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._service_ms_ewma: Optional[float] = None
+        self.stats: Dict[str, Any] = {
+            "admitted": 0,
+            "queued": 0,
+            "shed": {"queue_full": 0, "preempted": 0, "timeout": 0},
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the smoothed service time and backlog"""
+        service_seconds = (self._service_ms_ewma or 1000) / 1000
+        backlog = (self.queue_depth + self.in_flight) / self.max_concurrent
+        return int(min(MAX_RETRY_AFTER_SECONDS, max(MIN_RETRY_AFTER_SECONDS, math.ceil(service_seconds * backlog))))
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        """
+        Wait for a slot; returns the admission time for `release()`
+
+        Raises:
+            AdmissionRejected: if the request is shed
+        """
+        start = time.perf_counter()
+        if self.in_flight < self.max_concurrent and not self._has_waiter_at_or_above(priority):
+            return self._admit(priority, start)
+
+        if self.queue_depth >= self.max_queue and not self._preempt(priority):
+            self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._queue, entry)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue_depth)
+        self._update_gauges()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                self._discard_cancelled()
+                self._shed("timeout")
+        except asyncio.CancelledError:
+            # Client went away: give back a slot that was handed over in the meantime
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release(start)
+            else:
+                waiter.cancel()
+                self._discard_cancelled()
+            raise
+
+        if waiter.exception() is not None:
+            raise waiter.exception()
+        self.stats["total_wait_ms"] += (time.perf_counter() - start) * 1000
+        return self._count_admitted(priority, start)
+
+    def release(self, admitted_at: float):
+        elapsed_ms = (time.perf_counter() - admitted_at) * 1000
+        self._service_ms_ewma = elapsed_ms if self._service_ms_ewma is None else 0.8 * self._service_ms_ewma + 0.2 * elapsed_ms
+        self.in_flight -= 1
+        # Hand the slot straight to the best live waiter
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+                break
+        self._update_gauges()
+
+    def _admit(self, priority: int, start: float) -> float:
+        self.in_flight += 1
+        return self._count_admitted(priority, start)
+
+    def _count_admitted(self, priority: int, start: float) -> float:
+        self.stats["admitted"] += 1
+        if PROMETHEUS_AVAILABLE:
+            ADMISSION_ADMITTED.labels(self.name, PRIORITY_NAMES.get(priority, str(priority))).inc()
+        self._update_gauges()
+        return time.perf_counter()
+
+    def _has_waiter_at_or_above(self, priority: int) -> bool:
+        return any(not waiter.done() and waiting_priority <= priority for waiting_priority, _, waiter in self._queue)
+
+    def _preempt(self, priority: int) -> bool:
+        """Shed the newest waiter of the lowest priority below `priority`; False if there is none"""
+        victims = [entry for entry in self._queue if not entry[2].done() and entry[0] > priority]
+        if not victims:
+            return False
+        victim = max(victims, key=lambda entry: (entry[0], entry[1]))
+        victim[2].set_exception(self._rejection("preempted"))
+        self._discard_cancelled()
+        return True
+
+    def _discard_cancelled(self):
+        self._queue = [entry for entry in self._queue if not entry[2].done()]
+        heapq.heapify(self._queue)
+        self._update_gauges()
+
+    def _rejection(self, reason: str) -> AdmissionRejected:
+        self.stats["shed"][reason] += 1
+        if PROMETHEUS_AVAILABLE:
+            ADMISSION_SHED.labels(self.name, reason).inc()
+        return AdmissionRejected(self.name, reason, self.retry_after())
+
+    def _shed(self, reason: str):
+        raise self._rejection(reason)
+
+    def _update_gauges(self):
+        if PROMETHEUS_AVAILABLE:
+            ADMISSION_IN_FLIGHT.labels(self.name).set(self.in_flight)
+            ADMISSION_QUEUE_DEPTH.labels(self.name).set(self.queue_depth)
+
+    def get_stats(self) -> Dict[str, Any]:
+        admitted = self.stats["admitted"]
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": admitted,
+            "queued": self.stats["queued"],
+            "shed": dict(self.stats["shed"]),
+            "shed_total": sum(self.stats["shed"].values()),
+            "max_queue_depth": self.stats["max_queue_depth"],
+            "avg_wait_ms": round(self.stats["total_wait_ms"] / admitted, 1) if admitted else None,
+            "avg_service_ms": round(self._service_ms_ewma, 1) if self._service_ms_ewma is not None else None,
+            "retry_after_seconds": self.retry_after(),
+        }
+
+class AdmissionController:
+    """Named limiters plus path-prefix routing rules; unmatched paths are never limited"""
+
+    def __init__(self):
+        self.limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._routes: List[Tuple[str, str, int]] = []
+
+    def add_limit(self, name: str, max_concurrent: int, max_queue: int, max_wait_seconds: float) -> ConcurrencyLimiter:
+        limiter = self.limiters[name] = ConcurrencyLimiter(name, max_concurrent, max_queue, max_wait_seconds)
+        return limiter
+
+    def route(self, path_prefix: str, limit: str, priority: int = PRIORITY_NORMAL):
+        """Send requests under `path_prefix` through `limit` (first matching rule wins)"""
+        if limit not in self.limiters:
+            raise ValueError(f"Unknown admission limit '{limit}'")
+        self._routes.append((path_prefix, limit, priority))
+
+    def match(self, path: str) -> Optional[Tuple[ConcurrencyLimiter, int]]:
+        for prefix, limit, priority in self._routes:
+            if path.startswith(prefix):
+                return self.limiters[limit], priority
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limits": {name: limiter.get_stats() for name, limiter in self.limiters.items()},
+            "routes": [
+                {"path_prefix": prefix, "limit": limit, "priority": PRIORITY_NAMES.get(priority, priority)}
+                for prefix, limit, priority in self._routes
+            ],
+        }
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to incoming HTTP requests
+
+    Limits apply per request, not per handler call, so endpoints that call other
+    endpoint functions internally never wait on their own limit.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        match = self.controller.match(scope["path"]) if scope["type"] == "http" else None
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter, priority = match
+        start = time.perf_counter()
+        try:
+            admitted_at = await limiter.acquire(priority)
+        except AdmissionRejected as e:
+            logger.warning(f"⚠️ Shed {scope['path']}: {e}")
+            await self._reject(send, e)
+            return
+        finally:
+            record("admission_wait", time.perf_counter() - start)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(admitted_at)
+
+    @staticmethod
+    async def _reject(send, rejection: AdmissionRejected):
+        body = json.dumps({
+            "detail": "Server is busy, retry later",
+            "limit": rejection.limit,
+            "reason": rejection.reason,
+            "retry_after_seconds": rejection.retry_after,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejection.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
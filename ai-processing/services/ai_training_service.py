@@ -25,8 +25,6 @@ from tensorflow.keras import layers
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AITrainingService:
@@ -8,14 +8,16 @@ import asyncio
 import aiohttp
 import json
 import logging
+import os
 import websockets
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import ssl
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from services.request_coalescer import single_flight
+from services.http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -111,7 +113,7 @@ class AISStreamIntegration:
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-AIS-Integration/1.0',
@@ -668,16 +670,27 @@ def initialize_aisstream_integration(api_key: str):
     aisstream_integration = AISStreamIntegration(api_key)
     logger.info("AIS Stream integration initialized with API key")
 
+# Every caller shares one AIS Stream session collecting this many vessels and takes a prefix of it
+AISSTREAM_FETCH_LIMIT = int(os.getenv("AISSTREAM_FETCH_LIMIT", "50"))
+
 async def get_real_aisstream_vessels(limit: int = 1000) -> List[Dict[str, Any]]:
     """
     Public function to get real vessel positions from AIS Stream
+
+    At most AISSTREAM_FETCH_LIMIT vessels: concurrent callers share one WebSocket
+    session via the request coalescer, whatever limit each of them asks for.
     """
+    return (await _shared_aisstream_vessels())[:limit]
+
+# Empty means not initialized or the session failed - never reuse it
+@single_flight(ttl_seconds=30, name="get_real_aisstream_vessels", cache_if=bool)
+async def _shared_aisstream_vessels() -> List[Dict[str, Any]]:
     if not aisstream_integration:
         logger.error("AIS Stream integration not initialized - call initialize_aisstream_integration() first")
         return []
     
     async with aisstream_integration:
-        return await aisstream_integration.get_real_vessel_data(limit)
+        return await aisstream_integration.get_real_vessel_data(AISSTREAM_FETCH_LIMIT)
 
 if __name__ == "__main__":
     # Test the integration
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+BDI Quote Service for TradeWatch
+Background-refreshed Baltic Dry Index quote raced across providers, served from memory
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+
+import httpx
+
+from services.http_pool import http_pool
+
+logger = logging.getLogger(__name__)
+
+# Last known real value (August 22, 2025, down 1.76%) - used until a provider answers
+FALLBACK_BDI_VALUE = 1893
+FALLBACK_BDI_CHANGE_PERCENT = -1.76
+FALLBACK_BDI_DATE = datetime(2025, 8, 22)
+
+# Anything outside this range is a parsing error, not a market move
+VALID_BDI_RANGE = (100, 20000)
+
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+@dataclass(frozen=True)
+class BDIQuote:
+    """One Baltic Dry Index observation"""
+    value: int
+    change_percent: Optional[float]
+    date: datetime
+    source: str
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+async def fetch_yahoo_bdi(client: httpx.AsyncClient) -> Optional[int]:
+    response = await client.get(
+        "https://query1.finance.yahoo.com/v8/finance/chart/BDI",
+        headers={'User-Agent': BROWSER_USER_AGENT}
+    )
+    if response.status_code == 200:
+        data = response.json()
+        if 'chart' in data and data['chart']['result']:
+            result = data['chart']['result'][0]
+            if 'meta' in result and 'regularMarketPrice' in result['meta']:
+                return int(result['meta']['regularMarketPrice'])
+    return None
+
+async def fetch_marketwatch_bdi(client: httpx.AsyncClient) -> Optional[int]:
+    response = await client.get(
+        "https://api.marketwatch.com/investing/index/bdi",
+        headers={'User-Agent': BROWSER_USER_AGENT}
+    )
+    if response.status_code == 200:
+        data = response.json()
+        if 'LastPrice' in data:
+            return int(float(data['LastPrice']))
+    return None
+
+async def fetch_investing_bdi(client: httpx.AsyncClient) -> Optional[int]:
+    response = await client.get(
+        "https://api.investing.com/api/financialdata/8830/historical/chart/?period=P1D&interval=PT1M&pointscount=120",
+        headers={'User-Agent': BROWSER_USER_AGENT, 'Domain-Id': '1'}
+    )
+    if response.status_code == 200:
+        data = response.json()
+        if 'data' in data and len(data['data']) > 0:
+            latest = data['data'][-1]
+            if len(latest) > 1:
+                return int(float(latest[1]))
+    return None
+
+DEFAULT_PROVIDERS: List[Tuple[str, Callable[[httpx.AsyncClient], Awaitable[Optional[int]]]]] = [
+    ("Yahoo Finance", fetch_yahoo_bdi),
+    ("MarketWatch", fetch_marketwatch_bdi),
+    ("Investing.com", fetch_investing_bdi),
+]
+
+class BDIQuoteService:
+    """
+    Keeps the latest BDI quote and a short daily history in memory
+
+    A background loop races all providers concurrently and keeps the first valid
+    answer, so readers never wait on the network: `latest()` and
+    `current_value()` are synchronous and fall back to the last known real value.
+    """
+
+    def __init__(self, providers=None, refresh_interval: float = 900, timeout: float = 10,
+                 history_size: int = 90):
+        self.providers = list(providers or DEFAULT_PROVIDERS)
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.history: deque = deque(maxlen=history_size)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "refreshes": 0,
+            "failures": 0,
+            "wins": {},
+            "provider_errors": {},
+            "last_refresh_ms": None,
+            "last_error": None,
+        }
+
+    def latest(self) -> BDIQuote:
+        """Most recent quote, or the last known real value before the first refresh succeeds"""
+        if self.history:
+            return self.history[-1]
+        return BDIQuote(FALLBACK_BDI_VALUE, FALLBACK_BDI_CHANGE_PERCENT, FALLBACK_BDI_DATE,
+                        "Last known value (fallback)", fetched_at=FALLBACK_BDI_DATE)
+
+    def current_value(self) -> int:
+        return self.latest().value
+
+    def trend(self, window: int = 5, threshold_percent: float = 1.0) -> Dict[str, Any]:
+        """Percent change over the last `window` daily prints and a bullish/bearish/stable label"""
+        quotes = list(self.history)[-window:]
+        if len(quotes) < 2:
+            latest = self.latest()
+            change = latest.change_percent or 0.0
+            points = len(quotes)
+        else:
+            change = (quotes[-1].value - quotes[0].value) / quotes[0].value * 100
+            points = len(quotes)
+        direction = "bullish" if change > threshold_percent else "bearish" if change < -threshold_percent else "stable"
+        return {"change_percent": round(change, 2), "direction": direction, "points": points}
+
+    async def start(self):
+        """Start the refresh loop; the first quote arrives in the background"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run_refresh_loop())
+            logger.info(f"BDI quote service started (refresh every {self.refresh_interval:.0f}s)")
+
+    async def stop(self):
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._loop_task = None
+        self._refresh_task = None
+
+    async def refresh(self) -> Optional[BDIQuote]:
+        """Race the providers once (joining an in-flight refresh) and record the winner"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _run_refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"BDI refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _refresh(self) -> Optional[BDIQuote]:
+        start = time.perf_counter()
+        winner = await self._race()
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        if winner is None:
+            self.stats["failures"] += 1
+            self.stats["last_error"] = "no provider returned a valid quote"
+            logger.warning(f"⚠️ All BDI providers failed, serving {self.current_value()} from memory")
+            return None
+
+        source, value = winner
+        self.stats["wins"][source] = self.stats["wins"].get(source, 0) + 1
+        self.stats["last_error"] = None
+        return self._record(value, source)
+
+    async def _race(self) -> Optional[Tuple[str, int]]:
+        client = http_pool.httpx_client()
+        pending = {asyncio.create_task(fetch(client)): name for name, fetch in self.providers}
+        deadline = time.monotonic() + self.timeout
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        value = task.result()
+                    except Exception as e:
+                        self.stats["provider_errors"][name] = self.stats["provider_errors"].get(name, 0) + 1
+                        logger.warning(f"{name} BDI failed: {e}")
+                        continue
+                    if value is not None and VALID_BDI_RANGE[0] <= value <= VALID_BDI_RANGE[1]:
+                        logger.info(f"✅ Got real BDI from {name}: {value}")
+                        return name, value
+        finally:
+            for task in pending:
+                task.cancel()
+        return None
+
+    def _record(self, value: int, source: str) -> BDIQuote:
+        """Keep one history point per day; the change is against the previous day's print, if any"""
+        now = datetime.now()
+        if self.history and self.history[-1].date.date() == now.date():
+            # Intraday refresh - update today's point in place
+            self.history.pop()
+        previous = self.history[-1] if self.history else None
+        change_percent = round((value - previous.value) / previous.value * 100, 2) if previous is not None else None
+        quote = BDIQuote(value, change_percent, now, source, fetched_at=now)
+        self.history.append(quote)
+        return quote
+
+    def get_status(self) -> Dict[str, Any]:
+        latest = self.latest()
+        return {
+            "value": latest.value,
+            "source": latest.source,
+            "change_percent": latest.change_percent,
+            "fetched_at": latest.fetched_at.isoformat(),
+            "history_points": len(self.history),
+            "trend": self.trend(),
+            **self.stats,
+        }
+
+BDI_REFRESH_SECONDS = float(os.getenv("BDI_REFRESH_SECONDS", "900"))
+
+# Global BDI quote service instance
+bdi_quote_service = BDIQuoteService(refresh_interval=BDI_REFRESH_SECONDS)
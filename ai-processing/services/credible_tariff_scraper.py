@@ -12,6 +12,7 @@ from typing import Dict, List, Optional
 import re
 import csv
 from io import StringIO
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ class CredibleTariffScraper:
         self.session = None
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -4,269 +4,655 @@ Data Cache Service for TradeWatch
 Stores real AIS, tariff, and disruption data in SQLite database for fast retrieval
 """
 
+import os
 import sqlite3
 import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Callable
 import logging
 from pathlib import Path
 
+from services.response_cache import encode_json
+from services.record_codec import RecordCodec
+from services.memory_tier import MemoryTier, DEFAULT_MEMORY_TTL_SECONDS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Statements are module constants so the long-lived connection's statement cache
+# prepares each one once and reuses it for every batch
+UPSERT_VESSEL_SQL = """
+    INSERT OR REPLACE INTO vessels 
+    (id, mmsi, name, latitude, longitude, speed, course, status, 
+     vessel_type, flag, data_source, raw_data, updated_ms, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+UPSERT_DISRUPTION_SQL = """
+    INSERT OR REPLACE INTO disruptions 
+    (id, title, description, severity, status, disruption_type,
+     latitude, longitude, confidence, raw_data, updated_ms, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+UPSERT_TARIFF_SQL = """
+    INSERT OR REPLACE INTO tariffs 
+    (id, name, rate, tariff_type, status, importer, exporter, 
+     priority, raw_data, updated_ms, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+CACHE_TABLES = ("vessels", "disruptions", "tariffs")
+
+# How long rows are kept after their last update; reads never ask for older rows than this
+DEFAULT_RETENTION_HOURS = {"vessels": 6, "disruptions": 48, "tariffs": 168}
+
+# Rows deleted per eviction transaction, so writers are never locked out for long
+EVICTION_CHUNK_ROWS = 1000
+
+class EncodedRecords(NamedTuple):
+    """Cached rows as one JSON array, spliced from the stored JSON"""
+    count: int
+    body: bytes
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+def _vessel_row(vessel: Dict[str, Any]) -> tuple:
+    return (
+        vessel.get('id', f"vessel_{vessel.get('mmsi', 'unknown')}"),
+        vessel.get('mmsi'),
+        vessel.get('name'),
+        vessel.get('latitude'),
+        vessel.get('longitude'),
+        vessel.get('speed'),
+        vessel.get('course'),
+        vessel.get('status'),
+        vessel.get('type'),
+        vessel.get('flag'),
+        vessel.get('data_source', 'AIS Stream')
+    )
+
+def _disruption_row(disruption: Dict[str, Any]) -> tuple:
+    coords = disruption.get('coordinates', [0, 0])
+    lat = coords[0] if len(coords) > 0 else 0
+    lon = coords[1] if len(coords) > 1 else 0
+    return (
+        disruption.get('id', f"disruption_{datetime.now().timestamp()}"),
+        disruption.get('title'),
+        disruption.get('description'),
+        disruption.get('severity'),
+        disruption.get('status'),
+        disruption.get('type'),
+        lat,
+        lon,
+        disruption.get('confidence', 0)
+    )
+
+def _tariff_row(tariff: Dict[str, Any]) -> tuple:
+    return (
+        tariff.get('id', f"tariff_{datetime.now().timestamp()}"),
+        tariff.get('name'),
+        tariff.get('rate'),
+        tariff.get('type'),
+        tariff.get('status'),
+        tariff.get('importer'),
+        tariff.get('exporter'),
+        tariff.get('priority')
+    )
+
 class DataCache:
-    """SQLite-based cache for maritime data"""
+    """
+    SQLite-based cache for maritime data
+    
+    The database runs in WAL mode so reads never wait for a write in progress.
+    Writes go through one long-lived connection (shared by threads, serialized
+    by a lock) and commit each batch as a single `executemany` transaction.
     
-    def __init__(self, db_path: str = "data/tradewatch_cache.db"):
+    Freshness is the integer `updated_ms` column (epoch milliseconds). Rows
+    past their table's retention are evicted by `run_maintenance()`, which also
+    keeps the database under `max_bytes` (0 = unbounded) and hands freed pages
+    back to the filesystem with incremental VACUUM.
+    
+    raw_data holds zstd-compressed compact JSON (see RecordCodec); the `*_json`
+    readers splice the stored JSON into one array without building dicts, for
+    responses that serve cached records as they are.
+    
+    Read results are kept in a MemoryTier until a write to their table, until
+    their oldest row would age out of `max_age_hours`, or at most the table's
+    memory TTL. Decoded records are returned as shallow copies, so callers may
+    set fields on them without changing what later reads get.
+    """
+    
+    def __init__(self, db_path: str = "data/tradewatch_cache.db",
+                 retention_hours: Optional[Dict[str, float]] = None, max_bytes: int = 0,
+                 memory: Optional[MemoryTier] = None):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
+        self.retention_hours = {**DEFAULT_RETENTION_HOURS, **(retention_hours or {})}
+        self.max_bytes = max_bytes
+        self.codec = RecordCodec()
+        self.memory = memory or MemoryTier()
+        self.maintenance_stats: Dict[str, Any] = {
+            "runs": 0,
+            "expired_deleted": 0,
+            "size_deleted": 0,
+            "pages_vacuumed": 0,
+            "last_run_ms": 0.0,
+            "last_run_at": None,
+        }
+        self._write_lock = threading.Lock()
+        self._write_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL is persistent on the database file; synchronous=NORMAL is safe with WAL
+        # (a power loss can only drop the last commits, never corrupt the file)
+        self._write_conn.execute("PRAGMA journal_mode=WAL")
+        self._write_conn.execute("PRAGMA synchronous=NORMAL")
         self.init_database()
     
+    def close(self):
+        with self._write_lock:
+            self._write_conn.close()
+    
     def init_database(self):
-        """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executescript("""
-                CREATE TABLE IF NOT EXISTS vessels (
-                    id TEXT PRIMARY KEY,
-                    mmsi TEXT,
-                    name TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    speed REAL,
-                    course REAL,
-                    status TEXT,
-                    vessel_type TEXT,
-                    flag TEXT,
-                    data_source TEXT,
-                    raw_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
-                CREATE TABLE IF NOT EXISTS disruptions (
-                    id TEXT PRIMARY KEY,
-                    title TEXT,
-                    description TEXT,
-                    severity TEXT,
-                    status TEXT,
-                    disruption_type TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    confidence INTEGER,
-                    raw_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
-                CREATE TABLE IF NOT EXISTS tariffs (
-                    id TEXT PRIMARY KEY,
-                    name TEXT,
-                    rate TEXT,
-                    tariff_type TEXT,
-                    status TEXT,
-                    importer TEXT,
-                    exporter TEXT,
-                    priority TEXT,
-                    raw_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_vessels_updated ON vessels(updated_at);
-                CREATE INDEX IF NOT EXISTS idx_disruptions_updated ON disruptions(updated_at);
-                CREATE INDEX IF NOT EXISTS idx_tariffs_updated ON tariffs(updated_at);
-            """)
+        """Initialize database tables, migrating older files to epoch-ms freshness and incremental vacuum"""
+        with self._write_lock:
+            conn = self._write_conn
+            # Only takes effect on a new database or after a full VACUUM
+            needs_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            with conn:
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS vessels (
+                        id TEXT PRIMARY KEY,
+                        mmsi TEXT,
+                        name TEXT,
+                        latitude REAL,
+                        longitude REAL,
+                        speed REAL,
+                        course REAL,
+                        status TEXT,
+                        vessel_type TEXT,
+                        flag TEXT,
+                        data_source TEXT,
+                        raw_data BLOB,
+                        updated_ms INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    
+                    CREATE TABLE IF NOT EXISTS disruptions (
+                        id TEXT PRIMARY KEY,
+                        title TEXT,
+                        description TEXT,
+                        severity TEXT,
+                        status TEXT,
+                        disruption_type TEXT,
+                        latitude REAL,
+                        longitude REAL,
+                        confidence INTEGER,
+                        raw_data BLOB,
+                        updated_ms INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                    
+                    CREATE TABLE IF NOT EXISTS tariffs (
+                        id TEXT PRIMARY KEY,
+                        name TEXT,
+                        rate TEXT,
+                        tariff_type TEXT,
+                        status TEXT,
+                        importer TEXT,
+                        exporter TEXT,
+                        priority TEXT,
+                        raw_data BLOB,
+                        updated_ms INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                # Files created before compressed storage keep their raw_data TEXT declaration. TEXT
+                # affinity never converts bound bytes, so either way the column holds zstd BLOBs next to
+                # legacy JSON text rows, and RecordCodec reads both
+                for table in CACHE_TABLES:
+                    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    if "updated_ms" not in columns:
+                        # updated_at holds CURRENT_TIMESTAMP text, which is UTC
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_ms INTEGER NOT NULL DEFAULT 0")
+                        conn.execute(f"""
+                            UPDATE {table} SET updated_ms = CAST(strftime('%s', updated_at) AS INTEGER) * 1000
+                            WHERE updated_at IS NOT NULL
+                        """)
+                        logger.info(f"Migrated {table} to epoch-ms freshness")
+                    # The text-timestamp index compared 'T'-separated local times with UTC text
+                    conn.execute(f"DROP INDEX IF EXISTS idx_{table}_updated")
+                    # Index entries carry the rowid, so freshness counts and eviction never touch the table
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_updated_ms ON {table}(updated_ms)")
+                self.codec.load(conn)
+            if needs_vacuum:
+                conn.execute("VACUUM")
+                logger.info(f"Enabled incremental vacuum on {self.db_path}")
     
-    def cache_vessels(self, vessels: List[Dict[str, Any]]) -> int:
-        """Cache vessel data"""
-        cached_count = 0
+    def _write_rows(self, table: str, kind: str, sql: str, records: List[Dict[str, Any]], to_row) -> int:
+        """Upsert records in one transaction; records that cannot be stored are skipped with a warning"""
+        columns, payloads = [], []
+        for record in records:
+            try:
+                row, payload = to_row(record), encode_json(record)
+            except Exception as e:
+                logger.warning(f"Failed to cache {kind} {record.get('id', 'unknown')}: {e}")
+                continue
+            columns.append(row)
+            payloads.append(payload)
+        if not columns:
+            return 0
         
-        with sqlite3.connect(self.db_path) as conn:
-            for vessel in vessels:
-                try:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO vessels 
-                        (id, mmsi, name, latitude, longitude, speed, course, status, 
-                         vessel_type, flag, data_source, raw_data, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    """, (
-                        vessel.get('id', f"vessel_{vessel.get('mmsi', 'unknown')}"),
-                        vessel.get('mmsi'),
-                        vessel.get('name'),
-                        vessel.get('latitude'),
-                        vessel.get('longitude'),
-                        vessel.get('speed'),
-                        vessel.get('course'),
-                        vessel.get('status'),
-                        vessel.get('type'),
-                        vessel.get('flag'),
-                        vessel.get('data_source', 'AIS Stream'),
-                        json.dumps(vessel)
-                    ))
-                    cached_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to cache vessel {vessel.get('id', 'unknown')}: {e}")
+        start = time.perf_counter()
+        now_ms = _now_ms()
+        with self._write_lock:
+            # Committed on its own: a dictionary trained here must outlive a failed batch
+            with self._write_conn as conn:
+                raw_data = self.codec.compress(table, payloads, conn)
+            rows = [row + (raw, now_ms) for row, raw in zip(columns, raw_data)]
+            try:
+                with self._write_conn as conn:
+                    conn.executemany(sql, rows)
+                cached_count = len(rows)
+            except sqlite3.Error as e:
+                # One unbindable value fails the whole executemany - retry row by row to skip only it
+                logger.warning(f"Batch {kind} write failed ({e}), retrying row by row")
+                cached_count = 0
+                with self._write_conn as conn:
+                    for row in rows:
+                        try:
+                            conn.execute(sql, row)
+                            cached_count += 1
+                        except sqlite3.Error as row_error:
+                            logger.warning(f"Failed to cache {kind} {row[0]}: {row_error}")
+            self.memory.invalidate(table)
         
-        logger.info(f"Cached {cached_count} vessels")
+        logger.info(f"Cached {cached_count} {kind}s in {(time.perf_counter() - start) * 1000:.1f}ms")
         return cached_count
     
+    def cache_vessels(self, vessels: List[Dict[str, Any]]) -> int:
+        """Cache vessel data"""
+        return self._write_rows("vessels", "vessel", UPSERT_VESSEL_SQL, vessels, _vessel_row)
+    
     def cache_disruptions(self, disruptions: List[Dict[str, Any]]) -> int:
         """Cache disruption data"""
-        cached_count = 0
-        
-        with sqlite3.connect(self.db_path) as conn:
-            for disruption in disruptions:
-                try:
-                    coords = disruption.get('coordinates', [0, 0])
-                    lat = coords[0] if len(coords) > 0 else 0
-                    lon = coords[1] if len(coords) > 1 else 0
-                    
-                    conn.execute("""
-                        INSERT OR REPLACE INTO disruptions 
-                        (id, title, description, severity, status, disruption_type,
-                         latitude, longitude, confidence, raw_data, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    """, (
-                        disruption.get('id', f"disruption_{datetime.now().timestamp()}"),
-                        disruption.get('title'),
-                        disruption.get('description'),
-                        disruption.get('severity'),
-                        disruption.get('status'),
-                        disruption.get('type'),
-                        lat,
-                        lon,
-                        disruption.get('confidence', 0),
-                        json.dumps(disruption)
-                    ))
-                    cached_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to cache disruption {disruption.get('id', 'unknown')}: {e}")
-        
-        logger.info(f"Cached {cached_count} disruptions")
-        return cached_count
+        return self._write_rows("disruptions", "disruption", UPSERT_DISRUPTION_SQL, disruptions, _disruption_row)
     
     def cache_tariffs(self, tariffs: List[Dict[str, Any]]) -> int:
         """Cache tariff data"""
-        cached_count = 0
+        return self._write_rows("tariffs", "tariff", UPSERT_TARIFF_SQL, tariffs, _tariff_row)
+    
+    def _delete_oldest(self, table: str, cutoff_ms: Optional[int], chunk_size: int) -> int:
+        """Delete up to chunk_size of the oldest rows (optionally only those older than cutoff_ms)"""
+        where = "WHERE updated_ms < ? " if cutoff_ms is not None else ""
+        params = (cutoff_ms, chunk_size) if cutoff_ms is not None else (chunk_size,)
+        with self._write_lock, self._write_conn as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} {where}ORDER BY updated_ms LIMIT ?
+                )
+            """, params)
+        if cursor.rowcount:
+            self.memory.invalidate(table)
+        return cursor.rowcount
+    
+    def evict_expired(self, chunk_size: int = EVICTION_CHUNK_ROWS) -> int:
+        """Delete rows past their table's retention, one short transaction per chunk"""
+        deleted = 0
+        now_ms = _now_ms()
+        for table in CACHE_TABLES:
+            cutoff_ms = now_ms - int(self.retention_hours[table] * 3600 * 1000)
+            while True:
+                count = self._delete_oldest(table, cutoff_ms, chunk_size)
+                deleted += count
+                if count < chunk_size:
+                    break
+        return deleted
+    
+    def _page_counts(self) -> tuple:
+        conn = self._write_conn
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return page_size, page_count, free_pages
+    
+    def enforce_max_size(self, chunk_size: int = EVICTION_CHUNK_ROWS) -> int:
+        """Delete the oldest rows across all tables until the live pages fit in max_bytes"""
+        if self.max_bytes <= 0:
+            return 0
+        deleted = 0
+        while True:
+            with self._write_lock:
+                page_size, page_count, free_pages = self._page_counts()
+                if (page_count - free_pages) * page_size <= self.max_bytes:
+                    break
+                oldest = {}
+                for table in CACHE_TABLES:
+                    oldest_ms = self._write_conn.execute(f"SELECT MIN(updated_ms) FROM {table}").fetchone()[0]
+                    if oldest_ms is not None:
+                        oldest[table] = oldest_ms
+            if not oldest:
+                break
+            count = self._delete_oldest(min(oldest, key=oldest.get), None, chunk_size)
+            if count == 0:
+                break
+            deleted += count
+        if deleted:
+            logger.warning(f"⚠️ Cache database over {self.max_bytes} bytes - evicted {deleted} oldest rows")
+        return deleted
+    
+    def incremental_vacuum(self) -> int:
+        """Return free pages to the filesystem; returns how many were released"""
+        with self._write_lock:
+            free_before = self._page_counts()[2]
+            if free_before:
+                # execute() steps a statement once, which frees a single page; executescript runs it to completion
+                self._write_conn.executescript("PRAGMA incremental_vacuum;")
+            # Copy the WAL back and truncate it, otherwise it keeps the size of the largest write burst
+            # (best effort: skipped while a reader still needs the old pages)
+            self._write_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return free_before - self._page_counts()[2]
+    
+    def run_maintenance(self) -> Dict[str, Any]:
+        """TTL eviction, then the size bound, then incremental VACUUM"""
+        start = time.perf_counter()
+        expired = self.evict_expired()
+        over_size = self.enforce_max_size()
+        pages = self.incremental_vacuum()
         
-        with sqlite3.connect(self.db_path) as conn:
-            for tariff in tariffs:
-                try:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO tariffs 
-                        (id, name, rate, tariff_type, status, importer, exporter, 
-                         priority, raw_data, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    """, (
-                        tariff.get('id', f"tariff_{datetime.now().timestamp()}"),
-                        tariff.get('name'),
-                        tariff.get('rate'),
-                        tariff.get('type'),
-                        tariff.get('status'),
-                        tariff.get('importer'),
-                        tariff.get('exporter'),
-                        tariff.get('priority'),
-                        json.dumps(tariff)
-                    ))
-                    cached_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to cache tariff {tariff.get('id', 'unknown')}: {e}")
+        stats = self.maintenance_stats
+        stats["runs"] += 1
+        stats["expired_deleted"] += expired
+        stats["size_deleted"] += over_size
+        stats["pages_vacuumed"] += pages
+        stats["last_run_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        stats["last_run_at"] = datetime.now().isoformat()
+        if expired or over_size or pages:
+            logger.info(f"🧹 Cache maintenance: {expired} expired, {over_size} over size, "
+                        f"{pages} pages released in {stats['last_run_ms']:.0f}ms")
+        return {"expired_deleted": expired, "size_deleted": over_size, "pages_vacuumed": pages}
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+    
+    def _lookup(self, table: str, form: str, limit: int, max_age_hours: float) -> Optional[Any]:
+        """Memory-tier hit for a read, or None"""
+        value = self.memory.get((table, form, limit, max_age_hours))
+        if value is not None and form == "records":
+            return [dict(record) for record in value]
+        return value
+    
+    def _load(self, conn: sqlite3.Connection, table: str, kind: str, form: str, limit: int,
+              max_age_hours: float) -> Any:
+        """Read from SQLite and keep the result in the memory tier"""
+        generation = self.memory.generation(table)
+        records_json, oldest_ms = _recent_json(conn, self.codec, table, kind, limit, max_age_hours)
+        size = sum(len(record_json) for record_json in records_json)
+        value = _decode_records(records_json, kind) if form == "records" else _splice(records_json)
         
-        logger.info(f"Cached {cached_count} tariffs")
-        return cached_count
+        expires_at = None
+        if oldest_ms is not None:
+            # The result changes once its oldest row is older than max_age_hours
+            expires_at = time.monotonic() + (oldest_ms + max_age_hours * 3600 * 1000 - _now_ms()) / 1000
+        self.memory.put((table, form, limit, max_age_hours), value, size, generation, expires_at)
+        return [dict(record) for record in value] if form == "records" else value
+    
+    def _read(self, table: str, kind: str, form: str, limit: int, max_age_hours: float) -> Any:
+        value = self._lookup(table, form, limit, max_age_hours)
+        if value is None:
+            with closing(self._connect()) as conn:
+                value = self._load(conn, table, kind, form, limit, max_age_hours)
+        return value
     
     def get_cached_vessels(self, limit: int = 500, max_age_hours: int = 1) -> List[Dict[str, Any]]:
         """Get cached vessels that are not too old"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT raw_data FROM vessels 
-                WHERE updated_at > ? 
-                ORDER BY updated_at DESC 
-                LIMIT ?
-            """, (cutoff_time.isoformat(), limit))
-            
-            vessels = []
-            for row in cursor.fetchall():
-                try:
-                    vessel_data = json.loads(row['raw_data'])
-                    vessels.append(vessel_data)
-                except Exception as e:
-                    logger.warning(f"Failed to parse cached vessel data: {e}")
-            
-            return vessels
+        return self._read("vessels", "vessel", "records", limit, max_age_hours)
+    
+    def get_cached_vessels_json(self, limit: int = 500, max_age_hours: int = 1) -> EncodedRecords:
+        """Like get_cached_vessels, as one encoded JSON array"""
+        return self._read("vessels", "vessel", "json", limit, max_age_hours)
     
     def get_cached_disruptions(self, limit: int = 100, max_age_hours: int = 6) -> List[Dict[str, Any]]:
         """Get cached disruptions that are not too old"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT raw_data FROM disruptions 
-                WHERE updated_at > ? 
-                ORDER BY updated_at DESC 
-                LIMIT ?
-            """, (cutoff_time.isoformat(), limit))
-            
-            disruptions = []
-            for row in cursor.fetchall():
-                try:
-                    disruption_data = json.loads(row['raw_data'])
-                    disruptions.append(disruption_data)
-                except Exception as e:
-                    logger.warning(f"Failed to parse cached disruption data: {e}")
-            
-            return disruptions
+        return self._read("disruptions", "disruption", "records", limit, max_age_hours)
+    
+    def get_cached_disruptions_json(self, limit: int = 100, max_age_hours: int = 6) -> EncodedRecords:
+        """Like get_cached_disruptions, as one encoded JSON array"""
+        return self._read("disruptions", "disruption", "json", limit, max_age_hours)
     
     def get_cached_tariffs(self, limit: int = 50, max_age_hours: int = 24) -> List[Dict[str, Any]]:
         """Get cached tariffs that are not too old"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT raw_data FROM tariffs 
-                WHERE updated_at > ? 
-                ORDER BY updated_at DESC 
-                LIMIT ?
-            """, (cutoff_time.isoformat(), limit))
-            
-            tariffs = []
-            for row in cursor.fetchall():
-                try:
-                    tariff_data = json.loads(row['raw_data'])
-                    tariffs.append(tariff_data)
-                except Exception as e:
-                    logger.warning(f"Failed to parse cached tariff data: {e}")
-            
-            return tariffs
+        return self._read("tariffs", "tariff", "records", limit, max_age_hours)
+    
+    def get_cached_tariffs_json(self, limit: int = 50, max_age_hours: int = 24) -> EncodedRecords:
+        """Like get_cached_tariffs, as one encoded JSON array"""
+        return self._read("tariffs", "tariff", "json", limit, max_age_hours)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            stats = {}
-            
-            # Count vessels
-            cursor = conn.execute("SELECT COUNT(*) FROM vessels")
-            stats['vessels_total'] = cursor.fetchone()[0]
-            
-            # Count recent vessels (last hour)
-            cutoff = (datetime.now() - timedelta(hours=1)).isoformat()
-            cursor = conn.execute("SELECT COUNT(*) FROM vessels WHERE updated_at > ?", (cutoff,))
-            stats['vessels_recent'] = cursor.fetchone()[0]
-            
-            # Count disruptions
-            cursor = conn.execute("SELECT COUNT(*) FROM disruptions")
-            stats['disruptions_total'] = cursor.fetchone()[0]
-            
-            # Count tariffs
-            cursor = conn.execute("SELECT COUNT(*) FROM tariffs")
-            stats['tariffs_total'] = cursor.fetchone()[0]
-            
-            return stats
+        with closing(self._connect()) as conn:
+            return {**_count_stats(conn), **self._tier_stats()}
+    
+    def _tier_stats(self) -> Dict[str, Any]:
+        return {"maintenance": dict(self.maintenance_stats), "memory": self.memory.get_stats()}
+
+def _recent_json(conn: sqlite3.Connection, codec: RecordCodec, table: str, kind: str, limit: int,
+                 max_age_hours: float) -> Tuple[List[bytes], Optional[int]]:
+    """JSON bytes of the newest rows updated within max_age_hours, and the oldest row's updated_ms"""
+    cutoff_ms = _now_ms() - int(max_age_hours * 3600 * 1000)
+    cursor = conn.execute(f"""
+        SELECT raw_data, updated_ms FROM {table} 
+        WHERE updated_ms > ? 
+        ORDER BY updated_ms DESC 
+        LIMIT ?
+    """, (cutoff_ms, limit))
+    
+    records = []
+    oldest_ms = None
+    for raw_data, oldest_ms in cursor.fetchall():
+        try:
+            records.append(codec.to_json(raw_data, conn))
+        except Exception as e:
+            logger.warning(f"Failed to read cached {kind} data: {e}")
+    
+    return records, oldest_ms
+
+def _decode_records(records_json: List[bytes], kind: str) -> List[Dict[str, Any]]:
+    records = []
+    for record_json in records_json:
+        try:
+            records.append(orjson.loads(record_json) if ORJSON_AVAILABLE else json.loads(record_json))
+        except Exception as e:
+            logger.warning(f"Failed to parse cached {kind} data: {e}")
+    
+    return records
+
+def _splice(records_json: List[bytes]) -> EncodedRecords:
+    """The rows as one JSON array, spliced from the stored JSON without decoding it"""
+    return EncodedRecords(len(records_json), b"[" + b",".join(records_json) + b"]")
+
+def _count_stats(conn: sqlite3.Connection) -> Dict[str, Any]:
+    stats = {}
+    
+    # Count vessels
+    cursor = conn.execute("SELECT COUNT(*) FROM vessels")
+    stats['vessels_total'] = cursor.fetchone()[0]
+    
+    # Count recent vessels (last hour)
+    cutoff_ms = _now_ms() - 3600 * 1000
+    cursor = conn.execute("SELECT COUNT(*) FROM vessels WHERE updated_ms > ?", (cutoff_ms,))
+    stats['vessels_recent'] = cursor.fetchone()[0]
+    
+    # Count disruptions
+    cursor = conn.execute("SELECT COUNT(*) FROM disruptions")
+    stats['disruptions_total'] = cursor.fetchone()[0]
+    
+    # Count tariffs
+    cursor = conn.execute("SELECT COUNT(*) FROM tariffs")
+    stats['tariffs_total'] = cursor.fetchone()[0]
+    
+    # Database size, and the part of it free pages still hold
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    stats['db_bytes'] = conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+    stats['free_bytes'] = conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size
+    
+    return stats
+
+class AsyncDataCache:
+    """
+    Non-blocking DataCache API for the event loop
+    
+    Reads (the SQLite query and the JSON decoding) run on a small pool of reader
+    threads, each holding its own read-only connection, so concurrent reads
+    proceed in parallel under WAL. Every write, including maintenance and the
+    batches other threads hand over through `write_blocking` (e.g. the
+    write-behind queue), runs on one writer thread over the DataCache write
+    connection. `sync` is the wrapped DataCache for reads from scripts and other
+    threads; writing through it directly would add a second SQLite writer.
+    """
+    
+    def __init__(self, cache: DataCache, reader_threads: int = 4, maintenance_interval: float = 300.0):
+        self.sync = cache
+        self.reader_threads = max(1, reader_threads)
+        self.maintenance_interval = maintenance_interval
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._readers = ThreadPoolExecutor(max_workers=self.reader_threads, thread_name_prefix="data-cache-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-cache-write")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+    
+    def _reader_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Closed from the shutdown thread, hence check_same_thread=False; each is used by one reader only
+            conn = sqlite3.connect(self.sync.db_path, check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    async def _read(self, query, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, lambda: query(self._reader_connection(), *args))
+    
+    async def _write(self, method, records: List[Dict[str, Any]]) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, method, records)
+    
+    def write_blocking(self, method: Callable[[List[Dict[str, Any]]], int], records: List[Dict[str, Any]]) -> int:
+        """Run a DataCache write method on the writer thread and wait for it (never from the event loop)"""
+        return self._writer.submit(method, records).result()
+    
+    async def _cached_read(self, table: str, kind: str, form: str, limit: int, max_age_hours: float) -> Any:
+        # Memory-tier hits are answered on the event loop without a thread hop
+        value = self.sync._lookup(table, form, limit, max_age_hours)
+        if value is None:
+            value = await self._read(self.sync._load, table, kind, form, limit, max_age_hours)
+        return value
+    
+    async def get_cached_vessels(self, limit: int = 500, max_age_hours: int = 1) -> List[Dict[str, Any]]:
+        return await self._cached_read("vessels", "vessel", "records", limit, max_age_hours)
+    
+    async def get_cached_vessels_json(self, limit: int = 500, max_age_hours: int = 1) -> EncodedRecords:
+        return await self._cached_read("vessels", "vessel", "json", limit, max_age_hours)
+    
+    async def get_cached_disruptions(self, limit: int = 100, max_age_hours: int = 6) -> List[Dict[str, Any]]:
+        return await self._cached_read("disruptions", "disruption", "records", limit, max_age_hours)
+    
+    async def get_cached_disruptions_json(self, limit: int = 100, max_age_hours: int = 6) -> EncodedRecords:
+        return await self._cached_read("disruptions", "disruption", "json", limit, max_age_hours)
+    
+    async def get_cached_tariffs(self, limit: int = 50, max_age_hours: int = 24) -> List[Dict[str, Any]]:
+        return await self._cached_read("tariffs", "tariff", "records", limit, max_age_hours)
+    
+    async def get_cached_tariffs_json(self, limit: int = 50, max_age_hours: int = 24) -> EncodedRecords:
+        return await self._cached_read("tariffs", "tariff", "json", limit, max_age_hours)
+    
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        stats = await self._read(_count_stats)
+        return {**stats, **self.sync._tier_stats()}
+    
+    async def cache_vessels(self, vessels: List[Dict[str, Any]]) -> int:
+        return await self._write(self.sync.cache_vessels, vessels)
+    
+    async def cache_disruptions(self, disruptions: List[Dict[str, Any]]) -> int:
+        return await self._write(self.sync.cache_disruptions, disruptions)
+    
+    async def cache_tariffs(self, tariffs: List[Dict[str, Any]]) -> int:
+        return await self._write(self.sync.cache_tariffs, tariffs)
+    
+    async def run_maintenance(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self.sync.run_maintenance)
+    
+    async def start_maintenance(self):
+        """Run eviction and incremental VACUUM now and then every maintenance_interval seconds"""
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._run_maintenance_loop())
+            logger.info(f"Cache maintenance started (every {self.maintenance_interval:.0f}s)")
+    
+    async def stop_maintenance(self):
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            self._maintenance_task.cancel()
+        self._maintenance_task = None
+    
+    async def _run_maintenance_loop(self):
+        while True:
+            try:
+                await self.run_maintenance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache maintenance failed: {e}")
+            await asyncio.sleep(self.maintenance_interval)
+    
+    def close(self):
+        """Wait for queued reads and writes, then close every connection (blocking)"""
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self.sync.close()
+
+DATA_CACHE_READER_THREADS = int(os.getenv("DATA_CACHE_READER_THREADS", "4"))
+DATA_CACHE_MAX_MB = float(os.getenv("DATA_CACHE_MAX_MB", "512"))
+DATA_CACHE_MAINTENANCE_SECONDS = float(os.getenv("DATA_CACHE_MAINTENANCE_SECONDS", "300"))
+DATA_CACHE_RETENTION_HOURS = {
+    table: float(os.getenv(f"DATA_CACHE_{table.upper()}_RETENTION_HOURS", str(hours)))
+    for table, hours in DEFAULT_RETENTION_HOURS.items()
+}
+DATA_CACHE_MEMORY_MB = float(os.getenv("DATA_CACHE_MEMORY_MB", "64"))
+DATA_CACHE_MEMORY_TTL_SECONDS = {
+    table: float(os.getenv(f"DATA_CACHE_{table.upper()}_MEMORY_TTL_SECONDS", str(seconds)))
+    for table, seconds in DEFAULT_MEMORY_TTL_SECONDS.items()
+}
 
-# Global cache instance
-data_cache = DataCache()
+# Global cache instances
+data_cache = DataCache(
+    retention_hours=DATA_CACHE_RETENTION_HOURS,
+    max_bytes=int(DATA_CACHE_MAX_MB * 1024 * 1024),
+    memory=MemoryTier(int(DATA_CACHE_MEMORY_MB * 1024 * 1024), ttl_seconds=DATA_CACHE_MEMORY_TTL_SECONDS)
+)
+async_data_cache = AsyncDataCache(
+    data_cache,
+    reader_threads=DATA_CACHE_READER_THREADS,
+    maintenance_interval=DATA_CACHE_MAINTENANCE_SECONDS
+)
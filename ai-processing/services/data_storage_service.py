@@ -10,13 +10,11 @@ import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import asyncpg
-import httpx
+from services.http_pool import http_pool
 from dataclasses import dataclass, asdict
 import os
 from contextlib import asynccontextmanager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -201,7 +199,7 @@ class DataStorageService:
     async def collect_and_store_vessels(self):
         """Collect vessel data and store in database"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_pool.httpx() as client:
                 response = await client.get(f"{self.data_api_url}/api/vessels?limit=3000")
                 if response.status_code == 200:
                     data = response.json()
@@ -245,7 +243,7 @@ class DataStorageService:
     async def collect_and_store_disruptions(self):
         """Collect disruption data and store in database"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_pool.httpx() as client:
                 response = await client.get(f"{self.data_api_url}/api/maritime-disruptions")
                 if response.status_code == 200:
                     data = response.json()
@@ -284,7 +282,7 @@ class DataStorageService:
     async def collect_and_store_tariffs(self):
         """Collect tariff data and store in database"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_pool.httpx() as client:
                 response = await client.get(f"{self.data_api_url}/api/tariffs?limit=1000")
                 if response.status_code == 200:
                     data = response.json()
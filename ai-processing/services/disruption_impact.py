@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Disruption Impact Engine for TradeWatch
+Vectorized vessel-vs-disruption proximity checks using a broadcast haversine pass
+"""
+
+import math
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371
+
+# Impact radius multipliers by disruption severity (medium/low use the base radius)
+SEVERITY_RADIUS_MULTIPLIERS = {
+    "high": 1.5,
+    "critical": 2.0,
+}
+
+# Vessels are processed in row blocks so the vessels x disruptions temporaries stay bounded
+DEFAULT_CHUNK_SIZE = 4096
+
+# Pairs whose haversine term lands this close to a radius threshold are re-checked
+# with the scalar formula so vectorized rounding can never flip an impacted flag
+BOUNDARY_TOLERANCE = 1e-9
+
+@dataclass
+class DisruptionImpactResult:
+    """Per-vessel impact flags plus the nearest active disruption"""
+    impacted: np.ndarray              # bool, shape (n_vessels,)
+    nearest_index: np.ndarray         # int, -1 when there are no active disruptions
+    nearest_distance_km: np.ndarray   # float, inf when there are no active disruptions
+    disruption_ids: List[Optional[str]]
+
+    def nearest_id(self, i: int) -> Optional[str]:
+        index = int(self.nearest_index[i])
+        return self.disruption_ids[index] if index >= 0 else None
+
+def _scalar_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar haversine - identical formula to the API's calculate_distance"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    return c * EARTH_RADIUS_KM
+
+class DisruptionImpactEngine:
+    """Precomputes active disruption arrays once and evaluates whole vessel batches"""
+
+    def __init__(self, disruptions: Sequence[Dict[str, Any]], impact_radius_km: float = 500,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.impact_radius_km = impact_radius_km
+        self.chunk_size = chunk_size
+
+        lats, lons, radii, ids = [], [], [], []
+        for disruption in disruptions:
+            if disruption.get("status") != "active" or "coordinates" not in disruption:
+                continue
+            try:
+                disruption_lat, disruption_lon = disruption["coordinates"]
+                disruption_lat, disruption_lon = float(disruption_lat), float(disruption_lon)
+            except (TypeError, ValueError):
+                logger.debug(f"Skipping disruption {disruption.get('id', 'unknown')} - invalid coordinates")
+                continue
+
+            severity = disruption.get("severity") or "medium"
+            multiplier = SEVERITY_RADIUS_MULTIPLIERS.get(str(severity).lower(), 1.0)
+
+            lats.append(disruption_lat)
+            lons.append(disruption_lon)
+            radii.append(impact_radius_km * multiplier)
+            ids.append(disruption.get("id") or disruption.get("title"))
+
+        self.disruption_lats = np.asarray(lats, dtype=np.float64)
+        self.disruption_lons = np.asarray(lons, dtype=np.float64)
+        self.radii_km = np.asarray(radii, dtype=np.float64)
+        self.disruption_ids = ids
+
+        # Half-angle terms let sin(dlat/2) be expanded per pair without any trig calls
+        lat_rad = np.radians(self.disruption_lats)
+        lon_rad = np.radians(self.disruption_lons)
+        self._sin_half_lat = np.sin(lat_rad / 2)
+        self._cos_half_lat = np.cos(lat_rad / 2)
+        self._sin_half_lon = np.sin(lon_rad / 2)
+        self._cos_half_lon = np.cos(lon_rad / 2)
+        self._cos_lat = np.cos(lat_rad)
+
+        # Haversine term a = sin^2(d / 2R) at each disruption's radius
+        self._radius_a = np.sin(self.radii_km / (2 * EARTH_RADIUS_KM))**2
+
+    @property
+    def active_count(self) -> int:
+        return len(self.disruption_ids)
+
+    def compute(self, vessel_lats: Sequence[float], vessel_lons: Sequence[float]) -> DisruptionImpactResult:
+        """Evaluate every vessel against every active disruption"""
+        lats = np.asarray(vessel_lats, dtype=np.float64)
+        lons = np.asarray(vessel_lons, dtype=np.float64)
+        n = lats.shape[0]
+
+        impacted = np.zeros(n, dtype=bool)
+        nearest_index = np.full(n, -1, dtype=np.int64)
+        nearest_distance = np.full(n, np.inf, dtype=np.float64)
+
+        if n == 0 or self.active_count == 0:
+            return DisruptionImpactResult(impacted, nearest_index, nearest_distance, self.disruption_ids)
+
+        for start in range(0, n, self.chunk_size):
+            stop = min(start + self.chunk_size, n)
+            block_lats, block_lons = lats[start:stop], lons[start:stop]
+            a = self._haversine_terms(block_lats, block_lons)
+
+            # Distance is monotonic in a, so the nearest disruption is argmin(a)
+            block_nearest = np.argmin(a, axis=1)
+            nearest_index[start:stop] = block_nearest
+            nearest_distance[start:stop] = self._distance_to(block_lats, block_lons, block_nearest)
+
+            within = a <= self._radius_a
+            boundary = np.abs(a - self._radius_a) <= BOUNDARY_TOLERANCE
+            if boundary.any():
+                self._recheck_boundary(within, boundary, block_lats, block_lons)
+            impacted[start:stop] = within.any(axis=1)
+
+        return DisruptionImpactResult(impacted, nearest_index, nearest_distance, self.disruption_ids)
+
+    def _haversine_terms(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Haversine term a for a block of vessels, shape (block, n_disruptions)"""
+        lat_rad = np.radians(lats)
+        lon_rad = np.radians(lons)
+        sin_half_lat = np.sin(lat_rad / 2)[:, None]
+        cos_half_lat = np.cos(lat_rad / 2)[:, None]
+        sin_half_lon = np.sin(lon_rad / 2)[:, None]
+        cos_half_lon = np.cos(lon_rad / 2)[:, None]
+
+        # sin((x2 - x1) / 2) = sin(x2/2)cos(x1/2) - cos(x2/2)sin(x1/2)
+        sin_dlat = self._sin_half_lat * cos_half_lat - self._cos_half_lat * sin_half_lat
+        sin_dlon = self._sin_half_lon * cos_half_lon - self._cos_half_lon * sin_half_lon
+        return sin_dlat**2 + np.cos(lat_rad)[:, None] * self._cos_lat * sin_dlon**2
+
+    def _distance_to(self, lats: np.ndarray, lons: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Haversine distance (km) from each vessel to one selected disruption"""
+        lat1, lon1 = np.radians(lats), np.radians(lons)
+        lat2, lon2 = np.radians(self.disruption_lats[columns]), np.radians(self.disruption_lons[columns])
+        a = np.sin((lat2 - lat1)/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1)/2)**2
+        return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0))) * EARTH_RADIUS_KM
+
+    def _recheck_boundary(self, within: np.ndarray, boundary: np.ndarray,
+                          lats: np.ndarray, lons: np.ndarray):
+        for row, col in zip(*np.nonzero(boundary)):
+            distance = _scalar_distance(float(lats[row]), float(lons[row]),
+                                        float(self.disruption_lats[col]), float(self.disruption_lons[col]))
+            within[row, col] = distance <= self.radii_km[col]
+
+def compute_disruption_impacts(vessel_lats: Sequence[float], vessel_lons: Sequence[float],
+                               disruptions: Sequence[Dict[str, Any]],
+                               impact_radius_km: float = 500) -> DisruptionImpactResult:
+    """
+    Vectorized equivalent of calling is_vessel_impacted_by_disruptions per vessel
+
+    Args:
+        vessel_lats, vessel_lons: vessel coordinates in decimal degrees
+        disruptions: disruption records (only active ones with coordinates count)
+        impact_radius_km: base radius, scaled 1.5x for high and 2x for critical severity
+    """
+    engine = DisruptionImpactEngine(disruptions, impact_radius_km=impact_radius_km)
+    return engine.compute(vessel_lats, vessel_lons)
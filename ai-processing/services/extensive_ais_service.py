@@ -16,6 +16,7 @@ import asyncpg
 from fake_useragent import UserAgent
 import random
 import math
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -106,7 +107,7 @@ class ExtensiveAISService:
     
     async def initialize(self):
         """Initialize the AIS service"""
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={'User-Agent': self.ua.random}
         )
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import math
 
+from services.port_catalog import port_catalog
+
 logger = logging.getLogger(__name__)
 
 class GlobalVesselDistribution:
@@ -107,32 +109,10 @@ class GlobalVesselDistribution:
             }
         ]
         
-        # Major ports with typical vessel counts
+        # Ports come from the shared catalog
         self.major_ports = [
-            # Asia-Pacific
-            {"name": "Shanghai", "coords": (31.2, 121.5), "vessels": 45, "country": "China"},
-            {"name": "Singapore", "coords": (1.3, 103.8), "vessels": 38, "country": "Singapore"},
-            {"name": "Hong Kong", "coords": (22.3, 114.2), "vessels": 32, "country": "Hong Kong"},
-            {"name": "Busan", "coords": (35.2, 129.1), "vessels": 28, "country": "South Korea"},
-            {"name": "Tokyo", "coords": (35.7, 139.7), "vessels": 25, "country": "Japan"},
-            {"name": "Mumbai", "coords": (19.1, 72.9), "vessels": 22, "country": "India"},
-            {"name": "Sydney", "coords": (-33.9, 151.2), "vessels": 18, "country": "Australia"},
-            
-            # Europe
-            {"name": "Rotterdam", "coords": (51.9, 4.5), "vessels": 42, "country": "Netherlands"},
-            {"name": "Hamburg", "coords": (53.6, 10.0), "vessels": 35, "country": "Germany"},
-            {"name": "Antwerp", "coords": (51.2, 4.4), "vessels": 30, "country": "Belgium"},
-            {"name": "Felixstowe", "coords": (51.9, 1.4), "vessels": 25, "country": "UK"},
-            
-            # Americas
-            {"name": "Los Angeles", "coords": (33.7, -118.3), "vessels": 40, "country": "USA"},
-            {"name": "New York", "coords": (40.7, -74.0), "vessels": 35, "country": "USA"},
-            {"name": "Miami", "coords": (25.8, -80.2), "vessels": 20, "country": "USA"},
-            {"name": "Santos", "coords": (-23.9, -46.3), "vessels": 25, "country": "Brazil"},
-            
-            # Middle East/Africa
-            {"name": "Dubai", "coords": (25.3, 55.4), "vessels": 30, "country": "UAE"},
-            {"name": "Cape Town", "coords": (-33.9, 18.4), "vessels": 15, "country": "South Africa"}
+            {"name": port["name"], "coords": (port["lat"], port["lng"]), "country": port["country"]}
+            for port in port_catalog.ports
         ]
     
     async def get_global_vessel_distribution(self, real_vessels: List[Dict], target_count: int = 500) -> List[Dict]:
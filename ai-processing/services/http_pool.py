@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+HTTP Pool Service for TradeWatch
+One keep-alive connection pool shared by every outbound fetcher, with per-host utilization metrics
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Set, Awaitable
+
+import aiohttp
+import httpx
+
+try:
+    import h2  # noqa: F401 - httpx only needs it to be importable
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+HTTP_POOL_KEEPALIVE_SECONDS = float(os.getenv("HTTP_POOL_KEEPALIVE_SECONDS", "30"))
+HTTP_POOL_DNS_TTL_SECONDS = int(os.getenv("HTTP_POOL_DNS_TTL_SECONDS", "300"))
+HTTP_POOL_HTTP2 = os.getenv("HTTP_POOL_HTTP2", "true").lower() in ("1", "true", "yes")
+HTTPX_DEFAULT_TIMEOUT_SECONDS = 10.0
+
+class PooledSession:
+    """
+    aiohttp-style session view over the shared pool with its own default headers and timeout
+
+    Drop-in for the per-service ClientSession: `get`/`post`/`request` return the usual
+    response context managers, and `close()` leaves the shared connections open.
+    """
+
+    def __init__(self, pool: "HttpPool", headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[aiohttp.ClientTimeout] = None):
+        self._pool = pool
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.closed = False
+
+    def request(self, method: str, url: str, **kwargs):
+        headers = {**self.headers, **(kwargs.pop("headers", None) or {})}
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return self._pool.session.request(method, url, headers=headers, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+class HttpPool:
+    """
+    Lazily created aiohttp session and httpx client shared across the process
+
+    Both are (re)created on first use in the running event loop and closed at
+    app shutdown; a loop change closes the previous pair first. A TraceConfig
+    records per-host aiohttp requests, in-flight count, new vs reused
+    connections and DNS cache hits; httpx requests are counted through event
+    hooks. `limit_per_host` applies to aiohttp only - httpx has no per-host
+    limit, just the shared `limit`.
+    """
+
+    def __init__(self, limit: int = HTTP_POOL_LIMIT, limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+                 keepalive_seconds: float = HTTP_POOL_KEEPALIVE_SECONDS,
+                 dns_ttl_seconds: int = HTTP_POOL_DNS_TTL_SECONDS, http2: bool = HTTP_POOL_HTTP2):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.dns_ttl_seconds = dns_ttl_seconds
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._httpx_client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stale_closes: Set[asyncio.Task] = set()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._dns = {"cache_hits": 0, "cache_misses": 0}
+
+    # ---- aiohttp ----
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared aiohttp session for the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._close_stale(loop)
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_seconds,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl_seconds,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+            logger.info(f"HTTP pool opened (limit={self.limit}, per_host={self.limit_per_host})")
+        return self._session
+
+    def client_session(self, headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[aiohttp.ClientTimeout] = None) -> PooledSession:
+        """Per-service view with default headers/timeout over the shared connections"""
+        return PooledSession(self, headers=headers, timeout=timeout)
+
+    def _host_stats(self, host: Optional[str]) -> Dict[str, Any]:
+        return self._hosts.setdefault(host or "unknown", {
+            "requests": 0, "in_flight": 0, "errors": 0,
+            "new_connections": 0, "reused_connections": 0, "total_ms": 0.0,
+            "httpx_requests": 0, "httpx_errors": 0,
+        })
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.host = params.url.host
+            context.started = time.perf_counter()
+            stats = self._host_stats(context.host)
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+
+        async def on_request_end(session, context, params):
+            stats = self._host_stats(context.host)
+            stats["in_flight"] -= 1
+            stats["total_ms"] += (time.perf_counter() - context.started) * 1000
+
+        async def on_request_exception(session, context, params):
+            stats = self._host_stats(getattr(context, "host", None))
+            stats["in_flight"] -= 1
+            stats["errors"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            self._host_stats(getattr(context, "host", None))["new_connections"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self._host_stats(getattr(context, "host", None))["reused_connections"] += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self._dns["cache_hits"] += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self._dns["cache_misses"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    # ---- httpx ----
+
+    def httpx_client(self) -> httpx.AsyncClient:
+        """Shared httpx client for the running loop (HTTP/2 when h2 is installed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._close_stale(loop)
+        if self._httpx_client is None or self._httpx_client.is_closed:
+
+            async def on_request(request: httpx.Request):
+                self._host_stats(request.url.host)["httpx_requests"] += 1
+
+            async def on_response(response: httpx.Response):
+                if response.status_code >= 500:
+                    self._host_stats(response.request.url.host)["httpx_errors"] += 1
+
+            self._httpx_client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=HTTPX_DEFAULT_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    max_keepalive_connections=self.limit,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                event_hooks={"request": [on_request], "response": [on_response]},
+            )
+        return self._httpx_client
+
+    @asynccontextmanager
+    async def httpx(self):
+        """`async with http_pool.httpx() as client:` without closing the shared client"""
+        yield self.httpx_client()
+
+    # ---- lifecycle / metrics ----
+
+    def _close_stale(self, loop: asyncio.AbstractEventLoop):
+        """Switch to `loop`, closing the session and client made on the previous one"""
+        stale_loop, session, client = self._loop, self._session, self._httpx_client
+        self._loop, self._session, self._httpx_client = loop, None, None
+        closers = []
+        if session is not None and not session.closed:
+            closers.append(session.close())
+        if client is not None and not client.is_closed:
+            closers.append(client.aclose())
+        for closer in closers:
+            if stale_loop is not None and stale_loop.is_running():
+                # Still running in another thread: its connections must be closed there
+                asyncio.run_coroutine_threadsafe(self._close_quietly(closer), stale_loop)
+            else:
+                task = loop.create_task(self._close_quietly(closer))
+                self._stale_closes.add(task)
+                task.add_done_callback(self._stale_closes.discard)
+        if closers:
+            logger.info(f"HTTP pool moved to a new event loop, closing {len(closers)} stale client(s)")
+
+    @staticmethod
+    async def _close_quietly(closer: Awaitable[None]):
+        try:
+            await closer
+        except Exception as e:
+            # Connections of a stopped loop may not close cleanly; they are unusable either way
+            logger.debug(f"Closing a stale HTTP client failed: {e}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._httpx_client is not None and not self._httpx_client.is_closed:
+            await self._httpx_client.aclose()
+        self._session = None
+        self._httpx_client = None
+        logger.info("HTTP pool closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool configuration plus per-host request/connection counters"""
+        hosts = {}
+        for host, stats in self._hosts.items():
+            completed = stats["requests"] - stats["in_flight"]
+            total_connections = stats["new_connections"] + stats["reused_connections"]
+            hosts[host] = {
+                **{key: value for key, value in stats.items() if key != "total_ms"},
+                "avg_ms": round(stats["total_ms"] / completed, 1) if completed else None,
+                # in_flight and limit_per_host both cover aiohttp requests only
+                "utilization": round(stats["in_flight"] / self.limit_per_host, 3),
+                "reuse_ratio": round(stats["reused_connections"] / total_connections, 3) if total_connections else None,
+            }
+
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_seconds": self.keepalive_seconds,
+            "dns_ttl_seconds": self.dns_ttl_seconds,
+            "http2": self.http2,
+            "aiohttp_open": connector is not None,
+            "httpx_open": self._httpx_client is not None and not self._httpx_client.is_closed,
+            "in_flight": sum(stats["in_flight"] for stats in self._hosts.values()),
+            "dns": dict(self._dns),
+            "hosts": hosts,
+        }
+
+# Global HTTP pool instance
+http_pool = HttpPool()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Live Update Hub for TradeWatch
+Fans out vessel position diffs and new disruptions to WebSocket subscribers
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, Iterable, FrozenSet, Hashable
+
+from services.response_cache import encode_json
+from utils.geo import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+# Fields pushed for each vessel position diff
+POSITION_FIELDS = ("id", "mmsi", "name", "type", "lat", "lon", "course", "speed", "heading",
+                   "status", "impacted", "riskLevel")
+
+def _encode(value: Any) -> str:
+    return encode_json(value).decode()
+
+def _vessel_key(record: Dict[str, Any]) -> Hashable:
+    # Sources can report one vessel under different ids; the MMSI identifies it
+    mmsi = record.get("mmsi")
+    return ("mmsi", str(mmsi)) if mmsi else ("id", record.get("id"))
+
+@dataclass(frozen=True)
+class SubscriptionFilter:
+    """Optional bounding box and vessel-type filter for one subscriber"""
+    bbox: Optional[BoundingBox] = None
+    types: Optional[FrozenSet[str]] = None
+
+    def matches(self, lat: Optional[float], lon: Optional[float], vessel_type: Optional[str] = None,
+                check_type: bool = True) -> bool:
+        if check_type and self.types is not None and vessel_type not in self.types:
+            return False
+        if self.bbox is not None:
+            if lat is None or lon is None:
+                return False
+            return self.bbox.contains(lat, lon)
+        return True
+
+@dataclass
+class _GroupFrame:
+    """Vessel diff for one filter, encoded once and shared by every subscriber with that filter"""
+    upserts: List[Tuple[Hashable, str, str]]    # (vessel key, id, fragment)
+    removed: List[Tuple[Hashable, str]]         # (vessel key, id)
+    frame: Optional[str]
+
+class LiveSubscriber:
+    """
+    One WebSocket connection with a bounded queue and a coalescing overflow buffer
+
+    Only `run_sender()` writes to the socket; the connection handler queues its
+    own replies (e.g. errors) with `enqueue()`. If sending fails, the sender
+    calls `on_failure` (the hub detaches it) and then `close` so the
+    connection's handler stops too.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], max_queue: int = 32,
+                 max_pending_disruptions: int = 200,
+                 close: Optional[Callable[[], Awaitable[None]]] = None,
+                 on_failure: Optional[Callable[["LiveSubscriber"], None]] = None):
+        self.send = send
+        self.close = close
+        self.on_failure = on_failure
+        self.filter = SubscriptionFilter()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # Overflow state once the queue is full: latest position per vessel (keyed by MMSI,
+        # else id) wins; a None fragment removes the id
+        self.pending_vessels: Dict[Hashable, Tuple[str, Optional[str]]] = {}
+        self.pending_disruptions: deque = deque(maxlen=max_pending_disruptions)
+        self.pending_version = 0
+        # Replies to the client, sent ahead of data frames; bounded so a client spamming bad
+        # subscriptions cannot grow it
+        self.control: deque = deque(maxlen=8)
+        self._wakeup = asyncio.Event()
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.pending_vessels) or bool(self.pending_disruptions)
+
+    def offer_vessels(self, group: _GroupFrame, version: int):
+        if group.frame is None:
+            return
+        # Once anything is pending every newer diff must merge behind it to keep ordering
+        if not self.has_pending and not self.queue.full():
+            self.queue.put_nowait(group.frame)
+            self._wakeup.set()
+            return
+
+        self.frames_coalesced += 1
+        for key, vessel_id, fragment in group.upserts:
+            self.pending_vessels[key] = (vessel_id, fragment)
+            if key[0] != "id":
+                # Cancels a removal of this id queued on its own (see below)
+                self.pending_vessels.pop(("id", vessel_id), None)
+        for key, vessel_id in group.removed:
+            pending = self.pending_vessels.get(key)
+            if pending is not None and pending[0] != vessel_id and pending[1] is not None:
+                # The vessel is pending under a newer id: remove the old id on its own
+                key = ("id", vessel_id)
+            self.pending_vessels[key] = (vessel_id, None)
+        self.pending_version = version
+        self._wakeup.set()
+
+    def offer_disruptions(self, frame: str, fragments: List[str]):
+        if not self.has_pending and not self.queue.full():
+            self.queue.put_nowait(frame)
+            self._wakeup.set()
+            return
+
+        self.frames_coalesced += 1
+        self.pending_disruptions.extend(fragments)
+        self._wakeup.set()
+
+    def enqueue(self, message: Dict[str, Any]):
+        """Queue a control message (e.g. an error reply) for the sender task"""
+        self.control.append(_encode(message))
+        self._wakeup.set()
+
+    def reset_with(self, frame: str):
+        """Replace everything queued with a full snapshot frame (used on (re)subscribe)"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.pending_vessels = {}
+        self.pending_disruptions.clear()
+        self.queue.put_nowait(frame)
+        self._wakeup.set()
+
+    def _drain_pending(self) -> List[str]:
+        frames = []
+        if self.pending_vessels:
+            upserts = [fragment for _, fragment in self.pending_vessels.values() if fragment is not None]
+            removed = [vessel_id for vessel_id, fragment in self.pending_vessels.values() if fragment is None]
+            frames.append(_vessel_frame(self.pending_version, upserts, removed, coalesced=True))
+            self.pending_vessels = {}
+        if self.pending_disruptions:
+            frames.append(_disruption_frame(list(self.pending_disruptions)))
+            self.pending_disruptions.clear()
+        return frames
+
+    async def run_sender(self):
+        """Send queued frames in order, then any coalesced overflow, until a send fails"""
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.control or not self.queue.empty() or self.has_pending:
+                    if self.control:
+                        frames = [self.control.popleft()]
+                    elif not self.queue.empty():
+                        frames = [self.queue.get_nowait()]
+                    else:
+                        frames = self._drain_pending()
+                    for frame in frames:
+                        await self.send(frame)
+                        self.frames_sent += 1
+        except Exception as e:
+            logger.warning(f"Live update send failed, closing subscriber: {e}")
+            if self.on_failure is not None:
+                self.on_failure(self)
+            if self.close is not None:
+                try:
+                    await self.close()
+                except Exception as close_error:
+                    logger.debug(f"Closing failed live update subscriber: {close_error}")
+
+def _position_record(vessel: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: vessel.get(field) for field in POSITION_FIELDS}
+
+def _vessel_frame(version: int, upserts: Iterable[str], removed: Iterable[str],
+                  coalesced: bool = False, frame_type: str = "vessels") -> str:
+    return (
+        f'{{"type":"{frame_type}","version":{version},"coalesced":{"true" if coalesced else "false"},'
+        f'"upserts":[{",".join(upserts)}],"removed":{_encode(list(removed))}}}'
+    )
+
+def _disruption_frame(fragments: Iterable[str]) -> str:
+    return f'{{"type":"disruptions","disruptions":[{",".join(fragments)}]}}'
+
+class LiveUpdateHub:
+    """Broadcasts snapshot diffs, encoding each diff once per distinct subscriber filter"""
+
+    def __init__(self, max_queue: int = 32):
+        self.max_queue = max_queue
+        self._subscribers: List[LiveSubscriber] = []
+        # Last published position and coalescing key per vessel id, used to tell bbox
+        # subscribers a vessel left
+        self._positions: Dict[str, Tuple[Optional[float], Optional[float], Optional[str]]] = {}
+        self._vessel_keys: Dict[str, Hashable] = {}
+        # Ids in the last published disruption set; an id is only pushed when it (re)appears
+        self._seen_disruptions: set = set()
+        self.stats = {
+            "frames_published": 0,
+            "encodings": 0,
+        }
+
+    def subscribe(self, send: Callable[[str], Awaitable[None]],
+                  close: Optional[Callable[[], Awaitable[None]]] = None) -> LiveSubscriber:
+        subscriber = LiveSubscriber(send, max_queue=self.max_queue, close=close, on_failure=self.unsubscribe)
+        self._subscribers.append(subscriber)
+        logger.info(f"Live update subscriber connected ({len(self._subscribers)} total)")
+        return subscriber
+
+    def unsubscribe(self, subscriber: LiveSubscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            logger.info(f"Live update subscriber disconnected ({len(self._subscribers)} total)")
+
+    def publish_vessel_changes(self, version: int, upserted: Iterable[Dict[str, Any]], removed: Iterable[str]):
+        """Push one store version's upserts/removals to every matching subscriber"""
+        upserted = list(upserted)
+        removed = list(removed)
+        if not upserted and not removed:
+            return
+
+        # Encode each position diff once for all subscribers
+        encoded = []
+        for vessel in upserted:
+            record = _position_record(vessel)
+            encoded.append((record["id"], _vessel_key(record), record, _encode(record)))
+        self.stats["encodings"] += len(encoded)
+
+        groups: Dict[SubscriptionFilter, _GroupFrame] = {}
+        for subscriber in list(self._subscribers):
+            group = groups.get(subscriber.filter)
+            if group is None:
+                group = self._build_group(subscriber.filter, version, encoded, removed)
+                groups[subscriber.filter] = group
+            subscriber.offer_vessels(group, version)
+
+        for vessel_id, key, record, _ in encoded:
+            self._positions[vessel_id] = (record["lat"], record["lon"], record["type"])
+            self._vessel_keys[vessel_id] = key
+        for vessel_id in removed:
+            self._positions.pop(vessel_id, None)
+            self._vessel_keys.pop(vessel_id, None)
+        self.stats["frames_published"] += 1
+
+    def _build_group(self, subscription: SubscriptionFilter, version: int,
+                     encoded: List[Tuple[str, Hashable, Dict[str, Any], str]], removed: List[str]) -> _GroupFrame:
+        upserts: List[Tuple[Hashable, str, str]] = []
+        left: List[Tuple[Hashable, str]] = []
+        for vessel_id, key, record, fragment in encoded:
+            if subscription.matches(record["lat"], record["lon"], record["type"]):
+                upserts.append((key, vessel_id, fragment))
+            elif self._was_visible(subscription, vessel_id):
+                # Moved out of the subscriber's box or filter - tell the client to drop it
+                left.append((key, vessel_id))
+
+        left.extend((self._vessel_keys.get(vessel_id, ("id", vessel_id)), vessel_id)
+                    for vessel_id in removed if self._was_visible(subscription, vessel_id))
+
+        if not upserts and not left:
+            return _GroupFrame(upserts, left, None)
+        return _GroupFrame(upserts, left, _vessel_frame(version, (fragment for _, _, fragment in upserts),
+                                                        [vessel_id for _, vessel_id in left]))
+
+    def _was_visible(self, subscription: SubscriptionFilter, vessel_id: str) -> bool:
+        previous = self._positions.get(vessel_id)
+        return previous is not None and subscription.matches(*previous)
+
+    def publish_disruptions(self, disruptions: Iterable[Dict[str, Any]]):
+        """Push disruptions that were not in the previously published set"""
+        fresh = []
+        current = set()
+        for disruption in disruptions:
+            disruption_id = disruption.get("id") or disruption.get("title")
+            if disruption_id is None or disruption_id in current:
+                continue
+            current.add(disruption_id)
+            if disruption_id not in self._seen_disruptions:
+                fresh.append((disruption, _encode(disruption)))
+        # Only the current set is remembered, so ids of resolved disruptions do not pile up
+        self._seen_disruptions = current
+        if not fresh:
+            return
+
+        groups: Dict[Optional[BoundingBox], Tuple[str, List[str]]] = {}
+        for subscriber in list(self._subscribers):
+            bbox = subscriber.filter.bbox
+            if bbox not in groups:
+                fragments = [fragment for disruption, fragment in fresh
+                             if self._disruption_matches(subscriber.filter, disruption)]
+                groups[bbox] = (_disruption_frame(fragments), fragments)
+            frame, fragments = groups[bbox]
+            if fragments:
+                subscriber.offer_disruptions(frame, fragments)
+        self.stats["frames_published"] += 1
+
+    @staticmethod
+    def _disruption_matches(subscription: SubscriptionFilter, disruption: Dict[str, Any]) -> bool:
+        coordinates = disruption.get("coordinates") or [None, None]
+        try:
+            lat, lon = float(coordinates[0]), float(coordinates[1])
+        except (TypeError, ValueError, IndexError):
+            return subscription.bbox is None
+        return subscription.matches(lat, lon, check_type=False)
+
+    def initial_frame(self, subscription: SubscriptionFilter, version: int,
+                      vessels: Iterable[Dict[str, Any]]) -> str:
+        """Full filtered fleet sent when a client (re)subscribes"""
+        upserts = []
+        for vessel in vessels:
+            record = _position_record(vessel)
+            if subscription.matches(record["lat"], record["lon"], record["type"]):
+                upserts.append(_encode(record))
+        return _vessel_frame(version, upserts, [], frame_type="snapshot")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "queued_frames": sum(s.queue.qsize() for s in self._subscribers),
+            "coalescing_subscribers": len([s for s in self._subscribers if s.has_pending]),
+            "frames_coalesced": sum(s.frames_coalesced for s in self._subscribers),
+            **self.stats,
+        }
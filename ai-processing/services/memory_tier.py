@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Memory Tier Service for TradeWatch
+Byte-bounded in-process LRU with per-entry expiry in front of the SQLite data cache
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Hashable
+
+# Upper bound on how long a read is reused per table: writes by other workers sharing
+# the database file cannot invalidate this process's entries
+DEFAULT_MEMORY_TTL_SECONDS = {"vessels": 30, "disruptions": 120, "tariffs": 600}
+
+class MemoryTier:
+    """
+    Results of recent cache reads, keyed by a tuple whose first item is the table
+
+    Entries expire at the earlier of the caller's `expires_at` and the table's
+    TTL, are dropped least-recently-used first once `max_bytes` is exceeded,
+    and are invalidated per table on write. A read that started before an
+    invalidation is not stored (see `generation`), so a racing write can never
+    be hidden behind an older result. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: Optional[Dict[str, float]] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = {**DEFAULT_MEMORY_TTL_SECONDS, **(ttl_seconds or {})}
+        # key -> (expires_at (monotonic), value, size in bytes)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any, int]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0, "oversized": 0}
+
+    def generation(self, table: str) -> int:
+        """Take before reading the database; pass to `put` with the result"""
+        return self._generations.get(table, 0)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                self._remove(key)
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: Tuple, value: Any, size: int, generation: int, expires_at: Optional[float] = None):
+        table = key[0]
+        ttl_expiry = time.monotonic() + self.ttl_seconds.get(table, 0)
+        expires_at = ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+        with self._lock:
+            if self._generations.get(table, 0) != generation:
+                return
+            if size > self.max_bytes:
+                self.stats["oversized"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def invalidate(self, table: str):
+        """Drop the table's entries and reject reads of it still in flight"""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [k for k in self._entries if k[0] == table]:
+                self._remove(key)
+            self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "miss_ratio": round(self.stats["misses"] / lookups, 3) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
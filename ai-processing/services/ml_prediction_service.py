@@ -11,10 +11,17 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
 
+from services.bdi_quote_service import bdi_quote_service
+
 logger = logging.getLogger(__name__)
 
 class MLPredictor:
-    """Advanced ML prediction engine for maritime intelligence"""
+    """
+    Advanced ML prediction engine for maritime intelligence
+
+    Predictions are plain CPU work, so the methods are synchronous; the async
+    wrappers below run them in worker threads, off the event loop.
+    """
     
     def __init__(self):
         self.models = {
@@ -26,7 +33,7 @@ class MLPredictor:
         }
         logger.info("🧠 ML Prediction Service initialized with 5 models")
     
-    async def predict_vessel_delays(self, vessels: List[Dict]) -> List[Dict]:
+    def predict_vessel_delays(self, vessels: List[Dict]) -> List[Dict]:
         """Predict vessel delays using ML models"""
         try:
             predictions = []
@@ -75,7 +82,7 @@ class MLPredictor:
             logger.error(f"Error predicting vessel delays: {e}")
             return []
     
-    async def forecast_disruptions(self, historical_data: List[Dict]) -> List[Dict]:
+    def forecast_disruptions(self, historical_data: List[Dict]) -> List[Dict]:
         """Forecast maritime disruptions using ML models"""
         try:
             # Major maritime regions for forecasting
@@ -129,10 +136,10 @@ class MLPredictor:
             logger.error(f"Error forecasting disruptions: {e}")
             return []
     
-    async def predict_economic_indicators(self, market_data: Dict) -> Dict:
+    def predict_economic_indicators(self, market_data: Dict) -> Dict:
         """Predict economic indicators using ML models"""
         try:
-            current_bdi = market_data.get('current_bdi', 1893)  # Use real BDI value
+            current_bdi = market_data.get('current_bdi') or bdi_quote_service.current_value()
             
             # Generate ML-based economic predictions
             predictions = {
@@ -153,8 +160,9 @@ class MLPredictor:
     
     def _predict_bdi(self, current_bdi: int) -> Dict:
         """Predict Baltic Dry Index using real market analysis"""
-        # Use the real BDI value of 1893 as of August 22, 2025 (down 1.76%)
-        # Apply realistic market analysis for predictions
+        # Latest quote and recent trend come from the shared in-memory BDI quote service
+        quote = bdi_quote_service.latest()
+        recent_trend = bdi_quote_service.trend()
         
         # Market factors affecting BDI
         seasonal_factor = self._get_bdi_seasonal_factor()
@@ -175,10 +183,8 @@ class MLPredictor:
         predicted_30d = max(800, min(3000, int(current_bdi * (1 + monthly_change))))
         
         # Determine trend based on recent market behavior
-        if current_bdi == 1893:  # Real current value
-            # Market was down 1.76% yesterday, factor this into predictions
-            recent_decline_factor = -0.0176
-            trend = 'bearish' if recent_decline_factor < -0.01 else 'stable'
+        if recent_trend['points'] >= 2 or quote.change_percent is not None:
+            trend = recent_trend['direction']
         else:
             trend = 'bullish' if trend_factor > 0.02 else 'bearish' if trend_factor < -0.02 else 'stable'
         
@@ -193,7 +199,8 @@ class MLPredictor:
                 'supply_demand': round(supply_demand_factor, 3),
                 'economic_sentiment': round(economic_factor, 3)
             },
-            'last_change': '-1.76%',  # Real data from August 22, 2025
+            'last_change': f"{quote.change_percent:+.2f}%" if quote.change_percent is not None else None,
+            'source': quote.source,
             'volatility': '3.2%'  # Typical BDI volatility
         }
     
@@ -468,16 +475,17 @@ class MLPredictor:
 # Global ML predictor instance
 ml_predictor = MLPredictor()
 
-# Async wrapper functions for the API
+# Async wrapper functions for the API - each prediction runs in a worker thread, so
+# concurrent sections really overlap and a caller's deadline can stop waiting on one
 async def get_vessel_predictions(vessels: List[Dict]) -> List[Dict]:
     """Get vessel delay predictions"""
-    return await ml_predictor.predict_vessel_delays(vessels)
+    return await asyncio.to_thread(ml_predictor.predict_vessel_delays, vessels)
 
 async def get_disruption_forecasts(historical_data: List[Dict]) -> List[Dict]:
     """Get disruption forecasts"""
-    return await ml_predictor.forecast_disruptions(historical_data)
+    return await asyncio.to_thread(ml_predictor.forecast_disruptions, historical_data)
 
 async def get_economic_predictions(market_data: Dict) -> Dict:
     """Get economic predictions"""
-    return await ml_predictor.predict_economic_indicators(market_data)
+    return await asyncio.to_thread(ml_predictor.predict_economic_indicators, market_data)
 
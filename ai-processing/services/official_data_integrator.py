@@ -15,6 +15,7 @@ import time
 import re
 from dataclasses import dataclass
 import pandas as pd
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -109,7 +110,7 @@ class OfficialDataIntegrator:
         }
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-Official-Data-Integrator/1.0',
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Port Catalog Service for TradeWatch
+Single source of major port records, built once with a spherical index for proximity queries
+"""
+
+import logging
+import random
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from utils.geo import SphericalIndex, SCIPY_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Major global ports with strategic importance, keyed by UN/LOCODE
+# Order is part of the API: a port's id ("port_0001", ...) is its position here
+MAJOR_PORTS = [
+    {"locode": "CNSHA", "name": "Shanghai", "country": "China", "region": "East Asia", "coords": [31.2304, 121.4737], "strategic_importance": 100, "annual_teu": 47030000},
+    {"locode": "SGSIN", "name": "Singapore", "country": "Singapore", "region": "Southeast Asia", "coords": [1.2921, 103.8519], "strategic_importance": 95, "annual_teu": 37240000},
+    {"locode": "CNNGB", "name": "Ningbo-Zhoushan", "country": "China", "region": "East Asia", "coords": [29.8683, 121.544], "strategic_importance": 90, "annual_teu": 33350000},
+    {"locode": "CNSZX", "name": "Shenzhen", "country": "China", "region": "East Asia", "coords": [22.5431, 114.0579], "strategic_importance": 88, "annual_teu": 30000000},
+    {"locode": "CNCAN", "name": "Guangzhou", "country": "China", "region": "East Asia", "coords": [23.1291, 113.2644], "strategic_importance": 85, "annual_teu": 25230000},
+    {"locode": "KRPUS", "name": "Busan", "country": "South Korea", "region": "East Asia", "coords": [35.1796, 129.0756], "strategic_importance": 82, "annual_teu": 22990000},
+    {"locode": "HKHKG", "name": "Hong Kong", "country": "Hong Kong", "region": "East Asia", "coords": [22.3193, 114.1694], "strategic_importance": 88, "annual_teu": 18000000},
+    {"locode": "CNTAO", "name": "Qingdao", "country": "China", "region": "East Asia", "coords": [36.0986, 120.3719], "strategic_importance": 80, "annual_teu": 24000000},
+    {"locode": "USLAX", "name": "Los Angeles", "country": "United States", "region": "North America", "coords": [33.7406, -118.2484], "strategic_importance": 85, "annual_teu": 10700000},
+    {"locode": "USLGB", "name": "Long Beach", "country": "United States", "region": "North America", "coords": [33.7701, -118.1937], "strategic_importance": 83, "annual_teu": 8100000},
+    {"locode": "NLRTM", "name": "Rotterdam", "country": "Netherlands", "region": "Northern Europe", "coords": [51.9244, 4.4777], "strategic_importance": 90, "annual_teu": 15300000},
+    {"locode": "BEANR", "name": "Antwerp", "country": "Belgium", "region": "Northern Europe", "coords": [51.2194, 4.4025], "strategic_importance": 85, "annual_teu": 12040000},
+    {"locode": "DEHAM", "name": "Hamburg", "country": "Germany", "region": "Northern Europe", "coords": [53.5511, 9.9937], "strategic_importance": 82, "annual_teu": 8700000},
+    {"locode": "AEDXB", "name": "Dubai", "country": "UAE", "region": "Middle East", "coords": [25.2769, 55.2962], "strategic_importance": 88, "annual_teu": 15300000},
+    {"locode": "USNYC", "name": "New York-New Jersey", "country": "United States", "region": "North America", "coords": [40.6892, -74.0445], "strategic_importance": 85, "annual_teu": 7800000},
+    {"locode": "MYTPP", "name": "Tanjung Pelepas", "country": "Malaysia", "region": "Southeast Asia", "coords": [1.3644, 103.5490], "strategic_importance": 78, "annual_teu": 9100000},
+    {"locode": "THLCH", "name": "Laem Chabang", "country": "Thailand", "region": "Southeast Asia", "coords": [13.0827, 100.9170], "strategic_importance": 75, "annual_teu": 8000000},
+    {"locode": "ESVLC", "name": "Valencia", "country": "Spain", "region": "Mediterranean", "coords": [39.4699, -0.3763], "strategic_importance": 75, "annual_teu": 5600000},
+    {"locode": "TWKHH", "name": "Kaohsiung", "country": "Taiwan", "region": "East Asia", "coords": [22.6273, 120.3014], "strategic_importance": 80, "annual_teu": 9940000},
+    {"locode": "DEBRV", "name": "Bremen/Bremerhaven", "country": "Germany", "region": "Northern Europe", "coords": [53.5366, 8.1627], "strategic_importance": 78, "annual_teu": 5500000},
+    {"locode": "GBFXT", "name": "Felixstowe", "country": "United Kingdom", "region": "Northern Europe", "coords": [51.9540, 1.3506], "strategic_importance": 75, "annual_teu": 4000000},
+    {"locode": "USSAV", "name": "Savannah", "country": "United States", "region": "North America", "coords": [32.0835, -81.0998], "strategic_importance": 72, "annual_teu": 4600000},
+    {"locode": "GRPIR", "name": "Piraeus", "country": "Greece", "region": "Mediterranean", "coords": [37.9364, 23.6479], "strategic_importance": 70, "annual_teu": 5400000},
+    {"locode": "CAVAN", "name": "Vancouver", "country": "Canada", "region": "North America", "coords": [49.2827, -123.1207], "strategic_importance": 70, "annual_teu": 3500000},
+    {"locode": "FRLEH", "name": "Le Havre", "country": "France", "region": "Northern Europe", "coords": [49.4944, 0.1079], "strategic_importance": 75, "annual_teu": 2900000},
+    # Previously only in the vessel distribution and location-aware model tables
+    {"locode": "JPTYO", "name": "Tokyo", "country": "Japan", "region": "East Asia", "coords": [35.6170, 139.7770], "strategic_importance": 70, "annual_teu": 4600000},
+    {"locode": "INNSA", "name": "Mumbai (Nhava Sheva)", "country": "India", "region": "South Asia", "coords": [18.9490, 72.9500], "strategic_importance": 72, "annual_teu": 6000000},
+    {"locode": "AUSYD", "name": "Sydney", "country": "Australia", "region": "Oceania", "coords": [-33.9667, 151.2167], "strategic_importance": 60, "annual_teu": 2800000},
+    {"locode": "USMIA", "name": "Miami", "country": "United States", "region": "North America", "coords": [25.7781, -80.1794], "strategic_importance": 60, "annual_teu": 1250000},
+    {"locode": "BRSSZ", "name": "Santos", "country": "Brazil", "region": "South America", "coords": [-23.9608, -46.3336], "strategic_importance": 72, "annual_teu": 4800000},
+    {"locode": "ZACPT", "name": "Cape Town", "country": "South Africa", "region": "Africa", "coords": [-33.9083, 18.4356], "strategic_importance": 60, "annual_teu": 900000},
+    {"locode": "EGSUZ", "name": "Suez Canal Ports", "country": "Egypt", "region": "Middle East", "coords": [30.0131, 32.5899], "strategic_importance": 85, "annual_teu": 3800000},
+]
+
+class PortCatalog:
+    """
+    Port records built once per process
+
+    Records keep the /api/ports shape; ports can be looked up by their API id
+    ("port_0001") or UN/LOCODE. Infrastructure figures are placeholders until a
+    port data feed exists, seeded per port so they stay stable between requests
+    (and cacheable) instead of changing on every call.
+    """
+
+    def __init__(self, ports: Optional[List[Dict[str, Any]]] = None):
+        start = time.perf_counter()
+        self.version = 1
+        self.built_at = datetime.now()
+        self.ports: List[Dict[str, Any]] = [
+            self._record(i, port_data) for i, port_data in enumerate(ports or MAJOR_PORTS)
+        ]
+        self._positions: Dict[str, int] = {}
+        for position, port in enumerate(self.ports):
+            self._positions[port["id"]] = position
+            self._positions[port["locode"]] = position
+        self._index = SphericalIndex([port["lat"] for port in self.ports], [port["lng"] for port in self.ports])
+        self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _record(self, i: int, port_data: Dict[str, Any]) -> Dict[str, Any]:
+        rng = random.Random(port_data["locode"])
+        return {
+            "id": f"port_{i+1:04d}",
+            "locode": port_data["locode"],
+            "name": port_data["name"],
+            "country": port_data["country"],
+            "coordinates": port_data["coords"],
+            "lat": port_data["coords"][0],
+            "lng": port_data["coords"][1],
+            "strategic_importance": port_data["strategic_importance"],
+            "annual_teu": port_data["annual_teu"],
+            "port_type": "Container Terminal",
+            "status": "Active",
+            "capacity_utilization": rng.randint(65, 95),
+            "depth_meters": rng.randint(12, 20),
+            "berths": rng.randint(8, 25),
+            "crane_count": rng.randint(15, 50),
+            "storage_area_hectares": rng.randint(100, 800),
+            "rail_connectivity": rng.choice([True, False]),
+            "road_connectivity": True,
+            "customs_24_7": rng.choice([True, False]),
+            "free_trade_zone": rng.choice([True, False]),
+            "last_updated": self.built_at.isoformat(),
+            "timezone": "UTC",
+            "region": port_data.get("region", "Global")
+        }
+
+    def __len__(self) -> int:
+        return len(self.ports)
+
+    def get(self, port_id: str) -> Optional[Dict[str, Any]]:
+        """Port by API id or UN/LOCODE (case-insensitive)"""
+        position = self._positions.get(port_id)
+        if position is None:
+            position = self._positions.get(port_id.upper())
+        return self.ports[position] if position is not None else None
+
+    def location(self, port_id: str) -> Dict[str, float]:
+        """{"lat", "lng"} of a catalog port; KeyError for unknown ids"""
+        port = self.get(port_id)
+        if port is None:
+            raise KeyError(port_id)
+        return {"lat": port["lat"], "lng": port["lng"]}
+
+    def nearest(self, lat: float, lon: float, k: int = 5,
+                max_distance_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Up to k ports closest to a point, nearest first, as {"port", "distance_km"}"""
+        positions, distances = self._index.nearest(lat, lon, k)
+        return [
+            {"port": self.ports[position], "distance_km": round(float(distance), 2)}
+            for position, distance in zip(positions, distances)
+            if max_distance_km is None or distance <= max_distance_km
+        ]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "ports": len(self.ports),
+            "build_ms": self.build_ms,
+            "kd_tree": SCIPY_AVAILABLE,
+            "built_at": self.built_at.isoformat(),
+        }
+
+# Global port catalog instance
+port_catalog = PortCatalog()
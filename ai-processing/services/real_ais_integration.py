@@ -12,9 +12,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
+from services.http_pool import http_pool
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -241,7 +240,7 @@ class RealAISIntegration:
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-Maritime-Intelligence/1.0'
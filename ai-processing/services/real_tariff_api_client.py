@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import xml.etree.ElementTree as ET
 import re
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +46,7 @@ class RealTariffAPIClient:
         }
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-Research-Platform/1.0',
@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Tuple
 import random
 import math
 from dataclasses import dataclass
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -90,7 +91,7 @@ class RealTimeAISFetcher:
         ]
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-AIS-Client/1.0',
@@ -7,9 +7,13 @@ import asyncio
 import aiohttp
 import json
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+from services.request_coalescer import single_flight
+from services.http_pool import http_pool
+
 logger = logging.getLogger(__name__)
 
 # News API endpoints and configurations
@@ -29,7 +33,24 @@ CORS_PROXIES = [
     'https://api.codetabs.com/v1/proxy?quest='
 ]
 
+# Every caller shares one scrape at this size and takes a prefix of it
+DISRUPTION_FETCH_LIMIT = int(os.getenv("DISRUPTION_FETCH_LIMIT", "250"))
+
 async def get_real_time_disruptions(limit: int = 250) -> List[Dict[str, Any]]:
+    """
+    Most severe `limit` real-time maritime disruptions
+
+    Served from one coalesced fetch of DISRUPTION_FETCH_LIMIT disruptions, so
+    callers asking for different limits never scrape the feeds separately.
+    """
+    return (await _shared_real_time_disruptions())[:limit]
+
+# An empty list means every source failed (errors are swallowed below) - never reuse it
+@single_flight(ttl_seconds=120, name="get_real_time_disruptions", cache_if=bool)
+async def _shared_real_time_disruptions() -> List[Dict[str, Any]]:
+    return await fetch_real_time_disruptions(DISRUPTION_FETCH_LIMIT)
+
+async def fetch_real_time_disruptions(limit: int = 250) -> List[Dict[str, Any]]:
     """
     Fetch real-time maritime disruptions from news APIs and RSS feeds
     Returns list of disruption dictionaries with proper coordinates
@@ -66,7 +87,7 @@ async def get_real_time_disruptions(limit: int = 250) -> List[Dict[str, Any]]:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20), headers=headers) as session:
+        async with http_pool.client_session(timeout=aiohttp.ClientTimeout(total=20), headers=headers) as session:
             tasks = []
             
             # Expanded RSS feeds for comprehensive maritime news coverage
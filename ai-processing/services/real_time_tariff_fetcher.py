@@ -14,6 +14,7 @@ import random
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass, asdict
 import re
+from services.http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -169,7 +170,7 @@ class RealTimeTariffFetcher:
         }
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
+        self.session = http_pool.client_session(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={
                 'User-Agent': 'TradeWatch-Tariff-Client/1.0',
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Record Codec Service for TradeWatch
+Compact JSON records compressed with zstd and a dictionary trained per cache table
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Small records compress poorly on their own; a shared dictionary holds the repeated keys and values
+ZSTD_LEVEL = 3
+DICT_SIZE = 16 * 1024
+DICT_TRAIN_SAMPLES = 1000
+
+DICTIONARY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS raw_data_dictionaries (
+        dict_id INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        dict_data BLOB NOT NULL,
+        created_ms INTEGER NOT NULL
+    )
+"""
+
+class RecordCodec:
+    """
+    Encodes cached records for the raw_data column and back to JSON bytes
+
+    Stored values are zstd frames of compact JSON. The frame header names the
+    dictionary it needs, and every dictionary is kept in `raw_data_dictionaries`
+    so rows stay readable after retraining and by other processes. Until a
+    table has `DICT_TRAIN_SAMPLES` records to train on, frames are compressed
+    without a dictionary. Legacy TEXT rows (plain JSON) and uncompressed JSON
+    (when zstandard is not installed) decode as they are.
+
+    `compress` is called with the cache's write lock held; `to_json` is safe
+    from any thread (decompressors are per thread).
+    """
+
+    def __init__(self, level: int = ZSTD_LEVEL, dict_size: int = DICT_SIZE,
+                 train_samples: int = DICT_TRAIN_SAMPLES):
+        self.level = level
+        self.dict_size = dict_size
+        self.train_samples = train_samples
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._compressors: Dict[str, "zstandard.ZstdCompressor"] = {}
+        self._samples: Dict[str, List[bytes]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def load(self, conn):
+        """Create the dictionary table and compress with each table's newest dictionary"""
+        conn.execute(DICTIONARY_TABLE_SQL)
+        if not ZSTD_AVAILABLE:
+            return
+        for dict_id, table, dict_data in conn.execute(
+                "SELECT dict_id, table_name, dict_data FROM raw_data_dictionaries ORDER BY created_ms"):
+            self._use_dictionary(table, self._register(dict_id, dict_data))
+
+    def _register(self, dict_id: int, dict_data: bytes) -> "zstandard.ZstdCompressionDict":
+        dictionary = zstandard.ZstdCompressionDict(dict_data)
+        with self._lock:
+            self._dictionaries[dict_id] = dictionary
+        return dictionary
+
+    def _use_dictionary(self, table: str, dictionary: Optional["zstandard.ZstdCompressionDict"]):
+        self._compressors[table] = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+
+    def compress(self, table: str, payloads: List[bytes], conn) -> List[bytes]:
+        """Compress compact-JSON payloads for `table`, training its dictionary once enough samples arrived"""
+        if not ZSTD_AVAILABLE:
+            return payloads
+        if table not in self._compressors or table in self._samples:
+            self._collect_samples(table, payloads, conn)
+        compress = self._compressors[table].compress
+        return [compress(payload) for payload in payloads]
+
+    def _collect_samples(self, table: str, payloads: List[bytes], conn):
+        samples = self._samples.setdefault(table, [])
+        samples.extend(payloads[:self.train_samples - len(samples)])
+        if table not in self._compressors:
+            self._use_dictionary(table, None)
+        if len(samples) < self.train_samples:
+            return
+        del self._samples[table]
+        start = time.perf_counter()
+        try:
+            trained = zstandard.train_dictionary(self.dict_size, samples, level=self.level)
+        except zstandard.ZstdError as e:
+            logger.warning(f"Could not train a raw_data dictionary for {table}: {e}")
+            return
+        dict_id, dict_data = trained.dict_id(), trained.as_bytes()
+        conn.execute(
+            "INSERT OR IGNORE INTO raw_data_dictionaries (dict_id, table_name, dict_data, created_ms) VALUES (?, ?, ?, ?)",
+            (dict_id, table, dict_data, int(time.time() * 1000))
+        )
+        self._use_dictionary(table, self._register(dict_id, dict_data))
+        logger.info(f"Trained {len(dict_data)}-byte raw_data dictionary {dict_id} for {table} "
+                    f"on {len(samples)} records in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _decompressor(self, dict_id: int, conn) -> "zstandard.ZstdDecompressor":
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                with self._lock:
+                    dictionary = self._dictionaries.get(dict_id)
+                if dictionary is None:
+                    # Trained by another process sharing the database
+                    row = conn.execute("SELECT dict_data FROM raw_data_dictionaries WHERE dict_id = ?",
+                                       (dict_id,)).fetchone()
+                    if row is None:
+                        raise ValueError(f"unknown raw_data dictionary {dict_id}")
+                    dictionary = self._register(dict_id, row[0])
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor
+
+    def to_json(self, raw: Union[str, bytes], conn) -> bytes:
+        """JSON bytes of one stored raw_data value"""
+        if isinstance(raw, str):
+            return raw.encode()
+        if raw[:4] != ZSTD_MAGIC:
+            return raw
+        if not ZSTD_AVAILABLE:
+            raise ValueError("raw_data is zstd-compressed but zstandard is not installed")
+        dict_id = zstandard.get_frame_parameters(raw).dict_id
+        return self._decompressor(dict_id, conn).decompress(raw)
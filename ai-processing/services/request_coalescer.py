@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Request Coalescing Service for TradeWatch
+Single-flight layer so concurrent callers share one upstream fetch per function and arguments
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight future
+
+    Completed results are kept for a per-name TTL, so callers arriving shortly
+    after a fetch finished are answered without touching the upstream either.
+    Results are shared between callers and must be treated as read-only.
+    At most `max_results` are kept; the oldest go first once expired ones are dropped.
+    """
+
+    def __init__(self, max_results: int = 256):
+        self.max_results = max_results
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self._ttls: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def set_ttl(self, name: str, ttl_seconds: float):
+        """Override the result TTL for one coalesced function"""
+        self._ttls[name] = ttl_seconds
+
+    def get_ttl(self, name: str, default: float = 0.0) -> float:
+        return self._ttls.get(name, default)
+
+    async def run(self, name: str, key: Hashable, factory: Callable[[], Awaitable[Any]],
+                  ttl_seconds: float = 0.0, cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return a fresh cached result, join an in-flight call, or originate a new one
+
+        A completed result is only kept for reuse when `cache_if` (if given) accepts it.
+        """
+        stats = self._stats.setdefault(name, {"originated": 0, "coalesced": 0, "cache_hits": 0, "errors": 0})
+        full_key = (name, key)
+        ttl = self._ttls.get(name, ttl_seconds)
+
+        cached = self._results.get(full_key)
+        if cached is not None:
+            expires_at, value = cached
+            if time.monotonic() < expires_at:
+                stats["cache_hits"] += 1
+                return value
+            del self._results[full_key]
+
+        task = self._inflight.get(full_key)
+        if task is not None:
+            stats["coalesced"] += 1
+        else:
+            stats["originated"] += 1
+            task = asyncio.create_task(self._execute(name, full_key, factory, ttl, cache_if))
+            self._inflight[full_key] = task
+
+        # Shield so one cancelled caller does not cancel the fetch the others are awaiting
+        return await asyncio.shield(task)
+
+    async def _execute(self, name: str, full_key: Hashable, factory: Callable[[], Awaitable[Any]],
+                       ttl: float, cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+        try:
+            value = await factory()
+        except Exception:
+            self._stats[name]["errors"] += 1
+            raise
+        else:
+            if ttl > 0 and (cache_if is None or cache_if(value)):
+                self._store(full_key, time.monotonic() + ttl, value)
+            return value
+        finally:
+            self._inflight.pop(full_key, None)
+
+    def _store(self, full_key: Hashable, expires_at: float, value: Any):
+        now = time.monotonic()
+        for key in [k for k, (expiry, _) in self._results.items() if expiry <= now]:
+            del self._results[key]
+        self._results.pop(full_key, None)
+        while self._results and len(self._results) >= self.max_results:
+            # Dicts keep insertion order, so the first key is the oldest result
+            del self._results[next(iter(self._results))]
+        self._results[full_key] = (expires_at, value)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop cached results for one function, or for all of them"""
+        if name is None:
+            self._results.clear()
+        else:
+            for full_key in [k for k in self._results if k[0] == name]:
+                del self._results[full_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-function originated/coalesced/cache-hit counters"""
+        stats = {}
+        for name, counters in self._stats.items():
+            total = counters["originated"] + counters["coalesced"] + counters["cache_hits"]
+            stats[name] = {
+                **counters,
+                "in_flight": len([k for k in self._inflight if k[0] == name]),
+                "cached_keys": len([k for k in self._results if k[0] == name]),
+                "ttl_seconds": self._ttls.get(name),
+                "upstream_saved_ratio": round(1 - counters["originated"] / total, 3) if total else 0.0,
+            }
+        return stats
+
+def _make_key(args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+# Global coalescer instance
+request_coalescer = SingleFlight(max_results=int(os.getenv("COALESCE_MAX_RESULTS", "256")))
+
+def single_flight(ttl_seconds: float = 0.0, name: Optional[str] = None,
+                  cache_if: Optional[Callable[[Any], bool]] = None):
+    """
+    Decorator coalescing concurrent calls to an async function by its arguments
+
+    Args:
+        ttl_seconds: how long a completed result is reused (0 = only share in-flight calls),
+            overridable with the COALESCE_TTL_<NAME> environment variable
+        name: stats/TTL name, defaults to the function name
+        cache_if: keep a result for the TTL only if this returns True (e.g. `bool` so an
+            empty result from a swallowed upstream failure is not reused)
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        flight_name = name or func.__name__
+        env_ttl = os.getenv(f"COALESCE_TTL_{flight_name.upper()}")
+        request_coalescer.set_ttl(flight_name, float(env_ttl) if env_ttl else ttl_seconds)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await request_coalescer.run(
+                flight_name, _make_key(args, kwargs), lambda: func(*args, **kwargs), ttl_seconds, cache_if
+            )
+
+        wrapper.uncoalesced = func
+        return wrapper
+    return decorator
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Response Cache Service for TradeWatch
+Keeps serialized (and lazily compressed) API payloads per snapshot version with strong ETags
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Optional, Hashable, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from utils.timing import span
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are always sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+# Bodies at least this large are compressed in a worker thread, off the event loop
+THREAD_COMPRESS_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ACCEPT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+def encode_json(value: Any) -> bytes:
+    """Serialize to compact JSON bytes with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(",", ":"), default=str, ensure_ascii=False).encode()
+
+def encode_payload(value: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+    return encode_json(value)
+
+def _accepted(header: str) -> set:
+    """Lower-cased tokens of an Accept-style header whose q-value is above zero"""
+    accepted = set()
+    for part in header.split(","):
+        token, *params = [item.strip() for item in part.split(";")]
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(token.lower())
+    return accepted
+
+def negotiate_media_type(request: Request) -> str:
+    """MessagePack when the client asks for it (and it is installed), JSON otherwise"""
+    if not MSGPACK_AVAILABLE:
+        return JSON_MEDIA_TYPE
+    if _accepted(request.headers.get("accept", "")) & set(MSGPACK_ACCEPT_TYPES):
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+@dataclass
+class EncodedResponse:
+    """Serialized body plus compressed variants, computed once per encoding and reused"""
+    body: bytes
+    etag: str
+    media_type: str = JSON_MEDIA_TYPE
+    created_at: float = field(default_factory=time.monotonic)
+    _variants: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    # Threaded compressions in progress, so concurrent first requests share one
+    _compressing: Dict[str, "asyncio.Future[bytes]"] = field(default_factory=dict, repr=False, compare=False)
+    # Set while a ResponseCache holds this response, so it can count variants made later
+    _on_variant: Optional[Callable[[int], None]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_bytes(cls, body: bytes, media_type: str = JSON_MEDIA_TYPE) -> "EncodedResponse":
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        return cls(body=body, etag=f'"{digest}"', media_type=media_type)
+
+    def variant(self, encoding: str) -> bytes:
+        """Body for a content-coding ("br", "gzip" or "identity"), compressed on this thread"""
+        if encoding == "identity":
+            return self.body
+        cached = self._variants.get(encoding)
+        if cached is None:
+            cached = self._add_variant(encoding, self._compress(encoding))
+        return cached
+
+    async def variant_async(self, encoding: str) -> bytes:
+        """Like `variant`, but large bodies are compressed in a worker thread"""
+        if encoding == "identity" or encoding in self._variants or len(self.body) < THREAD_COMPRESS_BYTES:
+            return self.variant(encoding)
+        future = self._compressing.get(encoding)
+        if future is None:
+            future = self._compressing[encoding] = asyncio.ensure_future(asyncio.to_thread(self._compress, encoding))
+            future.add_done_callback(lambda _: self._compressing.pop(encoding, None))
+        compressed = await asyncio.shield(future)
+        return self._variants.get(encoding) or self._add_variant(encoding, compressed)
+
+    def _compress(self, encoding: str) -> bytes:
+        with span("compress"):
+            if encoding == "br":
+                return brotli.compress(self.body, quality=BROTLI_QUALITY)
+            return gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def _add_variant(self, encoding: str, compressed: bytes) -> bytes:
+        self._variants[encoding] = compressed
+        if self._on_variant is not None:
+            self._on_variant(len(compressed))
+        return compressed
+
+    def etag_for(self, encoding: str) -> str:
+        # Strong validators must differ per representation
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.body) + sum(len(v) for v in self._variants.values())
+
+def _choose_encoding(request: Request, encoded: EncodedResponse) -> str:
+    if len(encoded.body) < MIN_COMPRESS_BYTES:
+        return "identity"
+    accepted = _accepted(request.headers.get("accept-encoding", ""))
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match against the tag of the representation being served"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+async def cached_response(request: Request, encoded: EncodedResponse,
+                          headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve an encoded payload, answering If-None-Match with 304"""
+    encoding = _choose_encoding(request, encoded)
+    etag = encoded.etag_for(encoding)
+    response_headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+        **(headers or {}),
+    }
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=await encoded.variant_async(encoding), media_type=encoded.media_type, headers=response_headers)
+
+class ResponseCache:
+    """
+    LRU of encoded payloads bounded by entry count and by bytes
+
+    Entries are valid for one snapshot version (vessels) or for a TTL
+    (tariffs, disruptions) - whichever the caller keys them by. The byte
+    budget counts each body and every compressed variant made from it,
+    including variants made after the entry was stored; a body larger than
+    the whole budget is served but not kept.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], EncodedResponse]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "encodes": 0, "evictions": 0, "oversized": 0}
+
+    def get(self, key: Hashable, version: Any = None) -> Optional[EncodedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, expires_at, encoded = entry
+            if entry_version == version and (expires_at is None or time.monotonic() < expires_at):
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return encoded
+            self._remove(key)
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: Hashable, payload: Any, version: Any = None,
+            ttl_seconds: Optional[float] = None, store: bool = True,
+            media_type: str = JSON_MEDIA_TYPE) -> EncodedResponse:
+        """Encode a payload once and (optionally) keep it for later requests"""
+        with span("serialize"):
+            encoded = EncodedResponse.from_bytes(encode_payload(payload, media_type), media_type=media_type)
+        self.stats["encodes"] += 1
+        if store:
+            self._store(key, version, ttl_seconds, encoded)
+        return encoded
+
+    def put_bytes(self, key: Hashable, body: bytes, version: Any = None,
+                  ttl_seconds: Optional[float] = None, media_type: str = JSON_MEDIA_TYPE) -> EncodedResponse:
+        """Keep an already-serialized body (e.g. spliced from stored JSON) for later requests"""
+        encoded = EncodedResponse.from_bytes(body, media_type=media_type)
+        self._store(key, version, ttl_seconds, encoded)
+        return encoded
+
+    def _store(self, key: Hashable, version: Any, ttl_seconds: Optional[float], encoded: EncodedResponse):
+        if key in self._entries:
+            self._remove(key)
+        if encoded.size_bytes > self.max_bytes:
+            self.stats["oversized"] += 1
+            return
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (version, expires_at, encoded)
+        self._bytes += encoded.size_bytes
+        encoded._on_variant = self._grow
+        self._evict()
+
+    def _grow(self, size: int):
+        # A stored response gained a compressed variant
+        self._bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        encoded = self._entries.pop(key)[2]
+        encoded._on_variant = None
+        self._bytes -= encoded.size_bytes
+
+    def invalidate(self, prefix: Optional[str] = None):
+        """Drop all entries, or those whose key tuple starts with `prefix`"""
+        for key in [k for k in self._entries
+                    if prefix is None or (isinstance(k, tuple) and k and k[0] == prefix)]:
+            self._remove(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "orjson": ORJSON_AVAILABLE,
+            "brotli": BROTLI_AVAILABLE,
+            "msgpack": MSGPACK_AVAILABLE,
+        }
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Service Container for TradeWatch
+Lazily built, concurrently warmed application components with a startup timing breakdown
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, List
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ComponentState:
+    """Build status of one registered component"""
+    name: str
+    factory: Callable[[], Any]
+    status: str = "pending"   # pending | building | ready | failed
+    instance: Any = None
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+
+class ServiceContainer:
+    """
+    Registry of named components built at most once
+
+    Factories may be sync (run in a worker thread so heavy imports and SQLite
+    setup do not block the event loop) or async. `get()` builds on first use and
+    returns None for a component that failed; `warm_up()` builds everything
+    concurrently and flips the container to ready when done.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, ComponentState] = {}
+        self._ready = asyncio.Event()
+        self.warm_up_ms: Optional[float] = None
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._components[name] = ComponentState(name=name, factory=factory)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._components)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def peek(self, name: str) -> Any:
+        """Instance if already built, without triggering a build"""
+        component = self._components[name]
+        return component.instance if component.status == "ready" else None
+
+    async def get(self, name: str) -> Any:
+        """Build (or join the in-flight build of) a component; None if it failed"""
+        component = self._components[name]
+        if component.status == "ready":
+            return component.instance
+        if component.status == "failed":
+            return None
+        if component.task is None:
+            component.task = asyncio.create_task(self._build(component))
+        await asyncio.shield(component.task)
+        return component.instance
+
+    def mark_ready(self, name: str, instance: Any):
+        """Flip a failed component to ready, e.g. once work that outlasted its build timeout completes"""
+        component = self._components[name]
+        if component.status != "failed":
+            return
+        component.instance = instance
+        component.status = "ready"
+        component.error = None
+        logger.info(f"✅ {component.name} ready (recovered after failed build)")
+
+    async def _build(self, component: ComponentState):
+        component.status = "building"
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(component.factory):
+                instance = await component.factory()
+            else:
+                instance = await asyncio.to_thread(component.factory)
+        except Exception as e:
+            component.status = "failed"
+            component.error = f"{type(e).__name__}: {e}"
+            logger.warning(f"⚠️ {component.name} not available: {e}")
+        else:
+            component.instance = instance
+            component.status = "ready"
+            logger.info(f"✅ {component.name} ready")
+        finally:
+            component.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    async def warm_up(self, names: Optional[List[str]] = None):
+        """Build the given (default: all) components concurrently, then mark the container ready"""
+        start = time.perf_counter()
+        await asyncio.gather(*(self.get(name) for name in (names or list(self._components))))
+        self.warm_up_ms = round((time.perf_counter() - start) * 1000, 1)
+        self._ready.set()
+        failed = [c.name for c in self._components.values() if c.status == "failed"]
+        logger.info(f"✅ Warm-up finished in {self.warm_up_ms:.0f}ms" + (f" (failed: {', '.join(failed)})" if failed else ""))
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness plus per-component status and build time"""
+        return {
+            "ready": self.ready,
+            "warm_up_ms": self.warm_up_ms,
+            "components": {
+                component.name: {
+                    "status": component.status,
+                    "startup_ms": component.duration_ms,
+                    **({"error": component.error} if component.error else {}),
+                }
+                for component in self._components.values()
+            },
+        }
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Shared Snapshot Service for TradeWatch
+One producer worker publishes each fleet snapshot to a memory-mapped file; the other workers adopt it
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from services.response_cache import encode_json
+from services.vessel_snapshot import VesselSnapshot, VesselSnapshotService
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"TWVS"
+LAYOUT_VERSION = 1
+
+# magic, layout version, flags, snapshot version, built_at (epoch seconds), build ms,
+# real data %, vessel count, padding, then (offset, length) of the records and meta sections
+_HEADER = struct.Struct("<4sHHQdddIIQQQQ")
+
+def _decode_json(buffer) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(buffer)
+    return json.loads(bytes(buffer))
+
+def encode_snapshot(snapshot: VesselSnapshot) -> bytes:
+    """Versioned header followed by the vessel records (JSON array) and meta (sources, disruptions)"""
+    records = encode_json(list(snapshot.vessels))
+    meta = encode_json({"data_sources": list(snapshot.data_sources), "disruptions": list(snapshot.disruptions)})
+    records_offset = _HEADER.size
+    meta_offset = records_offset + len(records)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, LAYOUT_VERSION, 0, snapshot.version, snapshot.built_at.timestamp(),
+        snapshot.build_duration_ms, snapshot.real_data_percentage, len(snapshot.vessels), 0,
+        records_offset, len(records), meta_offset, len(meta)
+    )
+    return header + records + meta
+
+def decode_snapshot(buffer) -> VesselSnapshot:
+    """
+    Rebuild a VesselSnapshot from an encoded buffer (bytes or a memory map)
+
+    Raises:
+        ValueError: if the buffer is not a snapshot in this layout
+    """
+    (magic, layout, _, version, built_at, build_ms, real_percentage, count, _,
+     records_offset, records_length, meta_offset, meta_length) = _HEADER.unpack_from(buffer, 0)
+    if magic != SNAPSHOT_MAGIC or layout != LAYOUT_VERSION:
+        raise ValueError(f"Not a layout {LAYOUT_VERSION} vessel snapshot")
+
+    # Decoded straight from the mapping - no intermediate read() copy of the file
+    with memoryview(buffer) as view:
+        vessels = _decode_json(view[records_offset:records_offset + records_length])
+        meta = _decode_json(view[meta_offset:meta_offset + meta_length])
+    if len(vessels) != count:
+        raise ValueError(f"Snapshot v{version} holds {len(vessels)} vessels, header says {count}")
+
+    return VesselSnapshot(
+        version=version,
+        vessels=tuple(vessels),
+        data_sources=tuple(meta["data_sources"]),
+        built_at=datetime.fromtimestamp(built_at),
+        build_duration_ms=build_ms,
+        real_data_percentage=real_percentage,
+        disruptions=tuple(meta["disruptions"]),
+        # Age counts from the producer's build, not from when this worker read it
+        built_monotonic=time.monotonic() - max(0.0, time.time() - built_at),
+    )
+
+class SharedSnapshotPublisher:
+    """Writes each snapshot to a temp file and renames it over `path`, so readers never see a partial write"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stats = {"published": 0, "last_version": 0, "last_bytes": 0, "last_publish_ms": 0.0}
+
+    def publish(self, snapshot: VesselSnapshot):
+        start = time.perf_counter()
+        data = encode_snapshot(snapshot)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, self.path)
+        self.stats["published"] += 1
+        self.stats["last_version"] = snapshot.version
+        self.stats["last_bytes"] = len(data)
+        self.stats["last_publish_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+class SharedSnapshotReader:
+    """Maps the published file read-only and decodes it only when a new one has been renamed into place"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.latest: Optional[VesselSnapshot] = None
+        self._file_key = None
+        self.stats = {"reads": 0, "read_failures": 0, "last_read_ms": 0.0}
+
+    def read(self) -> Optional[VesselSnapshot]:
+        """The newly published snapshot, or None when the file is missing or unchanged"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            stat = os.fstat(f.fileno())
+            file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_key == self._file_key or stat.st_size < _HEADER.size:
+                return None
+            start = time.perf_counter()
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    snapshot = decode_snapshot(buffer)
+            except (ValueError, struct.error) as e:
+                self.stats["read_failures"] += 1
+                logger.warning(f"Unreadable shared vessel snapshot {self.path}: {e}")
+                return None
+        self._file_key = file_key
+        self.stats["reads"] += 1
+        self.stats["last_read_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.latest = snapshot
+        return snapshot
+
+class ProducerLock:
+    """Non-blocking exclusive flock; the kernel releases it when the holding process exits"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+class SharedSnapshotCoordinator:
+    """
+    Makes exactly one worker the snapshot producer when several serve the API
+
+    The worker holding the producer lock runs the normal rebuild loop (and with
+    it every upstream fetch and cache) and publishes each snapshot. Followers
+    never call the builder: they poll the shared file and adopt the producer's
+    snapshots with their versions, so versions, cursors and ETags agree across
+    workers. A follower takes over if the producer exits and frees the lock.
+    """
+
+    def __init__(self, service: VesselSnapshotService, path: str, poll_interval: float = 1.0):
+        if not FCNTL_AVAILABLE:
+            raise RuntimeError("Shared vessel snapshots need fcntl (POSIX)")
+        self.service = service
+        self.path = path
+        self.poll_interval = poll_interval
+        self.publisher = SharedSnapshotPublisher(path)
+        self.reader = SharedSnapshotReader(path)
+        self.lock = ProducerLock(f"{path}.lock")
+        self._builder = service.builder
+        self._follow_task: Optional[asyncio.Task] = None
+        self._listening = False
+        self.promotions = 0
+
+    @property
+    def role(self) -> str:
+        return "producer" if self.lock.held else "follower"
+
+    def claim(self) -> bool:
+        """Try to become the producer; True if this worker now holds the lock"""
+        return self.lock.try_acquire()
+
+    async def start(self):
+        if self.claim():
+            await self._start_producing()
+            return
+        logger.info(f"📡 Following shared vessel snapshot {self.path} (pid {os.getpid()})")
+        self.service.builder = self._wait_for_shared
+        self._follow_task = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        if self._follow_task and not self._follow_task.done():
+            self._follow_task.cancel()
+            try:
+                await self._follow_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._follow_task = None
+        self.lock.release()
+
+    async def _start_producing(self):
+        # Continue from the newest shared version so versions never go backwards on takeover
+        shared = self.reader.read() or self.reader.latest
+        if shared is not None:
+            self.service.adopt(shared)
+        self.service.builder = self._builder
+        if not self._listening:
+            self.service.add_listener(self._publish)
+            self._listening = True
+        logger.info(f"📡 Producing shared vessel snapshot {self.path} (pid {os.getpid()})")
+        await self.service.start()
+
+    def _publish(self, snapshot: VesselSnapshot):
+        if self.lock.held:
+            self.publisher.publish(snapshot)
+
+    async def _wait_for_shared(self, capacity: int) -> VesselSnapshot:
+        """Follower builder: the newest published snapshot, waiting for the producer's first one"""
+        while True:
+            snapshot = self.reader.read() or self.reader.latest
+            if snapshot is not None:
+                return snapshot
+            await asyncio.sleep(self.poll_interval)
+
+    async def _follow(self):
+        while True:
+            try:
+                snapshot = self.reader.read()
+                if snapshot is not None:
+                    self.service.adopt(snapshot)
+                if self.claim():
+                    self.promotions += 1
+                    logger.warning("⚠️ Shared vessel snapshot producer went away - taking over")
+                    await self._start_producing()
+                    return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Shared vessel snapshot poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "pid": os.getpid(),
+            "path": self.path,
+            "poll_interval_seconds": self.poll_interval,
+            "promotions": self.promotions,
+            "publisher": self.publisher.stats if self.lock.held else None,
+            "reader": self.reader.stats,
+        }
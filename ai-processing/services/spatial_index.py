@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Spatial Index Service for TradeWatch
+Fixed-resolution lat/lon grid over a vessel snapshot for viewport, type and speed queries
+"""
+
+import base64
+import bisect
+import hashlib
+import logging
+import math
+import time
+from typing import List, Dict, Any, Optional, Tuple, Sequence, FrozenSet
+
+from utils.geo import BoundingBox, SphericalIndex
+from utils.projection import FieldSet, project_records
+from services.vessel_clusters import VesselClusterPyramid, DEFAULT_MAX_CLUSTER_ZOOM
+
+logger = logging.getLogger(__name__)
+
+# Distinct field projections kept per index before the oldest is dropped
+MAX_PROJECTIONS = 16
+
+class InvalidCursorError(ValueError):
+    """Cursor is malformed or was issued for a different query"""
+
+def _coerce_float(value: Any) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return result if math.isfinite(result) else None
+
+def query_fingerprint(bbox: Optional[BoundingBox], types: Optional[FrozenSet[str]],
+                      min_speed: Optional[float]) -> str:
+    """Short hash of the filters a cursor was issued for"""
+    key = repr((bbox.as_list() if bbox else None, sorted(types) if types else None, min_speed))
+    return hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+def encode_cursor(after_id: str, fingerprint: str) -> str:
+    raw = f"{fingerprint}:{after_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, fingerprint: str) -> str:
+    """
+    Return the vessel id a cursor continues after
+
+    Raises:
+        InvalidCursorError: if the cursor cannot be decoded or belongs to other filters
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_fingerprint, after_id = raw.split(":", 1)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorError("cursor is not valid")
+    if cursor_fingerprint != fingerprint:
+        raise InvalidCursorError("cursor was issued for different bbox/types/min_speed filters")
+    return after_id
+
+class VesselGridIndex:
+    """
+    Immutable grid index over one snapshot's vessels
+
+    Vessels are bucketed into `resolution`-degree cells so a bbox query only
+    visits the cells it overlaps (or the occupied cells, whichever is fewer).
+    Results are ordered by vessel id, which keeps keyset pagination stable when
+    the next page is served from a newer snapshot.
+    """
+
+    def __init__(self, vessels: Sequence[Dict[str, Any]], version: int = 0, resolution: float = 1.0,
+                 max_cluster_zoom: int = DEFAULT_MAX_CLUSTER_ZOOM):
+        start = time.perf_counter()
+        self.version = version
+        self.resolution = resolution
+        self.max_cluster_zoom = max_cluster_zoom
+        self._clusters: Optional[VesselClusterPyramid] = None
+        self._spherical: Optional[SphericalIndex] = None
+        self._spherical_positions: List[int] = []
+        self._projections: Dict[FieldSet, List[Dict[str, Any]]] = {}
+        self.rows = math.ceil(180 / resolution)
+        self.cols = math.ceil(360 / resolution)
+
+        # Deduplicate by id (first occurrence wins) and order by id for cursors
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for vessel in vessels:
+            vessel_id = vessel.get("id")
+            if vessel_id is None:
+                continue
+            key = str(vessel_id)
+            if key not in by_id:
+                by_id[key] = vessel
+        self._ids: List[str] = sorted(by_id)
+        self._vessels: List[Dict[str, Any]] = [by_id[vessel_id] for vessel_id in self._ids]
+
+        self._lats: List[Optional[float]] = []
+        self._lons: List[Optional[float]] = []
+        self._speeds: List[Optional[float]] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, vessel in enumerate(self._vessels):
+            lat = _coerce_float(vessel.get("lat", vessel.get("latitude")))
+            lon = _coerce_float(vessel.get("lon", vessel.get("longitude")))
+            if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                lat = lon = None
+            self._lats.append(lat)
+            self._lons.append(lon)
+            self._speeds.append(_coerce_float(vessel.get("speed")))
+            if lat is not None:
+                # Positions are appended in id order, so every cell list is id-sorted too
+                self._cells.setdefault(self._cell_of(lat, lon), []).append(position)
+
+        self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def __len__(self) -> int:
+        return len(self._vessels)
+
+    def projected(self, fields: Optional[FieldSet]) -> List[Dict[str, Any]]:
+        """Vessel records restricted to `fields`, built once per field set and shared by all queries"""
+        if fields is None:
+            return self._vessels
+        records = self._projections.get(fields)
+        if records is None:
+            if len(self._projections) >= MAX_PROJECTIONS:
+                del self._projections[next(iter(self._projections))]
+            records = self._projections[fields] = project_records(self._vessels, fields)
+        return records
+
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = min(int((lat + 90) / self.resolution), self.rows - 1)
+        col = min(int((lon + 180) / self.resolution), self.cols - 1)
+        return row, col
+
+    def _col_ranges(self, bbox: BoundingBox) -> List[Tuple[int, int]]:
+        west_col = self._cell_of(0, bbox.west)[1]
+        east_col = self._cell_of(0, bbox.east)[1]
+        if bbox.crosses_antimeridian:
+            return [(west_col, self.cols - 1), (0, east_col)]
+        return [(west_col, east_col)]
+
+    def _candidates(self, bbox: BoundingBox) -> List[int]:
+        south_row = self._cell_of(bbox.south, 0)[0]
+        north_row = self._cell_of(bbox.north, 0)[0]
+        col_ranges = self._col_ranges(bbox)
+        cell_count = (north_row - south_row + 1) * sum(hi - lo + 1 for lo, hi in col_ranges)
+
+        if cell_count > len(self._cells):
+            # Large viewport: cheaper to walk the occupied cells than the covered ones
+            keys = [
+                (row, col) for row, col in self._cells
+                if south_row <= row <= north_row and any(lo <= col <= hi for lo, hi in col_ranges)
+            ]
+        else:
+            keys = [
+                (row, col)
+                for row in range(south_row, north_row + 1)
+                for lo, hi in col_ranges
+                for col in range(lo, hi + 1)
+                if (row, col) in self._cells
+            ]
+
+        candidates: List[int] = []
+        for key in keys:
+            candidates.extend(self._cells[key])
+        candidates.sort()
+        return candidates
+
+    def query(self, bbox: Optional[BoundingBox] = None, types: Optional[FrozenSet[str]] = None,
+              min_speed: Optional[float] = None, after_id: Optional[str] = None,
+              limit: int = 500, fields: Optional[FieldSet] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Vessels matching all given filters with id > after_id, in id order
+
+        With `fields` the shared per-field-set projection is returned instead of full records.
+
+        Returns:
+            (vessels, last_id) where last_id is set only when more results remain
+        """
+        limit = max(1, limit)
+        # Positions are id-ordered, so the first one past the cursor is a binary search away
+        first_position = bisect.bisect_right(self._ids, after_id) if after_id is not None else 0
+        if bbox is not None:
+            positions = self._candidates(bbox)
+            start = bisect.bisect_left(positions, first_position)
+        else:
+            positions = range(len(self._vessels))
+            start = first_position
+
+        records = self.projected(fields)
+        results: List[Dict[str, Any]] = []
+        last_position = None
+        for offset in range(start, len(positions)):
+            position = positions[offset]
+            if bbox is not None and not bbox.contains(self._lats[position], self._lons[position]):
+                continue
+            if types is not None and self._vessels[position].get("type") not in types:
+                continue
+            if min_speed is not None:
+                speed = self._speeds[position]
+                if speed is None or speed < min_speed:
+                    continue
+            if len(results) == limit:
+                # One more match exists beyond this page
+                return results, self._ids[last_position]
+            results.append(records[position])
+            last_position = position
+
+        return results, None
+
+    def position_of(self, vessel_id: str) -> Optional[int]:
+        position = bisect.bisect_left(self._ids, vessel_id)
+        if position < len(self._ids) and self._ids[position] == vessel_id:
+            return position
+        return None
+
+    def vessel(self, vessel_id: str) -> Optional[Dict[str, Any]]:
+        position = self.position_of(vessel_id)
+        return self._vessels[position] if position is not None else None
+
+    def location_of(self, vessel_id: str) -> Optional[Tuple[float, float]]:
+        """(lat, lon) of a vessel, None if unknown or unpositioned"""
+        position = self.position_of(vessel_id)
+        if position is None or self._lats[position] is None:
+            return None
+        return self._lats[position], self._lons[position]
+
+    def spherical(self) -> SphericalIndex:
+        """KD-tree over positioned vessels for this snapshot, built on first use"""
+        if self._spherical is None:
+            positions = [position for position, lat in enumerate(self._lats) if lat is not None]
+            self._spherical_positions = positions
+            self._spherical = SphericalIndex([self._lats[p] for p in positions], [self._lons[p] for p in positions])
+        return self._spherical
+
+    def within_radius(self, lat: float, lon: float, radius_km: float, limit: int = 500,
+                      fields: Optional[FieldSet] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Vessels within radius_km of a point, nearest first, each with a `distance_km` field
+
+        Returns:
+            (vessels, total) where total counts every vessel in range, not just this page
+        """
+        indices, distances = self.spherical().within(lat, lon, radius_km)
+        records = self.projected(fields)
+        vessels = [
+            {**records[self._spherical_positions[index]], "distance_km": round(float(distance), 2)}
+            for index, distance in zip(indices[:max(1, limit)], distances)
+        ]
+        return vessels, len(indices)
+
+    def clusters(self) -> VesselClusterPyramid:
+        """Cluster pyramid for this snapshot, built on first use"""
+        if self._clusters is None:
+            self._clusters = VesselClusterPyramid(
+                self._lats, self._lons,
+                [vessel.get("type") for vessel in self._vessels],
+                [vessel.get("impacted", False) for vessel in self._vessels],
+                max_zoom=self.max_cluster_zoom
+            )
+        return self._clusters
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "vessels": len(self._vessels),
+            "resolution_degrees": self.resolution,
+            "occupied_cells": len(self._cells),
+            "unpositioned": len([lat for lat in self._lats if lat is None]),
+            "build_ms": self.build_ms,
+            "projections": len(self._projections),
+            "clusters": self._clusters.get_status() if self._clusters else None,
+            "kd_tree": self._spherical is not None,
+        }
+
+class SpatialIndexCache:
+    """Holds the grid index for the latest snapshot, rebuilding it when the version changes"""
+
+    def __init__(self, resolution: float = 1.0, max_cluster_zoom: int = DEFAULT_MAX_CLUSTER_ZOOM):
+        self.resolution = resolution
+        self.max_cluster_zoom = max_cluster_zoom
+        self._index: Optional[VesselGridIndex] = None
+
+    def index_for(self, snapshot) -> VesselGridIndex:
+        index = self._index
+        if index is None or index.version != snapshot.version:
+            index = VesselGridIndex(snapshot.vessels, version=snapshot.version, resolution=self.resolution,
+                                    max_cluster_zoom=self.max_cluster_zoom)
+            # Never replace a newer index with one for an older snapshot
+            if self._index is None or self._index.version <= index.version:
+                self._index = index
+            logger.debug(f"Spatial index v{index.version}: {len(index)} vessels in {index.build_ms}ms")
+        return index
+
+    def get_status(self) -> Dict[str, Any]:
+        return self._index.get_status() if self._index else {"version": None}
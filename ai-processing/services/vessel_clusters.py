@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Vessel Cluster Service for TradeWatch
+Multi-resolution grid pyramid of per-cell vessel aggregates for map zoom levels
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from utils.geo import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+# Cell size at zoom 0; each zoom level halves it (roughly a 64px cluster radius on 256px tiles)
+BASE_CELL_DEGREES = 90.0
+DEFAULT_MAX_CLUSTER_ZOOM = 11
+
+@dataclass
+class ClusterLevel:
+    """Aggregates for one zoom level, sorted by cell key (row * cols + col)"""
+    zoom: int
+    cell_degrees: float
+    cols: int
+    keys: np.ndarray
+    counts: np.ndarray
+    lat_sums: np.ndarray
+    lon_sums: np.ndarray
+    impacted: np.ndarray
+    dominant_type: np.ndarray  # index into VesselClusterPyramid.type_names
+
+class VesselClusterPyramid:
+    """
+    Per-zoom cell aggregates (count, centroid, dominant type, impacted count)
+
+    Built once per snapshot with vectorized group-bys, so a request only has to
+    slice the cells overlapping its viewport.
+    """
+
+    def __init__(self, lats: Sequence[Optional[float]], lons: Sequence[Optional[float]],
+                 types: Sequence[Optional[str]], impacted: Sequence[bool],
+                 max_zoom: int = DEFAULT_MAX_CLUSTER_ZOOM):
+        start = time.perf_counter()
+        self.max_zoom = max_zoom
+
+        positioned = [i for i, lat in enumerate(lats) if lat is not None and lons[i] is not None]
+        lat_array = np.array([lats[i] for i in positioned], dtype=np.float64)
+        lon_array = np.array([lons[i] for i in positioned], dtype=np.float64)
+        impacted_array = np.array([bool(impacted[i]) for i in positioned], dtype=np.int64)
+        type_names, type_codes = np.unique(
+            np.array([types[i] or "Unknown" for i in positioned], dtype=object).astype(str),
+            return_inverse=True
+        )
+        self.type_names: List[str] = [str(name) for name in type_names]
+        self.vessel_count = len(positioned)
+
+        self.levels: List[ClusterLevel] = [
+            self._build_level(zoom, lat_array, lon_array, impacted_array, type_codes)
+            for zoom in range(max_zoom + 1)
+        ]
+        self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _build_level(self, zoom: int, lats: np.ndarray, lons: np.ndarray,
+                     impacted: np.ndarray, type_codes: np.ndarray) -> ClusterLevel:
+        cell_degrees = BASE_CELL_DEGREES / (2 ** zoom)
+        rows = int(np.ceil(180 / cell_degrees))
+        cols = int(np.ceil(360 / cell_degrees))
+
+        if len(lats) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return ClusterLevel(zoom, cell_degrees, cols, empty, empty, empty.astype(np.float64),
+                                empty.astype(np.float64), empty, empty)
+
+        row = np.minimum(((lats + 90) / cell_degrees).astype(np.int64), rows - 1)
+        col = np.minimum(((lons + 180) / cell_degrees).astype(np.int64), cols - 1)
+        keys, inverse = np.unique(row * cols + col, return_inverse=True)
+
+        counts = np.bincount(inverse)
+        lat_sums = np.bincount(inverse, weights=lats)
+        lon_sums = np.bincount(inverse, weights=lons)
+        impacted_counts = np.bincount(inverse, weights=impacted).astype(np.int64)
+
+        # Dominant type: most frequent (cell, type) pair per cell
+        n_types = int(type_codes.max()) + 1
+        pairs, pair_counts = np.unique(inverse * n_types + type_codes, return_counts=True)
+        pair_cells = pairs // n_types
+        order = np.lexsort((-pair_counts, pair_cells))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = pair_cells[order][1:] != pair_cells[order][:-1]
+        dominant = np.empty(len(keys), dtype=np.int64)
+        dominant[pair_cells[order][first]] = (pairs[order][first] % n_types)
+
+        return ClusterLevel(zoom, cell_degrees, cols, keys, counts, lat_sums, lon_sums,
+                            impacted_counts, dominant)
+
+    def level_for(self, zoom: int) -> ClusterLevel:
+        return self.levels[max(0, min(zoom, self.max_zoom))]
+
+    def clusters(self, zoom: int, bbox: Optional[BoundingBox] = None) -> List[Dict[str, Any]]:
+        """Cell aggregates at `zoom` whose cell overlaps `bbox` (whole world when omitted)"""
+        level = self.level_for(zoom)
+        if bbox is None:
+            selected = np.arange(len(level.keys))
+        else:
+            selected = self._select(level, bbox)
+
+        clusters = []
+        for i in selected.tolist():
+            count = int(level.counts[i])
+            clusters.append({
+                "count": count,
+                "centroid": [round(float(level.lat_sums[i]) / count, 5), round(float(level.lon_sums[i]) / count, 5)],
+                "dominant_type": self.type_names[int(level.dominant_type[i])],
+                "impacted": int(level.impacted[i]),
+            })
+        return clusters
+
+    @staticmethod
+    def _select(level: ClusterLevel, bbox: BoundingBox) -> np.ndarray:
+        rows = int(np.ceil(180 / level.cell_degrees))
+
+        def cell(value: float, offset: float, limit: int) -> int:
+            return min(int((value + offset) / level.cell_degrees), limit - 1)
+
+        south, north = cell(bbox.south, 90, rows), cell(bbox.north, 90, rows)
+        west, east = cell(bbox.west, 180, level.cols), cell(bbox.east, 180, level.cols)
+        col_ranges = [(west, level.cols - 1), (0, east)] if bbox.crosses_antimeridian else [(west, east)]
+
+        # Keys are row-major and sorted, so each row/column span is one binary-search slice
+        lows = []
+        highs = []
+        for row in range(south, north + 1):
+            for lo, hi in col_ranges:
+                lows.append(row * level.cols + lo)
+                highs.append(row * level.cols + hi)
+        starts = np.searchsorted(level.keys, lows, side="left")
+        ends = np.searchsorted(level.keys, highs, side="right")
+        if not len(starts):
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "vessels": self.vessel_count,
+            "max_zoom": self.max_zoom,
+            "cells_per_level": [len(level.keys) for level in self.levels],
+            "build_ms": self.build_ms,
+        }
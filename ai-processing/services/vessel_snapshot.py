@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Vessel Snapshot Service for TradeWatch
+Rebuilds the enriched vessel list in a background task and serves immutable snapshots
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Builder signature: takes the snapshot capacity, returns
+# {"vessels": [...], "data_sources": [...], "disruptions": [...]}
+# or an already versioned VesselSnapshot built elsewhere (see `adopt()`)
+SnapshotBuilder = Callable[[int], Awaitable[Any]]
+
+@dataclass(frozen=True)
+class VesselSnapshot:
+    """Immutable enriched vessel list - never mutated after it is published"""
+    version: int
+    vessels: Tuple[Dict[str, Any], ...]
+    data_sources: Tuple[str, ...]
+    built_at: datetime
+    build_duration_ms: float
+    real_data_percentage: float
+    disruptions: Tuple[Dict[str, Any], ...] = ()
+    built_monotonic: float = field(default_factory=time.monotonic, repr=False)
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since this snapshot was published"""
+        return time.monotonic() - self.built_monotonic
+
+    @property
+    def data_source(self) -> str:
+        return " + ".join(self.data_sources) if self.data_sources else "Enhanced Generation"
+
+class VesselSnapshotService:
+    """Keeps a fleet snapshot warm and swaps in rebuilt snapshots atomically"""
+
+    def __init__(self, builder: SnapshotBuilder, capacity: int = 3000,
+                 refresh_interval: float = 60.0, max_staleness: float = 600.0):
+        self.builder = builder
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self._snapshot: Optional[VesselSnapshot] = None
+        self._version = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[VesselSnapshot], None]] = []
+        self.stats = {
+            "builds": 0,
+            "adopted": 0,
+            "build_failures": 0,
+            "last_build_ms": 0.0,
+            "last_error": None,
+        }
+
+    @property
+    def snapshot(self) -> Optional[VesselSnapshot]:
+        """Current snapshot without triggering any refresh"""
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[VesselSnapshot], None]):
+        """Register a callback run synchronously after each snapshot swap"""
+        self._listeners.append(listener)
+
+    async def start(self):
+        """Start the periodic background refresh loop"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run_refresh_loop())
+            logger.info(f"Vessel snapshot refresh loop started (every {self.refresh_interval:.0f}s, capacity {self.capacity})")
+
+    async def stop(self):
+        """Cancel the refresh loop and any in-flight rebuild"""
+        for task in (self._loop_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
+
+    async def get_snapshot(self) -> VesselSnapshot:
+        """
+        Return the current snapshot (stale-while-revalidate)
+
+        Only the very first call waits for a build; afterwards a stale snapshot
+        is served immediately while a rebuild runs in the background.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await self.refresh()
+
+        if snapshot.age_seconds > self.refresh_interval:
+            self._ensure_refresh()
+        return snapshot
+
+    def is_stale(self, snapshot: VesselSnapshot) -> bool:
+        return snapshot.age_seconds > self.max_staleness
+
+    async def refresh(self) -> VesselSnapshot:
+        """Rebuild now, joining an in-flight rebuild if there is one"""
+        task = self._ensure_refresh()
+        # Shield so a cancelled request does not cancel a rebuild other callers share
+        return await asyncio.shield(task)
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._rebuild())
+        return self._refresh_task
+
+    async def _run_refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Vessel snapshot refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _rebuild(self) -> VesselSnapshot:
+        start = time.perf_counter()
+        try:
+            result = await self.builder(self.capacity)
+        except Exception as e:
+            self.stats["build_failures"] += 1
+            self.stats["last_error"] = str(e)
+            if self._snapshot is not None:
+                logger.warning(f"Vessel snapshot rebuild failed, keeping version {self._snapshot.version}: {e}")
+                return self._snapshot
+            raise
+
+        if isinstance(result, VesselSnapshot):
+            return self.adopt(result)
+
+        vessels = result.get("vessels", [])
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stats["last_build_ms"] = round(build_ms, 1)
+
+        # An empty rebuild means every upstream failed - keep serving the last good fleet
+        if not vessels and self._snapshot is not None and self._snapshot.vessels:
+            self.stats["build_failures"] += 1
+            self.stats["last_error"] = "rebuild returned no vessels"
+            logger.warning(f"Vessel snapshot rebuild returned no vessels, keeping version {self._snapshot.version}")
+            return self._snapshot
+
+        self._version += 1
+        real_count = len([v for v in vessels if "ais_stream" in v.get("id", "")])
+        snapshot = VesselSnapshot(
+            version=self._version,
+            vessels=tuple(vessels[:self.capacity]),
+            data_sources=tuple(result.get("data_sources", [])),
+            built_at=datetime.now(),
+            build_duration_ms=round(build_ms, 1),
+            real_data_percentage=min(100, real_count / len(vessels) * 100) if vessels else 0,
+            disruptions=tuple(result.get("disruptions", [])),
+        )
+        self.stats["builds"] += 1
+        self.stats["last_error"] = None
+        logger.info(f"✅ Vessel snapshot v{snapshot.version} published: {len(snapshot.vessels)} vessels in {build_ms:.0f}ms")
+        self._swap(snapshot)
+        return snapshot
+
+    def adopt(self, snapshot: VesselSnapshot) -> VesselSnapshot:
+        """
+        Publish a snapshot built elsewhere (another worker), keeping its version
+
+        Ignored unless it is newer than the current snapshot; returns whichever is current.
+        """
+        current = self._snapshot
+        if current is not None and snapshot.version <= current.version:
+            return current
+        self._version = max(self._version, snapshot.version)
+        self.stats["adopted"] += 1
+        logger.info(f"✅ Vessel snapshot v{snapshot.version} adopted: {len(snapshot.vessels)} vessels")
+        self._swap(snapshot)
+        return snapshot
+
+    def _swap(self, snapshot: VesselSnapshot):
+        # Single reference assignment - readers see either the old or the new snapshot
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.warning(f"Vessel snapshot listener failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot service status for diagnostics"""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "vessels": len(snapshot.vessels) if snapshot else 0,
+            "age_seconds": round(snapshot.age_seconds, 1) if snapshot else None,
+            "refresh_interval_seconds": self.refresh_interval,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done(),
+            **self.stats,
+        }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Versioned Vessel Store for TradeWatch
+Tracks per-vessel changes between fleet snapshots so clients can poll for deltas
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Iterable, FrozenSet
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class VesselChangeSet:
+    """Vessel ids touched by one store version"""
+    version: int
+    upserted: FrozenSet[str]
+    removed: FrozenSet[str]
+
+class VersionedVesselStore:
+    """
+    Vessel records keyed by id with a monotonic version and a bounded change log
+
+    Every update that changes at least one vessel bumps the version, or takes
+    the snapshot's own version when one is given - several workers applying
+    the same shared snapshots then agree on version numbers even if one of them
+    skipped a snapshot. Clients ask for changes since the version they last saw;
+    when this store never logged that version (compacted away, skipped, or from
+    another process) they get a full snapshot instead.
+    """
+
+    def __init__(self, max_versions: int = 240, max_logged_ids: int = 250000):
+        self.max_versions = max_versions
+        self.max_logged_ids = max_logged_ids
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._version = 0
+        self._log: deque = deque()
+        self._logged_ids = 0
+        # Oldest version a delta can still be computed from
+        self._base_version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, vessel_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(vessel_id)
+
+    def values(self) -> Iterable[Dict[str, Any]]:
+        return self._records.values()
+
+    def apply_snapshot(self, vessels: Iterable[Dict[str, Any]], version: Optional[int] = None) -> VesselChangeSet:
+        """Replace the store contents with a full fleet, logging upserts and removals under `version`"""
+        incoming: Dict[str, Dict[str, Any]] = {}
+        for vessel in vessels:
+            vessel_id = vessel.get("id")
+            if vessel_id is not None:
+                incoming[vessel_id] = vessel
+
+        upserted = []
+        for vessel_id, vessel in incoming.items():
+            current = self._records.get(vessel_id)
+            if current is None or current != vessel:
+                # Shallow copy so in-place mutation of upstream dicts cannot hide a change
+                self._records[vessel_id] = dict(vessel)
+                upserted.append(vessel_id)
+
+        removed = [vessel_id for vessel_id in self._records if vessel_id not in incoming]
+        for vessel_id in removed:
+            del self._records[vessel_id]
+
+        return self._record_change(upserted, removed, version)
+
+    def _record_change(self, upserted: List[str], removed: List[str],
+                       version: Optional[int] = None) -> VesselChangeSet:
+        if not upserted and not removed:
+            return VesselChangeSet(self._version, frozenset(), frozenset())
+
+        # Versions never go backwards, whatever the caller passes
+        self._version = max(version, self._version + 1) if version is not None else self._version + 1
+        change = VesselChangeSet(self._version, frozenset(upserted), frozenset(removed))
+        self._log.append(change)
+        self._logged_ids += len(upserted) + len(removed)
+        self._compact()
+
+        logger.info(f"Vessel store v{self._version}: {len(upserted)} upserted, {len(removed)} removed")
+        return change
+
+    def _compact(self):
+        while self._log and (len(self._log) > self.max_versions or self._logged_ids > self.max_logged_ids):
+            dropped = self._log.popleft()
+            self._logged_ids -= len(dropped.upserted) + len(dropped.removed)
+            self._base_version = dropped.version
+
+    def changes_since(self, since: int) -> Dict[str, Any]:
+        """
+        Vessels upserted or removed after version `since`
+
+        Falls back to a full snapshot unless `since` is a version this store
+        logged: it may predate the change log, be ahead of the store (e.g. the
+        client saw a previous server process), or be a version another worker
+        logged for a snapshot this one skipped.
+        """
+        if not self._is_logged(since):
+            return {
+                "version": self._version,
+                "full": True,
+                "upserts": list(self._records.values()),
+                "removed": [],
+            }
+
+        # Latest operation per id wins: upsert-then-remove is a removal and vice versa
+        touched: Dict[str, bool] = {}
+        for change in self._log:
+            if change.version <= since:
+                continue
+            for vessel_id in change.upserted:
+                touched[vessel_id] = True
+            for vessel_id in change.removed:
+                touched[vessel_id] = False
+
+        upserts = []
+        removed = []
+        for vessel_id, present in touched.items():
+            record = self._records.get(vessel_id) if present else None
+            if record is not None:
+                upserts.append(record)
+            else:
+                removed.append(vessel_id)
+
+        return {
+            "version": self._version,
+            "full": False,
+            "upserts": upserts,
+            "removed": removed,
+        }
+
+    def _is_logged(self, version: int) -> bool:
+        """True if the store was at exactly `version` at some point still covered by the log"""
+        return version == self._base_version or any(change.version == version for change in self._log)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "vessels": len(self._records),
+            "base_version": self._base_version,
+            "logged_versions": len(self._log),
+            "logged_ids": self._logged_ids,
+        }
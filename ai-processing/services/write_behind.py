@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Service for TradeWatch
+Bounded, id-merging record buffer flushed in batches by a dedicated writer thread
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Hashable, Iterable
+
+from utils.timing import record
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+if PROMETHEUS_AVAILABLE:
+    WRITE_BEHIND_PENDING = Gauge("tradewatch_write_behind_pending", "Records waiting for the writer thread", ["queue"])
+    WRITE_BEHIND_RECORDS = Counter("tradewatch_write_behind_records_total", "Records by outcome",
+                                   ["queue", "kind", "outcome"])
+    WRITE_BEHIND_BATCHES = Counter("tradewatch_write_behind_batches_total", "Batches handed to a writer",
+                                   ["queue", "kind", "outcome"])
+
+RecordKey = Callable[[Dict[str, Any]], Optional[Hashable]]
+
+def record_id(record: Dict[str, Any]) -> Optional[Hashable]:
+    return record.get("id")
+
+class WriteBehindQueue:
+    """
+    Accepts records from the event loop without blocking on storage
+
+    `submit()` only takes a lock and updates a dict: records are merged by key
+    (a newer record replaces a pending one with the same id) and the buffer holds
+    at most `max_pending` distinct records - beyond that new records are dropped
+    and counted, since the cache is best-effort and the event loop must never wait
+    on SQLite. The writer thread flushes once `batch_size` records are pending or
+    the oldest has waited `flush_interval` seconds, calling each kind's writer
+    with batches of at most `batch_size` records.
+    """
+
+    def __init__(self, name: str, max_pending: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        self.name = name
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._writers: Dict[str, Callable[[List[Dict[str, Any]]], Any]] = {}
+        self._keys: Dict[str, RecordKey] = {}
+        self._pending: Dict[str, "OrderedDict[Hashable, Dict[str, Any]]"] = {}
+        self._pending_count = 0
+        self._oldest_pending: Optional[float] = None
+        self._writing = 0
+        self._unkeyed = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._flush_requested = False
+        self.stats: Dict[str, Any] = {
+            "submitted": 0,
+            "merged": 0,
+            "dropped": 0,
+            "written": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "max_pending_seen": 0,
+            "last_flush_ms": 0.0,
+            "last_error": None,
+        }
+
+    def register(self, kind: str, writer: Callable[[List[Dict[str, Any]]], Any], key: RecordKey = record_id):
+        """Route records of `kind` to `writer` (called on the writer thread); `key` returning None disables merging"""
+        self._writers[kind] = writer
+        self._keys[kind] = key
+
+    @property
+    def pending(self) -> int:
+        return self._pending_count
+
+    @property
+    def saturated(self) -> bool:
+        """True while new records are being dropped"""
+        return self._pending_count >= self.max_pending
+
+    def submit(self, kind: str, records: Iterable[Dict[str, Any]]) -> int:
+        """Queue records for writing; returns how many were accepted (merged or added)"""
+        if kind not in self._writers:
+            raise ValueError(f"No writer registered for '{kind}'")
+        key_of = self._keys[kind]
+        submitted = merged = dropped = 0
+        with self._condition:
+            if self._closing:
+                raise RuntimeError(f"Write-behind queue '{self.name}' is closed")
+            pending = self._pending.setdefault(kind, OrderedDict())
+            for item in records:
+                submitted += 1
+                key = key_of(item)
+                if key is None:
+                    key = ("unkeyed", next(self._unkeyed))
+                elif key in pending:
+                    pending[key] = item
+                    merged += 1
+                    continue
+                if self._pending_count >= self.max_pending:
+                    dropped += 1
+                    continue
+                pending[key] = item
+                self._pending_count += 1
+
+            self.stats["submitted"] += submitted
+            self.stats["merged"] += merged
+            self.stats["dropped"] += dropped
+            self.stats["max_pending_seen"] = max(self.stats["max_pending_seen"], self._pending_count)
+            if self._oldest_pending is None and self._pending_count:
+                # Opens a flush window - an idle writer is waiting without a timeout
+                self._oldest_pending = time.monotonic()
+                self._condition.notify()
+            elif self._pending_count >= self.batch_size:
+                self._condition.notify()
+        self._ensure_writer()
+
+        if dropped:
+            logger.warning(f"⚠️ Write-behind queue '{self.name}' full - dropped {dropped} {kind} records")
+        if PROMETHEUS_AVAILABLE:
+            for outcome, count in (("merged", merged), ("dropped", dropped)):
+                if count:
+                    WRITE_BEHIND_RECORDS.labels(self.name, kind, outcome).inc(count)
+            WRITE_BEHIND_PENDING.labels(self.name).set(self._pending_count)
+        return submitted - dropped
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            with self._condition:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+                    self._thread.start()
+
+    def _flush_due(self) -> bool:
+        if self._pending_count == 0:
+            return False
+        if self._closing or self._flush_requested or self._pending_count >= self.batch_size:
+            return True
+        return time.monotonic() - self._oldest_pending >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._flush_due():
+                    if self._closing:
+                        return
+                    timeout = None
+                    if self._oldest_pending is not None:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest_pending))
+                    self._condition.wait(timeout)
+                batches, self._pending = self._pending, {}
+                self._writing = self._pending_count
+                self._pending_count = 0
+                self._oldest_pending = None
+                self._flush_requested = False
+            if PROMETHEUS_AVAILABLE:
+                WRITE_BEHIND_PENDING.labels(self.name).set(0)
+            self._write(batches)
+            with self._condition:
+                self._writing = 0
+                self._condition.notify_all()
+
+    def _write(self, batches: Dict[str, "OrderedDict[Hashable, Dict[str, Any]]"]):
+        start = time.perf_counter()
+        for kind, pending in batches.items():
+            records = list(pending.values())
+            for offset in range(0, len(records), self.batch_size):
+                batch = records[offset:offset + self.batch_size]
+                outcome = "written"
+                try:
+                    self._writers[kind](batch)
+                    self.stats["written"] += len(batch)
+                except Exception as e:
+                    outcome = "failed"
+                    self.stats["write_errors"] += 1
+                    self.stats["last_error"] = f"{kind}: {e}"
+                    logger.warning(f"Write-behind batch of {len(batch)} {kind} records failed: {e}")
+                self.stats["batches"] += 1
+                if PROMETHEUS_AVAILABLE:
+                    WRITE_BEHIND_BATCHES.labels(self.name, kind, outcome).inc()
+                    WRITE_BEHIND_RECORDS.labels(self.name, kind, outcome).inc(len(batch))
+        elapsed = time.perf_counter() - start
+        self.stats["last_flush_ms"] = round(elapsed * 1000, 1)
+        record(f"{self.name}_flush", elapsed)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything pending now and wait for it; False on timeout"""
+        self._ensure_writer()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._pending_count:
+                self._flush_requested = True
+                self._condition.notify_all()
+            while self._pending_count or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting records, drain what is pending and stop the writer thread"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Write-behind queue '{self.name}' still writing after {timeout}s, "
+                               f"{self._pending_count} records pending")
+
+    def get_stats(self) -> Dict[str, Any]:
+        oldest = self._oldest_pending
+        return {
+            "pending": self._pending_count,
+            "writing": self._writing,
+            "max_pending": self.max_pending,
+            "saturated": self.saturated,
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 2) if oldest is not None else None,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "avg_batch_size": round(self.stats["written"] / self.stats["batches"], 1) if self.stats["batches"] else None,
+            **self.stats,
+        }
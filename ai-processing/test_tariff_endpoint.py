@@ -17,11 +17,11 @@ async def test_tariff_endpoint():
     
     try:
         # Import the API function directly
-        from enhanced_real_data_api import get_real_tariffs_endpoint
+        from enhanced_real_data_api import fetch_tariff_payload
         
         # Call the endpoint function
-        print("📥 Calling get_real_tariffs_endpoint(limit=5)...")
-        result = await get_real_tariffs_endpoint(limit=5)
+        print("📥 Calling fetch_tariff_payload(limit=5)...")
+        result = await fetch_tariff_payload(limit=5)
         
         print(f"📊 Result type: {type(result)}")
         print(f"📊 Keys in result: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the TradeWatch AI Processing tests
+"""
+
+import os
+import sys
+
+import pytest
+
+# Tests import the services the same way the API does, from the ai-processing directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+@pytest.fixture
+def make_data_cache(tmp_path, monkeypatch):
+    """Factory for DataCache instances on throwaway database files"""
+    # Importing services.data_cache opens the global cache under ./data - keep it out of the repo
+    monkeypatch.chdir(tmp_path)
+    from services.data_cache import DataCache
+
+    caches = []
+
+    def make(**kwargs):
+        cache = DataCache(str(tmp_path / f"cache_{len(caches)}.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def make_vessel(i: int, **fields):
+    """A cached-vessel record like the AIS integrations produce"""
+    return {
+        "id": f"vessel_{i:05d}",
+        "mmsi": str(200000000 + i),
+        "name": f"Vessel {i}",
+        "latitude": -60 + (i * 7.3) % 130,
+        "longitude": -180 + (i * 13.7) % 360,
+        "speed": round((i * 1.9) % 22, 1),
+        "course": round((i * 37.1) % 360, 1),
+        "status": ("underway", "anchored", "moored")[i % 3],
+        "type": ("container", "bulk", "tanker")[i % 3],
+        "flag": ("PA", "LR", "MH", "SG")[i % 4],
+        "data_source": "Test",
+        **fields,
+    }
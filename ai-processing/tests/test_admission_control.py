@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import pytest
+
+from services.admission_control import (
+    AdmissionController, AdmissionMiddleware, AdmissionRejected, ConcurrencyLimiter,
+    PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL,
+)
+
+async def settle():
+    """Let queued acquire() calls reach their wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    async def run():
+        limiter = ConcurrencyLimiter("ml", max_concurrent=1, max_queue=10, max_wait_seconds=5)
+        held = await limiter.acquire()
+        order = []
+
+        async def request(label, priority):
+            admitted_at = await limiter.acquire(priority)
+            order.append(label)
+            limiter.release(admitted_at)
+
+        tasks = [
+            asyncio.create_task(request("low", PRIORITY_LOW)),
+            asyncio.create_task(request("normal-1", PRIORITY_NORMAL)),
+            asyncio.create_task(request("high", PRIORITY_HIGH)),
+            asyncio.create_task(request("normal-2", PRIORITY_NORMAL)),
+        ]
+        await settle()
+        limiter.release(held)
+        await asyncio.gather(*tasks)
+        return order, limiter
+
+    order, limiter = asyncio.run(run())
+    assert order == ["high", "normal-1", "normal-2", "low"]
+    assert limiter.in_flight == 0 and limiter.queue_depth == 0
+
+def test_full_queue_sheds_newcomer_or_preempts_lower_priority():
+    async def run():
+        limiter = ConcurrencyLimiter("ml", max_concurrent=1, max_queue=1, max_wait_seconds=5)
+        held = await limiter.acquire()
+        normal = asyncio.create_task(limiter.acquire(PRIORITY_NORMAL))
+        await settle()
+
+        with pytest.raises(AdmissionRejected) as same_priority:
+            await limiter.acquire(PRIORITY_NORMAL)
+
+        high = asyncio.create_task(limiter.acquire(PRIORITY_HIGH))
+        await settle()
+        with pytest.raises(AdmissionRejected) as preempted:
+            await normal
+
+        limiter.release(held)
+        limiter.release(await high)
+        return same_priority.value, preempted.value, limiter
+
+    same_priority, preempted, limiter = asyncio.run(run())
+    assert same_priority.reason == "queue_full"
+    assert preempted.reason == "preempted"
+    assert limiter.stats["shed"] == {"queue_full": 1, "preempted": 1, "timeout": 0}
+    assert limiter.in_flight == 0
+
+def test_waiting_past_max_wait_sheds():
+    async def run():
+        limiter = ConcurrencyLimiter("ml", max_concurrent=1, max_queue=4, max_wait_seconds=0.05)
+        held = await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        limiter.release(held)
+        return rejected.value, limiter
+
+    rejected, limiter = asyncio.run(run())
+    assert rejected.reason == "timeout"
+    assert 1 <= rejected.retry_after <= 30
+    assert limiter.in_flight == 0 and limiter.queue_depth == 0
+
+def test_cancelled_waiter_gives_back_a_handed_over_slot():
+    async def run():
+        limiter = ConcurrencyLimiter("ml", max_concurrent=1, max_queue=4, max_wait_seconds=5)
+        held = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+
+        # The slot goes to the waiter, whose client disconnects before it resumes
+        limiter.release(held)
+        assert limiter.in_flight == 1
+        waiter.cancel()
+        try:
+            # Before 3.12, wait_for returns a result that lands together with the cancel
+            limiter.release(await waiter)
+        except asyncio.CancelledError:
+            pass
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+async def call(middleware, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({"type": "http", "path": path}, receive, send)
+    return messages
+
+def test_middleware_sheds_with_503_and_retry_after():
+    async def run():
+        gate = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await gate.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        controller = AdmissionController()
+        controller.add_limit("ml", max_concurrent=1, max_queue=0, max_wait_seconds=5)
+        controller.route("/api/ml-predictions/", "ml")
+        middleware = AdmissionMiddleware(app, controller)
+
+        admitted = asyncio.create_task(call(middleware, "/api/ml-predictions/bdi"))
+        await settle()
+        shed = await call(middleware, "/api/ml-predictions/bdi")
+        gate.set()
+        unlimited = await call(middleware, "/api/health")
+        return await admitted, shed, unlimited, controller
+
+    admitted, shed, unlimited, controller = asyncio.run(run())
+    assert admitted[0]["status"] == 200
+    assert unlimited[0]["status"] == 200
+
+    start, body = shed
+    headers = dict(start["headers"])
+    assert start["status"] == 503
+    assert int(headers[b"retry-after"]) >= 1
+    assert json.loads(body["body"])["reason"] == "queue_full"
+    assert controller.limiters["ml"].in_flight == 0
@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from conftest import make_vessel
+
+@pytest.fixture
+def make_async_cache(make_data_cache):
+    from services.data_cache import AsyncDataCache
+
+    caches = []
+
+    def make(**kwargs):
+        cache = AsyncDataCache(make_data_cache(), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def stored_ids(cache):
+    with sqlite3.connect(cache.sync.db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM vessels")}
+
+def test_reads_run_on_reader_threads_with_query_only_connections(make_async_cache):
+    cache = make_async_cache(reader_threads=2)
+    cache.sync.cache_vessels([make_vessel(i) for i in range(5)])
+    seen = []
+    load = cache.sync._load
+
+    def spy(conn, *args):
+        seen.append((threading.current_thread().name, conn))
+        return load(conn, *args)
+
+    cache.sync._load = spy
+
+    async def main():
+        return await asyncio.gather(*(cache.get_cached_vessels(limit) for limit in range(1, 7)))
+
+    results = asyncio.run(main())
+
+    assert [len(vessels) for vessels in results] == [1, 2, 3, 4, 5, 5]
+    assert all(name.startswith("data-cache-read") for name, _ in seen)
+    # One connection per reader thread, reused across reads
+    connections = {id(conn): conn for _, conn in seen}
+    assert len(connections) <= 2
+    for conn in connections.values():
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM vessels")
+
+def test_write_blocking_runs_on_the_writer_thread(make_async_cache):
+    cache = make_async_cache()
+    threads = []
+
+    def write(records):
+        threads.append(threading.current_thread().name)
+        return cache.sync.cache_vessels(records)
+
+    results = []
+    caller = threading.Thread(target=lambda: results.append(cache.write_blocking(write, [make_vessel(0)])))
+    caller.start()
+    caller.join(5)
+
+    assert results == [1]
+    assert threads == ["data-cache-write_0"]
+    assert asyncio.run(cache.get_cached_vessels(10))[0]["id"] == "vessel_00000"
+
+def test_memory_tier_hits_skip_the_reader_threads(make_async_cache):
+    cache = make_async_cache()
+    cache.sync.cache_vessels([make_vessel(i) for i in range(3)])
+
+    async def main():
+        first = await cache.get_cached_vessels(10)
+
+        async def no_thread_hop(*args):
+            raise AssertionError("memory-tier hit went to a reader thread")
+
+        cache._read = no_thread_hop
+        second = await cache.get_cached_vessels(10)
+        # Callers get their own copies of the cached records
+        second[0]["speed"] = -1
+        return first, second, await cache.get_cached_vessels(10)
+
+    first, second, third = asyncio.run(main())
+
+    assert [vessel["id"] for vessel in second] == [vessel["id"] for vessel in first]
+    assert third[0]["speed"] == first[0]["speed"]
+
+def test_close_drains_queued_writes(make_async_cache):
+    cache = make_async_cache()
+    release = threading.Event()
+    # Hold the writer thread so the batches below are still queued when close() starts
+    blocker = threading.Thread(target=cache.write_blocking, args=(lambda records: release.wait(5), []))
+    blocker.start()
+
+    async def main():
+        writes = [asyncio.ensure_future(cache.cache_vessels([make_vessel(i)])) for i in range(10)]
+        await asyncio.sleep(0)
+        threading.Timer(0.1, release.set).start()
+        cache.close()
+        return await asyncio.gather(*writes)
+
+    assert asyncio.run(main()) == [1] * 10
+    blocker.join(5)
+    assert stored_ids(cache) == {f"vessel_{i:05d}" for i in range(10)}
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+from services import bdi_quote_service as bdi
+from services.bdi_quote_service import BDIQuoteService
+
+class FakeDatetime(datetime):
+    current = datetime(2026, 3, 2, 9, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+def test_first_quote_has_no_made_up_change(monkeypatch):
+    monkeypatch.setattr(bdi, "datetime", FakeDatetime)
+    service = BDIQuoteService()
+
+    quote = service._record(2100, "Test")
+
+    assert quote.change_percent is None
+    assert service.trend() == {"change_percent": 0.0, "direction": "stable", "points": 1}
+
+def test_history_keeps_one_point_per_day(monkeypatch):
+    monkeypatch.setattr(bdi, "datetime", FakeDatetime)
+    service = BDIQuoteService()
+    day = datetime(2026, 3, 2, 9, 0)
+
+    for offset, values in enumerate([(2000, 2010), (2100, 2080, 2200)]):
+        for i, value in enumerate(values):
+            FakeDatetime.current = day + timedelta(days=offset, minutes=15 * i)
+            service._record(value, "Test")
+
+    assert [quote.value for quote in service.history] == [2010, 2200]
+    # Against yesterday's last print, not the previous intraday refresh
+    assert service.latest().change_percent == round((2200 - 2010) / 2010 * 100, 2)
+    assert service.trend()["points"] == 2
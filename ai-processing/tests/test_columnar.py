@@ -0,0 +1,54 @@
+from conftest import make_vessel
+from utils.columnar import to_columnar
+
+def from_columnar(encoded):
+    """Rebuild the records the way the map client reads a columnar payload"""
+    values = {}
+    for field, column in encoded["columns"].items():
+        if field in encoded["dictionaries"]:
+            column = [encoded["dictionaries"][field][index] for index in column]
+        if field in encoded["prefixes"]:
+            prefix = encoded["prefixes"][field]
+            column = [prefix + value if value is not None else None for value in column]
+        values[field] = column
+    for field, original in encoded["aliases"].items():
+        values[field] = values[original]
+    for field, (first, second) in encoded["pairs"].items():
+        values[field] = [[a, b] for a, b in zip(values[first], values[second])]
+    for field in encoded["null_fields"]:
+        values[field] = [None] * encoded["count"]
+    return [
+        {field: values[field][i] for field in encoded["fields"]}
+        for i in range(encoded["count"])
+    ]
+
+def assert_same_records(decoded, records):
+    assert len(decoded) == len(records)
+    for got, expected in zip(decoded, records):
+        for field, value in expected.items():
+            assert got[field] == value and type(got[field]) is type(value), field
+
+def test_round_trip():
+    records = [make_vessel(i) for i in range(40)]
+    for record in records:
+        record["coordinates"] = [record["latitude"], record["longitude"]]
+    encoded = to_columnar(records)
+
+    assert encoded["pairs"] == {"coordinates": ["latitude", "longitude"]}
+    assert "id" in encoded["prefixes"]
+    assert_same_records(from_columnar(encoded), records)
+
+def test_mixed_bool_int_float_columns_stay_apart():
+    records = [{"dwt": 0, "impacted": False, "speed": 1.0, "course": 1, "position": [1, 0.0]}]
+    encoded = to_columnar(records)
+
+    assert encoded["aliases"] == {}
+    assert encoded["pairs"] == {}
+    assert_same_records(from_columnar(encoded), records)
+
+def test_equal_columns_of_the_same_type_are_aliased():
+    records = [{"latitude": 1.5 * i, "lat": 1.5 * i, "flag": True, "active": True} for i in range(5)]
+    encoded = to_columnar(records)
+
+    assert encoded["aliases"] == {"lat": "latitude", "active": "flag"}
+    assert_same_records(from_columnar(encoded), records)
@@ -0,0 +1,87 @@
+import json
+import random
+import sqlite3
+
+from conftest import make_vessel
+
+HOUR_MS = 3600 * 1000
+
+def backdate(cache, ids, hours):
+    with sqlite3.connect(cache.db_path) as conn:
+        conn.executemany("UPDATE vessels SET updated_ms = updated_ms - ? WHERE id = ?",
+                         [(int(hours * HOUR_MS), vessel_id) for vessel_id in ids])
+
+def bulky_vessel(i):
+    # Incompressible payload, so the rows really take up pages after zstd
+    return make_vessel(i, notes=random.Random(i).randbytes(1500).hex())
+
+def stored_ids(cache):
+    with sqlite3.connect(cache.db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM vessels")}
+
+def test_rows_past_retention_are_evicted_in_chunks(make_data_cache):
+    cache = make_data_cache(retention_hours={"vessels": 6})
+    vessels = [make_vessel(i) for i in range(25)]
+    cache.cache_vessels(vessels)
+    expired = [vessel["id"] for vessel in vessels[:20]]
+    backdate(cache, expired, hours=7)
+    assert len(cache.get_cached_vessels(100, max_age_hours=24)) == 25
+
+    assert cache.evict_expired(chunk_size=3) == 20
+
+    assert stored_ids(cache) == {vessel["id"] for vessel in vessels[20:]}
+    # The deletes invalidated the memory tier
+    assert len(cache.get_cached_vessels(100, max_age_hours=24)) == 5
+
+def test_size_bound_evicts_oldest_and_vacuum_releases_pages(make_data_cache):
+    max_bytes = 256 * 1024
+    cache = make_data_cache(max_bytes=max_bytes)
+    for batch in range(8):
+        cache.cache_vessels([bulky_vessel(i) for i in range(batch * 50, (batch + 1) * 50)])
+        backdate(cache, [f"vessel_{i:05d}" for i in range(batch * 50)], hours=0.01)
+
+    assert cache.enforce_max_size(chunk_size=10) > 0
+    page_size, page_count, free_pages = cache._page_counts()
+    assert (page_count - free_pages) * page_size <= max_bytes
+    assert free_pages > 0 and cache.incremental_vacuum() > 0
+    assert cache._page_counts()[1] * page_size <= max_bytes
+    remaining = stored_ids(cache)
+    # The newest batch survives; the oldest rows went first
+    assert {f"vessel_{i:05d}" for i in range(350, 400)} <= remaining
+    assert "vessel_00000" not in remaining
+
+def test_baseline_schema_is_migrated_to_epoch_ms(tmp_path, make_data_cache):
+    # Schema and rows as written before updated_ms existed: CURRENT_TIMESTAMP text, a text-timestamp
+    # index, JSON text payloads and no auto_vacuum
+    with sqlite3.connect(tmp_path / "cache_0.db") as conn:
+        conn.executescript("""
+            CREATE TABLE vessels (
+                id TEXT PRIMARY KEY, mmsi TEXT, name TEXT, latitude REAL, longitude REAL,
+                speed REAL, course REAL, status TEXT, vessel_type TEXT, flag TEXT,
+                data_source TEXT, raw_data TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX idx_vessels_updated ON vessels(updated_at);
+        """)
+        for i, updated_at in ((0, "datetime('now')"), (1, "datetime('now', '-30 hours')")):
+            vessel = make_vessel(i)
+            conn.execute(f"""
+                INSERT INTO vessels (id, mmsi, name, raw_data, updated_at)
+                VALUES (?, ?, ?, ?, {updated_at})
+            """, (vessel["id"], vessel["mmsi"], vessel["name"], json.dumps(vessel)))
+    conn.close()
+
+    cache = make_data_cache(retention_hours={"vessels": 24})
+
+    with sqlite3.connect(cache.db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(vessels)")}
+        assert "idx_vessels_updated" not in indexes and "idx_vessels_updated_ms" in indexes
+        assert conn.execute("SELECT COUNT(*) FROM vessels WHERE updated_ms = 0").fetchone()[0] == 0
+    # The backfilled fresh row is read back through the codec; the 30-hour-old one is not
+    assert [vessel["id"] for vessel in cache.get_cached_vessels(100, max_age_hours=1)] == ["vessel_00000"]
+    assert len(cache.get_cached_vessels(100, max_age_hours=48)) == 2
+
+    assert cache.evict_expired() == 1
+    assert stored_ids(cache) == {"vessel_00000"}
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from utils.deadlines import gather_with_deadlines
+
+async def finish(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+async def fail():
+    raise RuntimeError("upstream down")
+
+def test_sections_keep_their_own_outcomes():
+    async def run():
+        return await gather_with_deadlines(
+            {"fast": finish("ok"), "slow": finish("late", delay=5), "broken": fail()},
+            {"fast": 1.0, "slow": 0.05, "broken": 1.0},
+        )
+
+    start = time.perf_counter()
+    outcomes = asyncio.run(run())
+
+    # The slow section is cut at its deadline and holds nobody back
+    assert time.perf_counter() - start < 1.0
+    assert outcomes["fast"].ok and outcomes["fast"].value == "ok"
+    assert outcomes["slow"].status == "timeout" and outcomes["slow"].value is None
+    assert outcomes["broken"].status == "error" and outcomes["broken"].error == "upstream down"
+
+def test_shared_deadline_and_timing_report():
+    outcomes = asyncio.run(gather_with_deadlines({"a": finish(1), "b": finish(2, delay=5)}, 0.05))
+
+    assert outcomes["a"].value == 1
+    timing = outcomes["b"].timing()
+    assert timing["status"] == "timeout" and timing["deadline_ms"] == 50.0
+    assert timing["elapsed_ms"] >= 45.0 and "deadline" in timing["error"]
+    assert "error" not in outcomes["a"].timing()
+
+def test_predictor_sections_overlap_and_time_out(monkeypatch):
+    from services import ml_prediction_service as ml
+
+    def slow_delays(vessels):
+        time.sleep(0.5)
+        return [{"vessel_id": vessel["id"]} for vessel in vessels]
+
+    def forecasts(historical_data):
+        time.sleep(0.1)
+        return [{"region": "Red Sea"}]
+
+    monkeypatch.setattr(ml.ml_predictor, "predict_vessel_delays", slow_delays)
+    monkeypatch.setattr(ml.ml_predictor, "forecast_disruptions", forecasts)
+
+    async def run():
+        return await gather_with_deadlines({
+            "vessels": ml.get_vessel_predictions([{"id": "v1"}]),
+            "disruptions": ml.get_disruption_forecasts([]),
+            "economic": ml.get_economic_predictions({"current_bdi": 1900}),
+        }, {"vessels": 0.2, "disruptions": 1.0, "economic": 1.0})
+
+    outcomes = asyncio.run(run())
+
+    # The blocking predictor no longer holds up the event loop or the other sections
+    assert outcomes["vessels"].status == "timeout"
+    assert outcomes["disruptions"].ok and outcomes["economic"].ok
+    assert outcomes["vessels"].elapsed_ms < 400 and outcomes["disruptions"].elapsed_ms < 400
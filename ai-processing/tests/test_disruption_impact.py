@@ -0,0 +1,74 @@
+import math
+import random
+
+import numpy as np
+
+from enhanced_real_data_api import is_vessel_impacted_by_disruptions
+from services.disruption_impact import EARTH_RADIUS_KM, compute_disruption_impacts
+
+# Every spelling the scalar check accepts; None stands for a record without a severity
+SEVERITIES = ["low", "medium", "high", "critical", "High", "CRITICAL", "Medium", None]
+
+def make_disruption(i, lat, lon, severity, status="active"):
+    disruption = {
+        "id": f"disruption_{i:04d}",
+        "title": f"Disruption {i}",
+        "status": status,
+        "coordinates": [lat, lon],
+    }
+    if severity is not None:
+        disruption["severity"] = severity
+    return disruption
+
+def assert_matches_scalar(lats, lons, disruptions, impact_radius_km=500):
+    result = compute_disruption_impacts(lats, lons, disruptions, impact_radius_km=impact_radius_km)
+    expected = [is_vessel_impacted_by_disruptions(lat, lon, disruptions, impact_radius_km=impact_radius_km)
+                for lat, lon in zip(lats, lons)]
+    mismatches = [i for i, flag in enumerate(expected) if bool(result.impacted[i]) != flag]
+    assert not mismatches, [(lats[i], lons[i], expected[i]) for i in mismatches[:5]]
+    return result, expected
+
+def test_random_fleet_matches_scalar_check():
+    rng = random.Random(2024)
+    disruptions = [
+        make_disruption(i, rng.uniform(-60, 70), rng.uniform(-180, 180), rng.choice(SEVERITIES),
+                        status=rng.choice(["active", "active", "active", "resolved"]))
+        for i in range(60)
+    ]
+    lats = [rng.uniform(-70, 75) for _ in range(3000)]
+    lons = [rng.uniform(-180, 180) for _ in range(3000)]
+
+    result, expected = assert_matches_scalar(lats, lons, disruptions)
+
+    # Both outcomes occur, so the comparison is not trivially all-False
+    assert 0 < sum(expected) < len(expected)
+    assert np.all(np.isfinite(result.nearest_distance_km))
+
+def test_vessels_right_at_the_radius_match_scalar_check():
+    rng = random.Random(7)
+    disruptions, lats, lons = [], [], []
+    multipliers = {"high": 1.5, "critical": 2.0}
+    for i, severity in enumerate(SEVERITIES):
+        # Spread out so each disruption's ring is clear of the others
+        lat, lon = -40 + 10 * i, -150 + 40 * i
+        disruptions.append(make_disruption(i, lat, lon, severity))
+        radius_km = 500 * multipliers.get((severity or "medium").lower(), 1.0)
+        for _ in range(40):
+            # Along the meridian the haversine distance is exactly dlat * R, so these land on the
+            # radius up to rounding, on either side of it
+            offset = math.degrees(radius_km / EARTH_RADIUS_KM) * (1 + rng.choice([-1, 0, 1]) * rng.random() * 1e-12)
+            lats.append(lat + rng.choice([-1, 1]) * offset)
+            lons.append(lon)
+        for sign in (-1, 1):
+            # And along the equator-parallel direction through the disruption, from the scalar formula itself
+            lats.append(lat)
+            lons.append(lon + sign * _lon_offset_at_radius(lat, radius_km))
+
+    _, expected = assert_matches_scalar(lats, lons, disruptions)
+
+    assert 0 < sum(expected) < len(expected)
+
+def _lon_offset_at_radius(lat, radius_km):
+    """Longitude offset (degrees) at which the scalar distance along a parallel equals radius_km"""
+    a = math.sin(radius_km / (2 * EARTH_RADIUS_KM))**2
+    return math.degrees(2 * math.asin(math.sqrt(a) / math.cos(math.radians(lat))))
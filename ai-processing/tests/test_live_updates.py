@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+from services.live_updates import LiveSubscriber
+
+def test_error_replies_go_through_the_sender():
+    async def run():
+        sent = []
+        writers = set()
+
+        async def send(frame):
+            writers.add(asyncio.current_task())
+            sent.append(json.loads(frame))
+            await asyncio.sleep(0)
+
+        subscriber = LiveSubscriber(send)
+        sender = asyncio.create_task(subscriber.run_sender())
+        subscriber.reset_with('{"type":"snapshot","version":1}')
+        for _ in range(3):
+            subscriber.enqueue({"type": "error", "detail": "bad bbox"})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        sender.cancel()
+        return sent, writers, sender
+
+    sent, writers, sender = asyncio.run(run())
+    assert writers == {sender}
+    assert [frame["type"] for frame in sent] == ["error", "error", "error", "snapshot"]
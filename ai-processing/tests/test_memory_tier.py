@@ -0,0 +1,59 @@
+from conftest import make_vessel
+from services.memory_tier import MemoryTier
+
+def test_invalidate_drops_only_that_table():
+    tier = MemoryTier()
+    for table in ("vessels", "tariffs"):
+        tier.put((table, "records", 10), [table], 10, tier.generation(table))
+
+    tier.invalidate("vessels")
+
+    assert tier.get(("vessels", "records", 10)) is None
+    assert tier.get(("tariffs", "records", 10)) == ["tariffs"]
+    assert tier.get_stats()["bytes"] == 10
+
+def test_read_started_before_invalidation_is_not_stored():
+    tier = MemoryTier()
+    generation = tier.generation("vessels")
+    tier.invalidate("vessels")  # a write lands while the read is in flight
+    tier.put(("vessels", "records", 10), ["stale"], 10, generation)
+
+    assert tier.get(("vessels", "records", 10)) is None
+
+def test_expiry_and_byte_budget():
+    tier = MemoryTier(max_bytes=100)
+    tier.put(("vessels", "records", 1), "expired", 10, 0, expires_at=0)
+    assert tier.get(("vessels", "records", 1)) is None
+
+    for i in range(3):
+        tier.put(("vessels", "records", i), i, 40, 0)
+    tier.get(("vessels", "records", 1))  # most recently used survives
+    tier.put(("vessels", "records", 3), 3, 40, 0)
+
+    assert tier.get(("vessels", "records", 0)) is None
+    assert tier.get(("vessels", "records", 2)) is None
+    assert tier.get(("vessels", "records", 1)) == 1
+    assert tier.get_stats()["bytes"] <= 100
+
+    tier.put(("vessels", "records", 9), "huge", 101, 0)
+    assert tier.get(("vessels", "records", 9)) is None
+    assert tier.stats["oversized"] == 1
+
+def test_data_cache_write_invalidates_reads(make_data_cache):
+    cache = make_data_cache()
+    cache.cache_vessels([make_vessel(i) for i in range(3)])
+    assert len(cache.get_cached_vessels(10)) == 3
+    assert len(cache.get_cached_vessels(10)) == 3
+    assert cache.memory.stats["hits"] == 1
+
+    cache.cache_vessels([make_vessel(3)])
+
+    assert len(cache.get_cached_vessels(10)) == 4
+    assert cache.memory.stats["invalidations"] == 2
+
+def test_data_cache_hits_are_copies(make_data_cache):
+    cache = make_data_cache()
+    cache.cache_vessels([make_vessel(0)])
+    cache.get_cached_vessels(10)[0]["impacted"] = True
+
+    assert "impacted" not in cache.get_cached_vessels(10)[0]
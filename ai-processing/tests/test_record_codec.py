@@ -0,0 +1,65 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import make_vessel
+from services.record_codec import RecordCodec, ZSTD_AVAILABLE, ZSTD_MAGIC
+
+TRAIN_SAMPLES = 300
+
+def payloads(count, start=0):
+    return [json.dumps(make_vessel(i), separators=(",", ":")).encode() for i in range(start, start + count)]
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def codec(conn):
+    codec = RecordCodec(dict_size=4096, train_samples=TRAIN_SAMPLES)
+    codec.load(conn)
+    return codec
+
+def test_round_trip_before_dictionary(codec, conn):
+    original = payloads(10)
+    stored = codec.compress("vessels", original, conn)
+    assert [codec.to_json(value, conn) for value in stored] == original
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard is not installed")
+def test_round_trip_with_trained_dictionary(codec, conn):
+    codec.compress("vessels", payloads(TRAIN_SAMPLES), conn)
+    original = payloads(50, start=TRAIN_SAMPLES)
+    stored = codec.compress("vessels", original, conn)
+
+    assert all(value[:4] == ZSTD_MAGIC for value in stored)
+    assert conn.execute("SELECT COUNT(*) FROM raw_data_dictionaries").fetchone()[0] == 1
+    assert [codec.to_json(value, conn) for value in stored] == original
+    # The dictionary pays for itself on records this small
+    assert sum(map(len, stored)) < sum(map(len, original)) / 2
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard is not installed")
+def test_other_process_reads_with_stored_dictionary(codec, conn):
+    codec.compress("vessels", payloads(TRAIN_SAMPLES), conn)
+    stored = codec.compress("vessels", payloads(5, start=TRAIN_SAMPLES), conn)
+
+    # A fresh codec has no dictionaries in memory and loads them from the table on demand
+    reader = RecordCodec()
+    assert [reader.to_json(value, conn) for value in stored] == payloads(5, start=TRAIN_SAMPLES)
+
+def test_legacy_text_and_plain_json_pass_through(codec, conn):
+    record = payloads(1)[0]
+    assert codec.to_json(record.decode(), conn) == record
+    assert codec.to_json(record, conn) == record
+
+def test_data_cache_round_trip(make_data_cache):
+    cache = make_data_cache()
+    vessels = [make_vessel(i) for i in range(20)]
+    assert cache.cache_vessels(vessels) == 20
+
+    by_id = {vessel["id"]: vessel for vessel in cache.get_cached_vessels(50)}
+    assert by_id == {vessel["id"]: vessel for vessel in vessels}
+    # The pass-through reader splices the stored JSON into the same array
+    assert json.loads(cache.get_cached_vessels_json(50).body) == cache.get_cached_vessels(50)
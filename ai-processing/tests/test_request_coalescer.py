@@ -0,0 +1,55 @@
+import asyncio
+
+from services.request_coalescer import SingleFlight
+
+def test_concurrent_calls_share_one_fetch():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.run("fetch", "key", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_results_are_capped_and_expired_ones_dropped():
+    async def run():
+        flight = SingleFlight(max_results=3)
+        for key in range(5):
+            await flight.run("fetch", key, lambda key=key: asyncio.sleep(0, key), ttl_seconds=60)
+        kept = [key for _, key in flight._results]
+
+        await flight.run("short", "a", lambda: asyncio.sleep(0, "a"), ttl_seconds=0.01)
+        await asyncio.sleep(0.02)
+        await flight.run("fetch", 9, lambda: asyncio.sleep(0, 9), ttl_seconds=60)
+        return kept, list(flight._results)
+
+    kept, remaining = asyncio.run(run())
+    # Oldest results make room for new ones
+    assert kept == [2, 3, 4]
+    # The expired result made room on the next insert, so no live result was evicted for it
+    assert remaining == [("fetch", 3), ("fetch", 4), ("fetch", 9)]
+
+def test_cache_if_skips_rejected_results():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return [] if len(calls) == 1 else ["disruption"]
+
+    async def run():
+        flight = SingleFlight()
+        results = []
+        for _ in range(3):
+            results.append(await flight.run("fetch", "key", fetch, ttl_seconds=60, cache_if=bool))
+        return results
+
+    # The empty result is returned but not reused; the next call fetches again and is cached
+    assert asyncio.run(run()) == [[], ["disruption"], ["disruption"]]
+    assert len(calls) == 2
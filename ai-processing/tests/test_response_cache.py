@@ -0,0 +1,57 @@
+import asyncio
+import gzip
+import threading
+
+import pytest
+from starlette.requests import Request
+
+from services import response_cache as rc
+from services.response_cache import EncodedResponse, ResponseCache, cached_response
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+def large_response():
+    return EncodedResponse.from_bytes(b'{"vessels":[' + b'{"id":"vessel_00001"},' * 20000 + b'{}]}')
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", "identity"),
+    ("gzip;q=0.0", "identity"),
+    ("gzip; q=0.000", "identity"),
+    ("gzip;q=0.001", "gzip"),
+    ("deflate, gzip;Q=0", "identity"),
+])
+def test_zero_q_value_refuses_an_encoding(monkeypatch, header, expected):
+    monkeypatch.setattr(rc, "BROTLI_AVAILABLE", False)
+    assert rc._choose_encoding(make_request(accept_encoding=header), large_response()) == expected
+
+def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    threads = []
+    compress = EncodedResponse._compress
+
+    def tracking_compress(self, encoding):
+        threads.append(threading.current_thread())
+        return compress(self, encoding)
+
+    monkeypatch.setattr(rc, "BROTLI_AVAILABLE", False)
+    monkeypatch.setattr(EncodedResponse, "_compress", tracking_compress)
+    cache = ResponseCache()
+    encoded = cache.put_bytes("vessels", large_response().body)
+
+    async def run():
+        request = make_request(accept_encoding="gzip")
+        return await asyncio.gather(*(cached_response(request, encoded) for _ in range(3)))
+
+    responses = asyncio.run(run())
+
+    # Three concurrent first requests share one threaded compression
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    assert all(response.headers["content-encoding"] == "gzip" for response in responses)
+    assert gzip.decompress(responses[0].body) == encoded.body
+    assert cache.get_stats()["bytes"] == len(encoded.body) + len(responses[0].body)
@@ -0,0 +1,31 @@
+import asyncio
+
+from services.service_container import ServiceContainer
+
+def test_failed_component_recovers_when_marked_ready():
+    async def slow_snapshot():
+        await asyncio.wait_for(asyncio.sleep(1), 0.01)
+
+    async def run():
+        container = ServiceContainer()
+        container.register("vessel_snapshot", slow_snapshot)
+        await container.warm_up()
+        failed = container.get_status()["components"]["vessel_snapshot"]
+
+        container.mark_ready("vessel_snapshot", "snapshot service")
+        return failed, container.get_status()["components"]["vessel_snapshot"], await container.get("vessel_snapshot")
+
+    failed, recovered, instance = asyncio.run(run())
+    assert failed["status"] == "failed" and "TimeoutError" in failed["error"]
+    assert recovered["status"] == "ready" and "error" not in recovered
+    assert instance == "snapshot service"
+
+def test_mark_ready_leaves_built_components_alone():
+    async def run():
+        container = ServiceContainer()
+        container.register("bdi_quotes", lambda: "built")
+        await container.warm_up()
+        container.mark_ready("bdi_quotes", "other")
+        return await container.get("bdi_quotes")
+
+    assert asyncio.run(run()) == "built"
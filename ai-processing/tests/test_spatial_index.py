@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import make_vessel
+from services.spatial_index import (
+    VesselGridIndex, InvalidCursorError, query_fingerprint, encode_cursor, decode_cursor
+)
+from utils.geo import BoundingBox
+
+BBOX = BoundingBox(west=-120, south=-40, east=60, north=50)
+
+def page_through(index, page_size, **filters):
+    pages, after_id = [], None
+    while True:
+        vessels, after_id = index.query(after_id=after_id, limit=page_size, **filters)
+        pages.append([vessel["id"] for vessel in vessels])
+        if after_id is None:
+            return pages
+
+@pytest.fixture
+def vessels():
+    return [make_vessel(i) for i in range(500)]
+
+@pytest.mark.parametrize("page_size", [1, 7, 50, 1000])
+def test_pages_cover_every_match_once_in_id_order(vessels, page_size):
+    index = VesselGridIndex(vessels, resolution=5.0)
+    expected = sorted(
+        vessel["id"] for vessel in vessels
+        if BBOX.contains(vessel["latitude"], vessel["longitude"]) and vessel["type"] == "bulk"
+    )
+
+    pages = page_through(index, page_size, bbox=BBOX, types=frozenset({"bulk"}))
+
+    assert [vessel_id for page in pages for vessel_id in page] == expected
+    assert all(len(page) == page_size for page in pages[:-1])
+
+def test_cursor_survives_a_newer_snapshot(vessels):
+    first, after_id = VesselGridIndex(vessels).query(limit=100)
+    # The next snapshot drops an already-served vessel and adds one on each side of the cursor
+    changed = vessels[1:] + [make_vessel(0, id="vessel_00000a"), make_vessel(999, id="vessel_99999")]
+
+    rest, _ = VesselGridIndex(changed, version=1).query(after_id=after_id, limit=1000)
+
+    assert rest[0]["id"] > after_id
+    assert {vessel["id"] for vessel in first}.isdisjoint(vessel["id"] for vessel in rest)
+    assert rest[-1]["id"] == "vessel_99999"
+
+def test_cursor_is_bound_to_its_filters():
+    fingerprint = query_fingerprint(BBOX, frozenset({"bulk"}), None)
+    cursor = encode_cursor("vessel_00042", fingerprint)
+
+    assert decode_cursor(cursor, fingerprint) == "vessel_00042"
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, query_fingerprint(BBOX, None, None))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor!", fingerprint)
+
+def test_first_record_wins_across_id_types():
+    index = VesselGridIndex([make_vessel(1, id=7, name="first"), make_vessel(2, id="7", name="second")])
+
+    assert len(index) == 1
+    assert index.vessel("7")["name"] == "first"
@@ -0,0 +1,36 @@
+import asyncio
+
+from utils import timing
+from utils.timing import TimingMiddleware, span
+
+async def app(scope, receive, send):
+    with span("snapshot"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+def request(middleware, headers=()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await middleware({"type": "http", "method": "GET", "path": "/api/vessels", "headers": list(headers)},
+                         None, send)
+
+    asyncio.run(run())
+    return dict(messages[0]["headers"]).get(b"server-timing")
+
+def test_opt_in_header_always_gets_server_timing(monkeypatch):
+    observed = []
+    monkeypatch.setattr(timing.REQUEST_SECONDS, "observe", lambda labels, seconds: observed.append(labels))
+    middleware = TimingMiddleware(app, server_timing_min_seconds=10, sample_every=8)
+
+    plain = [request(middleware) for _ in range(7)]
+    traced = [request(middleware, [(b"x-server-timing", b"1")]) for _ in range(7)]
+
+    assert plain == [None] * 7
+    assert all(header.startswith(b"snapshot;dur=") and b"total;dur=" in header for header in traced)
+    # Only the 8th request was sampled into the weighted histogram
+    assert len(observed) == 1
@@ -0,0 +1,87 @@
+from conftest import make_vessel
+from services.vessel_store import VersionedVesselStore
+
+def ids(records):
+    return sorted(record["id"] for record in records)
+
+def test_unchanged_snapshot_keeps_the_version():
+    store = VersionedVesselStore()
+    fleet = [make_vessel(i) for i in range(3)]
+    assert store.apply_snapshot(fleet).version == 1
+
+    change = store.apply_snapshot([dict(vessel) for vessel in fleet])
+
+    assert change.version == 1 and not change.upserted and not change.removed
+    assert store.version == 1
+
+def test_changes_since_merges_versions():
+    store = VersionedVesselStore()
+    store.apply_snapshot([make_vessel(i) for i in range(3)])                 # v1
+    store.apply_snapshot([make_vessel(0, speed=9.9), make_vessel(1), make_vessel(2),
+                          make_vessel(3)])                                   # v2
+    store.apply_snapshot([make_vessel(0, speed=9.9), make_vessel(2), make_vessel(3)])  # v3
+
+    delta = store.changes_since(1)
+
+    assert delta["version"] == 3 and not delta["full"]
+    assert ids(delta["upserts"]) == ["vessel_00000", "vessel_00003"]
+    assert delta["removed"] == ["vessel_00001"]
+    assert store.changes_since(3) == {"version": 3, "full": False, "upserts": [], "removed": []}
+
+def test_removed_then_readded_is_an_upsert():
+    store = VersionedVesselStore()
+    store.apply_snapshot([make_vessel(0), make_vessel(1)])
+    store.apply_snapshot([make_vessel(0)])
+    store.apply_snapshot([make_vessel(0), make_vessel(1)])
+
+    delta = store.changes_since(1)
+
+    assert ids(delta["upserts"]) == ["vessel_00001"] and delta["removed"] == []
+
+def test_compacted_or_unknown_version_gets_full_snapshot():
+    store = VersionedVesselStore(max_versions=2)
+    for speed in range(4):
+        store.apply_snapshot([make_vessel(0, speed=speed), make_vessel(1)])
+
+    assert store.get_status()["base_version"] == 2
+    assert store.changes_since(1)["full"]
+    assert not store.changes_since(2)["full"]
+    # Ahead of the store, e.g. a version from a previous server process
+    full = store.changes_since(99)
+    assert full["full"] and ids(full["upserts"]) == ["vessel_00000", "vessel_00001"]
+
+def test_upstream_mutation_cannot_hide_a_change():
+    store = VersionedVesselStore()
+    vessel = make_vessel(0)
+    store.apply_snapshot([vessel])
+    vessel["speed"] = 12.5  # mutated in place by whoever owns the record
+
+    assert store.apply_snapshot([vessel]).upserted == {"vessel_00000"}
+
+def test_workers_agree_on_versions_when_one_skips_a_snapshot():
+    snapshots = {
+        1: [make_vessel(0, latitude=0.0), make_vessel(1)],
+        2: [make_vessel(0, latitude=99.0), make_vessel(1)],
+        3: [make_vessel(0, latitude=99.0), make_vessel(1), make_vessel(2)],
+        4: [make_vessel(0, latitude=99.0), make_vessel(1)],
+    }
+    producer, follower = VersionedVesselStore(), VersionedVesselStore()
+    for version, fleet in snapshots.items():
+        producer.apply_snapshot(fleet, version=version)
+    # The follower polled too late to see snapshots 2 and 3
+    follower.apply_snapshot(snapshots[1], version=1)
+    follower.apply_snapshot(snapshots[4], version=4)
+
+    assert producer.version == follower.version == 4
+    # Both were at v1: the follower's delta still carries v2's latitude change
+    delta = follower.changes_since(1)
+    assert not delta["full"] and [vessel["latitude"] for vessel in delta["upserts"]] == [99.0]
+    # The follower never held v3 (vessel 2 present), so only a full snapshot is safe
+    full = follower.changes_since(3)
+    assert full["full"] and ids(full["upserts"]) == ["vessel_00000", "vessel_00001"]
+
+def test_versions_never_go_backwards():
+    store = VersionedVesselStore()
+    store.apply_snapshot([make_vessel(0)], version=5)
+
+    assert store.apply_snapshot([make_vessel(1)], version=3).version == 6
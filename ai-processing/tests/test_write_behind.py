@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from services.write_behind import WriteBehindQueue
+
+class RecordingWriter:
+    """Writer that records each batch and can be held to simulate a slow SQLite write"""
+
+    def __init__(self):
+        self.batches = []
+        self.written = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait(5)
+        self.batches.append(batch)
+        self.written.set()
+
+    @property
+    def records(self):
+        return [record for batch in self.batches for record in batch]
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(**kwargs):
+        kwargs.setdefault("flush_interval", 60)
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(f"test_{len(queues)}", **kwargs)
+        queue.register("vessels", writer)
+        queues.append(queue)
+        return queue, writer
+
+    yield make
+    for queue in queues:
+        queue.close(timeout=5)
+
+def test_records_merge_by_id(make_queue):
+    queue, writer = make_queue()
+
+    queue.submit("vessels", [{"id": "a", "speed": 1}, {"id": "b", "speed": 2}])
+    queue.submit("vessels", [{"id": "a", "speed": 3}])
+
+    assert queue.pending == 2
+    assert queue.stats["merged"] == 1
+    assert queue.flush(timeout=5)
+    assert writer.records == [{"id": "a", "speed": 3}, {"id": "b", "speed": 2}]
+
+def test_records_beyond_max_pending_are_dropped(make_queue):
+    queue, writer = make_queue(max_pending=2)
+
+    accepted = queue.submit("vessels", [{"id": i} for i in range(3)])
+    # Updates to records already pending are still merged at capacity
+    accepted += queue.submit("vessels", [{"id": 0, "speed": 5}])
+
+    assert accepted == 3
+    assert queue.saturated
+    assert queue.stats["dropped"] == 1
+    assert queue.flush(timeout=5)
+    assert writer.records == [{"id": 0, "speed": 5}, {"id": 1}]
+
+def test_pending_records_flush_after_the_interval(make_queue):
+    queue, writer = make_queue(flush_interval=0.05, batch_size=100)
+
+    queue.submit("vessels", [{"id": "a"}])
+
+    assert writer.written.wait(2)
+    assert writer.records == [{"id": "a"}]
+    assert queue.pending == 0
+
+def test_flush_times_out_while_the_writer_is_blocked(make_queue):
+    queue, writer = make_queue()
+    writer.release.clear()
+
+    queue.submit("vessels", [{"id": "a"}])
+
+    assert not queue.flush(timeout=0.1)
+    writer.release.set()
+    assert queue.flush(timeout=5)
+    assert writer.records == [{"id": "a"}]
+
+def test_close_drains_pending_records(make_queue):
+    queue, writer = make_queue(batch_size=2)
+
+    queue.submit("vessels", [{"id": i} for i in range(3)])
+    queue.close(timeout=5)
+
+    assert [len(batch) for batch in writer.batches] == [2, 1]
+    assert queue.pending == 0
+    with pytest.raises(RuntimeError):
+        queue.submit("vessels", [{"id": "late"}])
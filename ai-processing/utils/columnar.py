@@ -0,0 +1,143 @@
+"""
+Columnar record layout for TradeWatch AI Processing System
+"""
+
+import os
+from typing import List, Dict, Any, Iterable, Optional
+
+# Dictionary-encode a column when it has at most this fraction of distinct values
+DICTIONARY_MAX_DISTINCT_RATIO = 0.25
+
+# Strip a shared leading string from a column when it is at least this long
+MIN_PREFIX_LENGTH = 3
+
+_DICTIONARY_TYPES = (str, bool, int, float)
+
+def _typed(value: Any) -> Any:
+    """Comparison key that keeps 0, 0.0 and False apart, also inside lists and dicts"""
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_typed(item) for item in value))
+    if isinstance(value, dict):
+        return (dict, tuple((key, _typed(item)) for key, item in value.items()))
+    return (type(value), value)
+
+def _column_key(column: List[Any]) -> tuple:
+    """Type-aware key for a whole column, so aliases and pairs never merge 1 with 1.0"""
+    return tuple(_typed(value) for value in column)
+
+def _dictionary_encode(column: List[Any]):
+    """Return (dictionary, indices) for a repetitive scalar column, or None"""
+    dictionary: Dict[Any, int] = {}
+    max_distinct = max(1, int(len(column) * DICTIONARY_MAX_DISTINCT_RATIO))
+    indices = []
+    for value in column:
+        if value is not None and not isinstance(value, _DICTIONARY_TYPES):
+            return None
+        # Keyed with the type so 1, 1.0 and True stay distinct entries
+        key = (type(value), value)
+        index = dictionary.get(key)
+        if index is None:
+            if len(dictionary) >= max_distinct:
+                return None
+            index = dictionary[key] = len(dictionary)
+        indices.append(index)
+    return [value for _, value in dictionary], indices
+
+def _prefix_encode(column: List[Any]):
+    """Return (prefix, stripped column) for strings sharing a leading part (ids, timestamps), or None"""
+    strings = [value for value in column if value is not None]
+    if not strings or not all(isinstance(value, str) for value in strings):
+        return None
+    prefix = os.path.commonprefix(strings)
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return None
+    start = len(prefix)
+    return prefix, [value[start:] if value is not None else None for value in column]
+
+def _find_pair(field: str, raw_columns: Dict[str, List[Any]],
+               column_keys: Dict[str, tuple]) -> Optional[List[str]]:
+    """Names of the two other columns `field` zips into [a, b] per record (e.g. coordinates), or None"""
+    column = raw_columns[field]
+    if not all(isinstance(value, (list, tuple)) and len(value) == 2 for value in column):
+        return None
+    firsts = _column_key([value[0] for value in column])
+    seconds = _column_key([value[1] for value in column])
+    first = next((name for name in raw_columns if name != field and column_keys[name] == firsts), None)
+    second = next((name for name in raw_columns if name != field and column_keys[name] == seconds), None)
+    if first is None or second is None:
+        return None
+    return [first, second]
+
+def to_columnar(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn a list of dicts into one array per field
+
+    Each field appears in exactly one of:
+      - `columns`: values in record order; when the field is also in `dictionaries`
+        the column holds indices into that dictionary instead, and when it is in
+        `prefixes` each string has that prefix removed
+      - `aliases`: identical to another field's column (e.g. latitude -> lat)
+      - `pairs`: [a, b] per record built from two other columns (e.g.
+        coordinates -> [latitude, longitude])
+      - `null_fields`: null (or missing) in every record
+
+    `fields` lists every field in first-appearance order.
+    """
+    records = list(records)
+    fields: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            if key not in fields:
+                fields[key] = None
+
+    columns: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, List[Any]] = {}
+    prefixes: Dict[str, str] = {}
+    aliases: Dict[str, str] = {}
+    pairs: Dict[str, List[str]] = {}
+    null_fields: List[str] = []
+    raw_columns: Dict[str, List[Any]] = {}
+    column_keys: Dict[str, tuple] = {}
+
+    for field in fields:
+        column = [record.get(field) for record in records]
+        if all(value is None for value in column):
+            null_fields.append(field)
+            continue
+
+        key = _column_key(column)
+        original = next((name for name, other in column_keys.items() if other == key), None)
+        if original is not None:
+            aliases[field] = original
+            continue
+        raw_columns[field] = column
+        column_keys[field] = key
+
+    # Pairs may name columns that appear later, so they are found once every column is known
+    for field in list(raw_columns):
+        pair = _find_pair(field, raw_columns, column_keys)
+        if pair is not None:
+            pairs[field] = pair
+            del raw_columns[field]
+
+    for field, column in raw_columns.items():
+        encoded = _dictionary_encode(column)
+        if encoded is not None:
+            dictionaries[field], columns[field] = encoded
+            continue
+        stripped = _prefix_encode(column)
+        if stripped is not None:
+            prefixes[field], columns[field] = stripped
+        else:
+            columns[field] = column
+
+    return {
+        "count": len(records),
+        "fields": list(fields),
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "prefixes": prefixes,
+        "aliases": aliases,
+        "pairs": pairs,
+        "null_fields": null_fields,
+    }
@@ -4,7 +4,12 @@ Configuration management for TradeWatch AI Processing System
 
 import os
 from typing import Optional
-from pydantic import BaseSettings, Field
+from pydantic import Field
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic v1
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
@@ -56,7 +61,12 @@ class Settings(BaseSettings):
     enable_metrics: bool = Field(default=True, env="ENABLE_METRICS")
     metrics_port: int = Field(default=9090, env="METRICS_PORT")
     
+    # Inference configuration
+    inference_backend: str = Field(default="tensorflow", env="INFERENCE_BACKEND")  # tensorflow | tflite | onnx
+    inference_threads: int = Field(default=0, env="INFERENCE_THREADS")  # 0 = runtime default
+    
     # GPU configuration
+    use_gpu: bool = Field(default=True, env="USE_GPU")
     gpu_memory_limit: Optional[int] = Field(default=None, env="GPU_MEMORY_LIMIT")
     enable_mixed_precision: bool = Field(default=True, env="ENABLE_MIXED_PRECISION")
     
@@ -80,8 +90,15 @@ def configure_tensorflow():
     
     settings = get_settings()
     
+    # CPU-only nodes hide GPUs before TensorFlow initializes any device
+    if not settings.use_gpu:
+        tf.config.set_visible_devices([], 'GPU')
+        gpus = []
+        print("GPU disabled, using CPU")
+    else:
+        gpus = tf.config.experimental.list_physical_devices('GPU')
+    
     # Configure GPU memory growth
-    gpus = tf.config.experimental.list_physical_devices('GPU')
     if gpus:
         try:
             for gpu in gpus:
@@ -97,9 +114,12 @@ def configure_tensorflow():
             
         except RuntimeError as e:
             print(f"GPU configuration error: {e}")
-    else:
+    elif settings.use_gpu:
         print("No GPUs detected, using CPU")
     
+    if settings.inference_threads:
+        tf.config.threading.set_intra_op_parallelism_threads(settings.inference_threads)
+    
     # Configure mixed precision if enabled
     if settings.enable_mixed_precision and gpus:
         policy = tf.keras.mixed_precision.Policy('mixed_float16')
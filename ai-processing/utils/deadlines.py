@@ -0,0 +1,59 @@
+"""
+Deadline-bounded concurrent sections for TradeWatch AI Processing System
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Awaitable, Union
+
+from utils.timing import record
+
+@dataclass
+class SectionOutcome:
+    """Result of one concurrently run section: ok, timeout or error"""
+    name: str
+    status: str
+    elapsed_ms: float
+    deadline_ms: float
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def timing(self) -> Dict[str, Any]:
+        timing = {"status": self.status, "elapsed_ms": self.elapsed_ms, "deadline_ms": self.deadline_ms}
+        if self.error:
+            timing["error"] = self.error
+        return timing
+
+async def _run_section(name: str, awaitable: Awaitable, deadline_seconds: float) -> SectionOutcome:
+    start = time.perf_counter()
+    deadline_ms = round(deadline_seconds * 1000, 1)
+    try:
+        value = await asyncio.wait_for(awaitable, deadline_seconds)
+        status, error = "ok", None
+    except asyncio.TimeoutError:
+        value, status, error = None, "timeout", f"exceeded {deadline_ms:.0f}ms deadline"
+    except Exception as e:
+        value, status, error = None, "error", str(e)
+    elapsed = time.perf_counter() - start
+    record(name, elapsed)
+    return SectionOutcome(name, status, round(elapsed * 1000, 1), deadline_ms, value=value, error=error)
+
+async def gather_with_deadlines(sections: Dict[str, Awaitable],
+                                deadlines: Union[float, Dict[str, float]]) -> Dict[str, SectionOutcome]:
+    """
+    Run named awaitables concurrently, each cancelled at its own deadline (seconds)
+
+    One slow or failing section never holds back or fails the others. A section
+    can only be cancelled at an await, so CPU-bound work between awaits runs to
+    its next suspension point before the timeout takes effect.
+    """
+    outcomes = await asyncio.gather(*(
+        _run_section(name, awaitable, deadlines[name] if isinstance(deadlines, dict) else deadlines)
+        for name, awaitable in sections.items()
+    ))
+    return {outcome.name: outcome for outcome in outcomes}
@@ -0,0 +1,123 @@
+"""
+Geographic helpers for TradeWatch AI Processing System
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """Lat/lon box in decimal degrees; west > east means it crosses the antimeridian"""
+    west: float
+    south: float
+    east: float
+    north: float
+
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.west > self.east
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if not (self.south <= lat <= self.north):
+            return False
+        if self.crosses_antimeridian:
+            return lon >= self.west or lon <= self.east
+        return self.west <= lon <= self.east
+
+    def as_list(self) -> list:
+        return [self.west, self.south, self.east, self.north]
+
+def parse_bbox(value: Union[str, Sequence[float], None]) -> Optional[BoundingBox]:
+    """
+    Parse a bbox given as "west,south,east,north" (Leaflet toBBoxString order) or a 4-item list
+
+    Raises:
+        ValueError: if the box is malformed or out of range
+    """
+    if value is None or value == "":
+        return None
+
+    parts = value.split(",") if isinstance(value, str) else list(value)
+    if len(parts) != 4:
+        raise ValueError("bbox must have 4 values: west,south,east,north")
+
+    try:
+        west, south, east, north = (float(p) for p in parts)
+    except (TypeError, ValueError):
+        raise ValueError("bbox values must be numbers")
+
+    if not (-90 <= south <= north <= 90):
+        raise ValueError("bbox latitudes must satisfy -90 <= south <= north <= 90")
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+
+    return BoundingBox(west, south, east, north)
+
+def unit_vectors(lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+    """Lat/lon degrees as (n, 3) points on the unit sphere"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+def km_to_chord(km: float) -> float:
+    return 2 * float(np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2))
+
+class SphericalIndex:
+    """
+    Radius and k-nearest queries over lat/lon points
+
+    Points are stored as 3-D unit vectors, where straight-line (chord) distance
+    grows monotonically with great-circle distance, so a KD-tree answers both
+    queries exactly with no antimeridian or pole special cases. Without scipy the
+    same queries run as one vectorized scan. Results are point indices ordered by
+    distance, with distances in km.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float]):
+        self.points = unit_vectors(lats, lons)
+        self._tree = cKDTree(self.points) if SCIPY_AVAILABLE and len(self.points) else None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        target = unit_vectors([lat], [lon])[0]
+        chord = km_to_chord(radius_km)
+        if self._tree is not None:
+            indices = np.asarray(self._tree.query_ball_point(target, chord), dtype=np.intp)
+            chords = np.linalg.norm(self.points[indices] - target, axis=1)
+        else:
+            all_chords = np.linalg.norm(self.points - target, axis=1)
+            indices = np.flatnonzero(all_chords <= chord)
+            chords = all_chords[indices]
+        order = np.argsort(chords, kind="stable")
+        return indices[order], chord_to_km(chords[order])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(max(1, k), len(self.points))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        target = unit_vectors([lat], [lon])[0]
+        if self._tree is not None:
+            chords, indices = self._tree.query(target, k=k)
+            chords, indices = np.atleast_1d(chords), np.atleast_1d(indices)
+        else:
+            all_chords = np.linalg.norm(self.points - target, axis=1)
+            indices = np.argpartition(all_chords, k - 1)[:k] if k < len(all_chords) else np.arange(len(all_chords))
+            indices = indices[np.argsort(all_chords[indices], kind="stable")]
+            chords = all_chords[indices]
+        return indices.astype(np.intp), chord_to_km(chords)
@@ -0,0 +1,189 @@
+"""
+Model inference runtime for TradeWatch AI Processing System
+Lazy TensorFlow loading and CPU inference backends (Keras, TFLite, ONNX Runtime)
+"""
+
+import importlib.util
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Callable
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+INFERENCE_BACKENDS = ("tensorflow", "tflite", "onnx")
+ARTIFACT_EXTENSIONS = {"tflite": ".tflite", "onnx": ".onnx"}
+
+# Probed without importing - importing these runtimes is what we are trying to defer
+TFLITE_RUNTIME_AVAILABLE = importlib.util.find_spec("tflite_runtime") is not None
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+TF2ONNX_AVAILABLE = importlib.util.find_spec("tf2onnx") is not None
+
+ONNX_OUTPUT_NAMES_KEY = "keras_output_names"
+
+_tf = None
+_tf_lock = threading.Lock()
+
+def get_tensorflow():
+    """Import and configure TensorFlow on first use; later calls return the cached module"""
+    global _tf
+    if _tf is None:
+        with _tf_lock:
+            if _tf is None:
+                from utils.config import configure_tensorflow
+                import tensorflow as tf
+                configure_tensorflow()
+                _tf = tf
+    return _tf
+
+def tensorflow_loaded() -> bool:
+    return _tf is not None
+
+class InferenceBackend(ABC):
+    """Runs a multi-input, multi-output model on numpy arrays keyed by layer name"""
+
+    name = "base"
+
+    @abstractmethod
+    def predict(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Outputs keyed by the Keras output layer names"""
+
+class KerasBackend(InferenceBackend):
+    """In-process Keras model; calls the model directly instead of `predict()` to skip per-call setup"""
+
+    name = "tensorflow"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        outputs = self.model([inputs[name] for name in self.model.input_names], training=False)
+        if not isinstance(outputs, (list, tuple)):
+            outputs = [outputs]
+        return {name: output.numpy() for name, output in zip(self.model.output_names, outputs)}
+
+class TFLiteBackend(InferenceBackend):
+    """
+    TFLite interpreter over an exported model
+
+    Uses the standalone tflite_runtime package when installed so TensorFlow is
+    never imported; the interpreter is not thread-safe, hence the lock.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_file: str, num_threads: Optional[int] = None):
+        if TFLITE_RUNTIME_AVAILABLE:
+            from tflite_runtime.interpreter import Interpreter
+        else:
+            Interpreter = get_tensorflow().lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_file, num_threads=num_threads)
+        self.runner = self.interpreter.get_signature_runner()
+        self._lock = threading.Lock()
+
+    def predict(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        feeds = {name: np.asarray(value, dtype=np.float32) for name, value in inputs.items()}
+        with self._lock:
+            return self.runner(**feeds)
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime session on the CPU execution provider"""
+
+    name = "onnx"
+
+    def __init__(self, model_file: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=["CPUExecutionProvider"])
+        self.output_names = [output.name for output in self.session.get_outputs()]
+
+        # Converted graphs may rename outputs; export records the Keras names in order
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.result_names = json.loads(metadata.get(ONNX_OUTPUT_NAMES_KEY, "null")) or self.output_names
+
+    def predict(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        feeds = {name: np.asarray(value, dtype=np.float32) for name, value in inputs.items()}
+        return dict(zip(self.result_names, self.session.run(self.output_names, feeds)))
+
+def export_keras_model(model, backend: str, artifact_file: str):
+    """Write a CPU inference artifact (.tflite or .onnx) for a built Keras model"""
+    tf = get_tensorflow()
+    os.makedirs(os.path.dirname(artifact_file), exist_ok=True)
+
+    if backend == "tflite":
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        try:
+            flatbuffer = converter.convert()
+        except Exception as e:
+            # Ops without a builtin kernel need the TF-select (flex) delegate, i.e. full TensorFlow
+            logger.warning("Builtin-only TFLite conversion failed, retrying with TF select ops", error=str(e))
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+            flatbuffer = converter.convert()
+        with open(artifact_file, "wb") as f:
+            f.write(flatbuffer)
+
+    elif backend == "onnx":
+        import tf2onnx
+
+        input_signature = [
+            tf.TensorSpec(layer_input.shape, tf.float32, name=name)
+            for name, layer_input in zip(model.input_names, model.inputs)
+        ]
+        model_proto, _ = tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=13)
+        output_names = model_proto.metadata_props.add()
+        output_names.key = ONNX_OUTPUT_NAMES_KEY
+        output_names.value = json.dumps(list(model.output_names))
+        with open(artifact_file, "wb") as f:
+            f.write(model_proto.SerializeToString())
+
+    else:
+        raise ValueError(f"No export format for inference backend '{backend}'")
+
+    logger.info("Exported inference model", backend=backend, path=artifact_file)
+
+def _backend_available(backend: str, needs_export: bool) -> bool:
+    if backend == "onnx":
+        return ONNXRUNTIME_AVAILABLE and (TF2ONNX_AVAILABLE or not needs_export)
+    return True
+
+def load_inference_backend(model_path: str, model_name: str, load_keras_model: Callable[[], Any],
+                           source_file: Optional[str] = None, backend: Optional[str] = None) -> InferenceBackend:
+    """
+    Inference backend for one model, chosen by `Settings.inference_backend`
+
+    tflite/onnx load `{model_path}/{model_name}.tflite|.onnx` without building the
+    Keras graph. When that artifact is missing or older than `source_file` (the
+    saved Keras weights), the Keras model is loaded once and exported first.
+    Falls back to Keras when the configured runtime is not installed.
+    """
+    from utils.config import get_settings
+
+    settings = get_settings()
+    backend = (backend or settings.inference_backend).lower()
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(INFERENCE_BACKENDS)})")
+    num_threads = settings.inference_threads or None
+
+    if backend != "tensorflow":
+        artifact_file = os.path.join(model_path, model_name + ARTIFACT_EXTENSIONS[backend])
+        stale = not os.path.exists(artifact_file) or (
+            source_file is not None and os.path.exists(source_file)
+            and os.path.getmtime(source_file) > os.path.getmtime(artifact_file)
+        )
+        if _backend_available(backend, needs_export=stale):
+            if stale:
+                export_keras_model(load_keras_model(), backend, artifact_file)
+            runtime = TFLiteBackend(artifact_file, num_threads) if backend == "tflite" else OnnxBackend(artifact_file, num_threads)
+            logger.info("Inference backend ready", model=model_name, backend=backend,
+                        tensorflow_loaded=tensorflow_loaded())
+            return runtime
+        logger.warning("Inference runtime not installed, falling back to TensorFlow", model=model_name, backend=backend)
+
+    return KerasBackend(load_keras_model())
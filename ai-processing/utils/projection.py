@@ -0,0 +1,28 @@
+"""
+Field projection helpers for TradeWatch AI Processing System
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+FieldSet = Tuple[str, ...]
+
+def parse_fields(value: Optional[str]) -> Optional[FieldSet]:
+    """
+    Normalize a "fields=a,b,c" parameter into a hashable field set
+
+    Order and duplicates are ignored so equivalent requests share one cache entry;
+    None (or an empty value) means every field.
+    """
+    if not value:
+        return None
+    fields = tuple(sorted({field.strip() for field in value.split(",") if field.strip()}))
+    return fields or None
+
+def project_record(record: Dict[str, Any], fields: FieldSet) -> Dict[str, Any]:
+    return {field: record[field] for field in fields if field in record}
+
+def project_records(records: Iterable[Dict[str, Any]], fields: Optional[FieldSet]) -> List[Dict[str, Any]]:
+    """Records restricted to `fields` (the records themselves when fields is None)"""
+    if fields is None:
+        return list(records)
+    return [project_record(record, fields) for record in records]